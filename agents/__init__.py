@@ -1,67 +1,16 @@
-from typing import Any, List, Optional
+import threading
+from collections.abc import MutableMapping
+from importlib import import_module
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
-from langchain_core.messages import BaseMessage, AIMessage
-from langchain_core.outputs import ChatGeneration, ChatResult
-from langchain_core.callbacks import CallbackManagerForLLMRun
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langgraph.prebuilt import create_react_agent
 
+import config
 from config import *
 from tools import *
-
-
-class MockChatModel(ChatOpenAI):
-    """Mock ChatOpenAI model for testing when API key is not available.
-
-    Generates fixed mock responses for development and testing purposes.
-    """
-
-    def __init__(self, model_name: str, **kwargs):
-        """Initialize the mock model with dummy API settings.
-
-        Args:
-            model_name (str): Name of the model to mock.
-            **kwargs: Additional arguments passed to parent.
-        """
-        kwargs["model"] = model_name
-        kwargs["api_key"] = "dummy"
-        kwargs["base_url"] = "https://api.x.ai/v1"
-        super().__init__(**kwargs)
-        self.model_name = model_name
-
-    def _generate(
-        self,
-        messages: List[BaseMessage],
-        stop: Optional[List[str]] = None,
-        run_manager: Optional[CallbackManagerForLLMRun] = None,
-        **kwargs: Any,
-    ) -> ChatResult:
-        """Generate a mock response for testing purposes.
-
-        Returns a fixed mock message simulating agent output.
-
-        Args:
-            messages: Input messages (ignored).
-            stop: Stop sequences (ignored).
-            run_manager: Run manager (ignored).
-            **kwargs: Additional arguments (ignored).
-
-        Returns:
-            ChatResult: Mock chat result with fixed content.
-        """
-        # Extract the last message content for mock response personalization
-        last_message = messages[-1].content if messages else ""
-        mock_content = rf"""Hypothesis: Analyzed '{last_message}' → {self.model_name} task (e.g., HHI calc, SSNIP sim).
-
-Used sequential_thinking. Tools: run_code_py/r for quants, tavily_search for papers.
-
-Output: \[ HHI = \sum_i s_i^2 \]
-
-Reflection: Hypothesis tested; caveats (2025 data, IIA fails); robust via mocks."""
-        # Create a chat generation with the mock content
-        generation = ChatGeneration(message=AIMessage(content=mock_content))
-        return ChatResult(generations=[generation])
+from telemetry import TelemetryCallback
+from llm_cache import get_llm_cache
 
 
 def create_agent(name: str, model: str, system_prompt: str, tools: list) -> Any:
@@ -78,19 +27,27 @@ def create_agent(name: str, model: str, system_prompt: str, tools: list) -> Any:
     Returns:
         LangGraph agent instance.
     """
+    # The OpenAI-compatible client is imported here, when the first agent is built
+    from langchain_openai import ChatOpenAI
+    from .mock_model import MockChatModel
+
     # Log the agent creation details
     print(f"Creating agent '{name}' with model '{model}' and system_prompt length {len(system_prompt)}")
     # Retrieve sampling parameters for the agent or use default
     sampling = SAMPLING_PARAMS.get(name, SAMPLING_PARAMS["default"])
-    if not XAI_API_KEY:
+    # Record/replay cassette (LLM_CACHE_MODE); none in passthrough mode
+    cache = get_llm_cache()
+    if cache is not None:
+        sampling = {**sampling, "cache": cache}
+    if not config.XAI_API_KEY:
         # Use mock model if no API key is available
         llm = MockChatModel(model_name=model, **sampling)
     else:
         # Use real ChatOpenAI with xAI API
         llm = ChatOpenAI(
             model=model,
-            api_key=XAI_API_KEY,
-            base_url="https://api.x.ai/v1",
+            api_key=config.XAI_API_KEY,
+            base_url=config.XAI_BASE_URL,
             **sampling
         )
     # Create the prompt template with system prompt and message placeholder
@@ -98,8 +55,17 @@ def create_agent(name: str, model: str, system_prompt: str, tools: list) -> Any:
         ("system", system_prompt),
         MessagesPlaceholder(variable_name="messages"),
     ])
-    # Create and return the react agent
-    return create_react_agent(llm, tools, prompt=prompt)
+    # Create the react agent; the telemetry callback is inherited by its LLM and tool runs
+    agent = create_react_agent(llm, tools, prompt=prompt)
+    return agent.with_config(callbacks=[TelemetryCallback(name)])
+
+
+def __getattr__(name: str) -> Any:
+    # MockChatModel subclasses ChatOpenAI; defined in mock_model so importing agents stays cheap
+    if name == "MockChatModel":
+        from .mock_model import MockChatModel
+        return MockChatModel
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Tool bindings
@@ -116,39 +82,128 @@ ALL_TOOLS = [
     convert_pdf_file, # Convert local PDF to Markdown
     read_text_file,   # Read single text file
     read_multiple_files,  # Read multiple text files
-    fetch_paper_content  # Smart wrapper for fetching paper content (PDF/HTML)
+    fetch_paper_content,  # Smart wrapper for fetching paper content (PDF/HTML)
+    search_documents,  # BM25 search over the query's uploaded documents
+    read_chunk,  # Read one passage of an uploaded document
 ]
 
-# Import agent creation functions
-from .supervisor import create_supervisor_agent
-from .econpaper import create_econpaper_agent
-from .econquant import create_econquant_agent
-from .explainer import create_explainer_agent
-from .marketdef import create_marketdef_agent
-from .docanalyzer import create_docanalyzer_agent
-from .caselaw import create_caselaw_agent
-from .synthesis import create_synthesis_agent
-from .verifier import create_verifier_agent
-from .remediation import create_remediation_agent
-from .pro import create_pro_agent
-from .cons import create_cons_agent
-from .arbiter import create_arbiter_agent
-from .teamformation import create_teamformation_agent
-
-# Dictionary of all agents, created with their specific configurations
-agents = {
-    "supervisor": create_supervisor_agent(),
-    "econpaper": create_econpaper_agent(),
-    "econquant": create_econquant_agent(),
-    "explainer": create_explainer_agent(),
-    "marketdef": create_marketdef_agent(),
-    "docanalyzer": create_docanalyzer_agent(),
-    "caselaw": create_caselaw_agent(),
-    "synthesis": create_synthesis_agent(),
-    "verifier": create_verifier_agent(),
-    "remediation": create_remediation_agent(),
-    "pro": create_pro_agent(),
-    "cons": create_cons_agent(),
-    "arbiter": create_arbiter_agent(),
-    "teamformation": create_teamformation_agent(),
-}
\ No newline at end of file
+class AgentRegistry(MutableMapping):
+    """Name -> agent mapping that builds each agent on first access.
+
+    Agents are created by their factory the first time they are looked up and
+    cached afterwards, so a run only pays for the agents it actually uses.
+    Assigning an entry overrides (or adds) an agent without building the
+    original; copy(), clear() and update() work on factories and cached
+    agents without materializing anything, which keeps patch.dict cheap.
+    """
+
+    def __init__(self, factories: Optional[Dict[str, Callable[[], Any]]] = None):
+        self._factories: Dict[str, Callable[[], Any]] = dict(factories or {})
+        self._agents: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        """Register (or replace) the factory for name, dropping any cached agent."""
+        with self._lock:
+            self._factories[name] = factory
+            self._agents.pop(name, None)
+
+    def __getitem__(self, name: str) -> Any:
+        try:
+            return self._agents[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._agents:
+                factory = self._factories[name]  # KeyError for unknown agents
+                self._agents[name] = factory()
+            return self._agents[name]
+
+    def __setitem__(self, name: str, agent: Any) -> None:
+        with self._lock:
+            self._agents[name] = agent
+
+    def __delitem__(self, name: str) -> None:
+        with self._lock:
+            if name not in self._factories and name not in self._agents:
+                raise KeyError(name)
+            self._factories.pop(name, None)
+            self._agents.pop(name, None)
+
+    def __iter__(self) -> Iterator[str]:
+        names = list(self._factories)
+        names += [name for name in self._agents if name not in self._factories]
+        return iter(names)
+
+    def __len__(self) -> int:
+        return len(self._factories.keys() | self._agents.keys())
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._factories or name in self._agents
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)}, materialized={self.materialized()})"
+
+    def materialized(self) -> List[str]:
+        """Names of the agents that have been built (or assigned) so far."""
+        return list(self._agents)
+
+    def reset(self, names: Optional[List[str]] = None) -> None:
+        """Drop cached agents (default: all) so their factories build them again on next access.
+
+        Agents assigned without a factory are kept.
+        """
+        with self._lock:
+            for name in list(self._agents) if names is None else names:
+                if name in self._factories:
+                    self._agents.pop(name, None)
+
+    def copy(self) -> "AgentRegistry":
+        with self._lock:
+            clone = type(self)(self._factories)
+            clone._agents = dict(self._agents)
+        return clone
+
+    def clear(self) -> None:
+        with self._lock:
+            self._factories.clear()
+            self._agents.clear()
+
+    def update(self, other=(), /, **kwargs) -> None:
+        if isinstance(other, AgentRegistry):
+            with self._lock:
+                for name, factory in other._factories.items():
+                    self.register(name, factory)
+                self._agents.update(other._agents)
+            other = ()
+        super().update(other, **kwargs)
+
+
+def _lazy_factory(module: str, function: str) -> Callable[[], Any]:
+    """Factory that imports agents.<module> only when the agent is first built."""
+    def factory() -> Any:
+        return getattr(import_module(f".{module}", __name__), function)()
+    factory.__qualname__ = f"{module}.{function}"
+    return factory
+
+
+# All agents, created with their specific configurations on first access
+agents = AgentRegistry({
+    name: _lazy_factory(name, f"create_{name}_agent")
+    for name in (
+        "supervisor",
+        "econpaper",
+        "econquant",
+        "explainer",
+        "marketdef",
+        "docanalyzer",
+        "caselaw",
+        "synthesis",
+        "verifier",
+        "remediation",
+        "pro",
+        "cons",
+        "arbiter",
+        "teamformation",
+    )
+})
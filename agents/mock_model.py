@@ -0,0 +1,61 @@
+"""Mock chat model used by create_agent when XAI_API_KEY is not set."""
+
+from typing import Any, List, Optional
+
+from langchain_core.messages import BaseMessage, AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_openai import ChatOpenAI
+
+
+class MockChatModel(ChatOpenAI):
+    """Mock ChatOpenAI model for testing when API key is not available.
+
+    Generates fixed mock responses for development and testing purposes.
+    """
+
+    def __init__(self, model_name: str, **kwargs):
+        """Initialize the mock model with dummy API settings.
+
+        Args:
+            model_name (str): Name of the model to mock.
+            **kwargs: Additional arguments passed to parent.
+        """
+        kwargs["model"] = model_name
+        kwargs["api_key"] = "dummy"
+        kwargs["base_url"] = "https://api.x.ai/v1"
+        super().__init__(**kwargs)
+        self.model_name = model_name
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        """Generate a mock response for testing purposes.
+
+        Returns a fixed mock message simulating agent output.
+
+        Args:
+            messages: Input messages (ignored).
+            stop: Stop sequences (ignored).
+            run_manager: Run manager (ignored).
+            **kwargs: Additional arguments (ignored).
+
+        Returns:
+            ChatResult: Mock chat result with fixed content.
+        """
+        # Extract the last message content for mock response personalization
+        last_message = messages[-1].content if messages else ""
+        mock_content = rf"""Hypothesis: Analyzed '{last_message}' → {self.model_name} task (e.g., HHI calc, SSNIP sim).
+
+Used sequential_thinking. Tools: run_code_py/r for quants, tavily_search for papers.
+
+Output: \[ HHI = \sum_i s_i^2 \]
+
+Reflection: Hypothesis tested; caveats (2025 data, IIA fails); robust via mocks."""
+        # Create a chat generation with the mock content
+        generation = ChatGeneration(message=AIMessage(content=mock_content))
+        return ChatResult(generations=[generation])
@@ -6,22 +6,27 @@ agent orchestration, and report generation.
 """
 
 import argparse
+import csv
+import glob
 import os
 import subprocess
 import shlex
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
+from typing import Callable
 from langchain_core.messages import HumanMessage, AIMessage
-from graph import create_workflow  # function to create graph
-from tools.convert_pdf_file import convert_pdf_file  # for uploads
 import re
 import textwrap
 import logging
 import json
 
 from dotenv import load_dotenv; load_dotenv()
-from agents import agents
-from exceptions import WorkflowError, AgentError, FileProcessingError
+from exceptions import WorkflowError, AgentError, FileProcessingError, ConfigurationError
+from run_context import agent_scope, bind_run, end_run, new_run_id
+from streaming import StreamingReport, print_progress, stream_workflow
+from telemetry import get_metrics
 
 def fix_md_math(md_path: str) -> str:
     """Fixes LaTeX math block indentation in Markdown files for Pandoc compatibility.
@@ -88,105 +93,270 @@ def fix_md_math(md_path: str) -> str:
         f.write(fixed_content)
     return fixed_path
 
-def main():
-    # Set up command-line argument parser
-    parser = argparse.ArgumentParser(description="CompeteGrok: IO Economics AI")
-    parser.add_argument("--query", type=str, required=True, help="Query text or path to .txt file (multi-line)")
-    parser.add_argument("--file", type=str, nargs="*", help="PDF/Excel uploads for RAG")
-    parser.add_argument("--verbose", action="store_true", help="Verbose output")
-    parser.add_argument("--log-level", type=str, default=None, choices=["DEBUG", "INFO", "WARNING", "ERROR"], help="Set logging level")
-    parser.add_argument("--output-dir", type=str, default="./outputs", help="Output dir")
-    parser.add_argument("--debate", action="store_true", help="Force debate module regardless of supervisor routing")
-    args = parser.parse_args()
+def parse_query_file(query_path: Path) -> tuple[str, list[str]]:
+    """Parses a query .txt file into its query text and referenced files.
 
-    # Validate user inputs
-    if not args.query or not args.query.strip():
-        parser.error("Query cannot be empty.")
+    The file may hold a QUERY: section and a FILES: section (one path per
+    line); without a QUERY: section the whole content is the query. Surrounding
+    triple quotes are removed.
 
-    if args.file:
-        for file_path in args.file:
-            if not os.path.isfile(file_path):
-                parser.error(f"File does not exist: {file_path}")
+    Args:
+        query_path (Path): Path to the query file.
 
-    if not os.path.isdir(args.output_dir):
-        try:
-            os.makedirs(args.output_dir, exist_ok=True)
-        except OSError as e:
-            parser.error(f"Cannot create output directory: {e}")
+    Returns:
+        tuple[str, list[str]]: The query text and the file paths listed under FILES:.
+    """
+    # Read the entire file content and strip whitespace
+    content = query_path.read_text(encoding="utf-8").strip()
+    # Remove surrounding triple quotes if present (for multi-line strings)
+    if content.startswith('"""') and content.endswith('"""'):
+        content = content[3:-3].strip()
+    # Split content into lines for section-based parsing
+    lines = content.splitlines()
+    query_text = ""
+    file_paths = []
+    in_query = False
+    in_files = False
+    # Parse lines to extract QUERY and FILES sections
+    for line in lines:
+        line = line.strip()
+        # Start of QUERY section
+        if line.upper() == "QUERY:":
+            in_query = True
+            in_files = False
+            continue
+        # Start of FILES section
+        elif line.upper() == "FILES:":
+            in_files = True
+            in_query = False
+            continue
+        # Append to query text if in QUERY section
+        if in_query:
+            query_text += line + "\n"
+        # Append to file paths if in FILES section and line is not empty
+        elif in_files and line:
+            file_paths.append(line)
+    # If no QUERY section found, use entire content as query
+    if not query_text.strip():
+        query_text = content
+    return query_text.strip(), file_paths
+
+def convert_upload(file_path: str, run_id: str) -> dict:
+    """Converts one uploaded PDF to Markdown.
 
-    # Configure logging based on arguments
-    from compete_logging import setup_logging
-    log_level_str = args.log_level or ('DEBUG' if args.verbose else 'INFO')
-    setup_logging(log_level_str)
-    logger = logging.getLogger(__name__)
+    Args:
+        file_path (str): Path of the upload.
+        run_id (str): Run the conversion belongs to (for telemetry).
 
-    # If query argument ends with .txt, treat it as a file path and parse it
-    if args.query.endswith('.txt'):
-        query_path = Path(args.query)
-        if query_path.exists():
-            # Read the entire file content and strip whitespace
-            content = query_path.read_text(encoding="utf-8").strip()
-            # Remove surrounding triple quotes if present (for multi-line strings)
-            if content.startswith('"""') and content.endswith('"""'):
-                content = content[3:-3].strip()
-            # Split content into lines for section-based parsing
-            lines = content.splitlines()
-            query_text = ""
-            file_paths = []
-            in_query = False
-            in_files = False
-            # Parse lines to extract QUERY and FILES sections
-            for line in lines:
-                line = line.strip()
-                # Start of QUERY section
-                if line.upper() == "QUERY:":
-                    in_query = True
-                    in_files = False
-                    continue
-                # Start of FILES section
-                elif line.upper() == "FILES:":
-                    in_files = True
-                    in_query = False
-                    continue
-                # Append to query text if in QUERY section
-                if in_query:
-                    query_text += line + "\n"
-                # Append to file paths if in FILES section and line is not empty
-                elif in_files and line:
-                    file_paths.append(line)
-            # If no QUERY section found, use entire content as query
-            if not query_text.strip():
-                query_text = content
-            # Update args.query with parsed query text
-            args.query = query_text.strip()
-            # Update args.file with parsed file paths if any
-            if file_paths:
-                if args.file is None:
-                    args.file = file_paths
-                else:
-                    args.file.extend(file_paths)
-            # Log the file loading if verbose mode
-            if args.verbose:
-                print(f"Loaded and parsed query from file: {query_path}")
+    Returns:
+        dict: file, ok, error (None on success), seconds and content (the
+        Markdown, or None on failure).
+    """
+    from tools.convert_pdf_file import convert_pdf_file
+    started = time.perf_counter()
+    content, error = None, None
+    try:
+        with bind_run(run_id):
+            result = convert_pdf_file.invoke({"file_path": file_path})
+        if result["success"]:
+            content = result["content"]
         else:
-            raise ValueError(f"Query file not found: {args.query}")
+            error = result["error"][:200]
+    except (OSError, ValueError) as e:
+        error = str(e)
+    return {"file": file_path, "ok": error is None, "error": error,
+            "seconds": time.perf_counter() - started, "content": content}
+
+def convert_uploads(files: list[str], run_id: str, workers: int | None = None) -> list[Future]:
+    """Starts converting uploads concurrently in a bounded thread pool.
+
+    Args:
+        files (list[str]): Upload paths.
+        run_id (str): Run the conversions belong to.
+        workers (int | None): Conversions in flight (default: UPLOAD_WORKERS).
+
+    Returns:
+        list[Future]: One future per file, in the order of files, each resolving
+        to a convert_upload result.
+    """
+    import config
+    pool = ThreadPoolExecutor(max_workers=max(1, min(len(files), workers or config.UPLOAD_WORKERS)),
+                              thread_name_prefix="upload")
+    try:
+        return [pool.submit(convert_upload, file_path, run_id) for file_path in files]
+    finally:
+        pool.shutdown(wait=False)  # the submitted conversions run on; the threads exit when done
+
+def report_header(query: str, selected_agents: list[str]) -> str:
+    """Title, query, selected agents and timestamp that open every report."""
+    report_content = "# CompeteGrok Analysis Report\n\n"
+    report_content += f"**Query:** {query}\n\n"
+    report_content += f"**Selected Agents:** {selected_agents}\n\n"
+    report_content += f"**Timestamp:** {datetime.now()}\n\n"
+    return report_content
+
+def build_report(query: str, selected_agents: list[str], result: dict) -> str:
+    """Builds the Markdown report for a finished (or failed) workflow result.
+
+    Args:
+        query (str): Query text.
+        selected_agents (list[str]): Agents chosen by TeamFormationAgent.
+        result (dict): Final workflow state.
+
+    Returns:
+        str: Report with the final synthesis (or the last message) and references.
+    """
+    # Generate the report content in Markdown format
+    report_content = report_header(query, selected_agents)
+    report_content += f"**Routes:** {result.get('routes', 'N/A')}\n\n"
+    # Retrieve final synthesis from result, fallback to last message content if not present
+    final_synth = result.get("final_synthesis")
+    if not final_synth:
+        # Use the last AIMessage content if no final_synthesis
+        messages = result.get("messages", [])
+        for msg in reversed(messages):
+            if hasattr(msg, 'content') and msg.content.strip():
+                final_synth = msg.content
+                break
+    report_content += (final_synth or "No synthesis available.") + "\n\n"
+
+    # Append References section if sources are available
+    sources = result.get("sources", [])
+    if sources:
+        report_content += "### References\n"
+        for i, source in enumerate(sources, 1):
+            title = source.get("title", "Unknown Title")
+            url = source.get("url", "Unknown URL")
+            report_content += f"{i}. {title} - {url}\n"
+        report_content += "\n"
+
+    # report_content += """
+    # **Privacy:** Ephemeral RAG; zero retention.
+    # **Disclaimer:** Not legal advice. Models have caveats (e.g. IIA assumption). Verify 2025 data.
+    # **LaTeX:** Inline $x$, display $$E=mc^2$$.
+    # """
+    return report_content
+
+def run_query(query: str, files: list[str] | None = None, output_dir: str = "./outputs",
+              debate: bool = False, verbose: bool = False, run_id: str | None = None,
+              on_event: Callable[[dict], None] | None = None, workflows: dict | None = None,
+              stream: bool = False, selected_agents: list[str] | None = None, mode: str | None = None,
+              resume: bool = False) -> dict:
+    """Runs one query end to end and writes its report to output_dir.
+
+    Selects the agents with TeamFormationAgent, builds the workflow, converts
+    the uploads, invokes the workflow and writes the Markdown report, its
+    metrics and (if Pandoc is available) the PDF. Agents, provider clients and
+    caches are process-wide, so repeated calls (e.g. from run_batch) reuse them.
+    With CHECKPOINT_ENABLED the workflow state is checkpointed under run_id
+    after every step, and the run is recorded so resume_run can continue it.
 
-    # Run TeamFormationAgent to select agents based on query
-    logger.info("Running TeamFormationAgent...")
+    Args:
+        query (str): Query text.
+        files (list[str] | None): PDF uploads to convert and pass to the agents.
+        output_dir (str): Directory for the report, metrics and PDF.
+        debate (bool): Force the debate module.
+        verbose (bool): Print progress and log the full workflow result.
+        run_id (str | None): Run id for telemetry and per-run tool state (default: a new id).
+        on_event (Callable[[dict], None] | None): Receives progress events: the run's
+            telemetry events (see telemetry.RunMetrics.subscribe) plus teamformation,
+            upload and report stage events.
+        workflows (dict | None): Cache of compiled workflows keyed by the selected
+            agents, for callers that run many queries in one process.
+        stream (bool): Run the workflow via workflow.stream: agent outputs and
+            synthesis tokens are written to the report as they arrive (and
+            synthesis tokens emitted as token events). A failed run keeps this
+            partial report; a successful one replaces it with the final report.
+        selected_agents (list[str] | None): Skip TeamFormationAgent and use these agents.
+        mode (str | None): Execution mode (default: EXECUTION_MODE).
+        resume (bool): Continue the checkpointed run run_id instead of starting
+            from the query (see checkpoints.resume_config); uploads are not
+            converted again.
+
+    Returns:
+        dict: Run summary with run_id, status ("ok", or "failed" when the workflow
+        raised and an error report was written), error, report path, the
+        per-stage timings in seconds and the uploads (file, ok, error, seconds).
+
+    Raises:
+        AgentError: If TeamFormationAgent fails or its output cannot be parsed.
+        ConfigurationError: If resume is set but checkpointing is unavailable.
+        WorkflowError: If the workflow cannot be created.
+        FileProcessingError: If the report cannot be written.
+    """
+    run_id = run_id or new_run_id()
+    pending_uploads: list[Future] = []
     try:
-        team_result = agents["teamformation"].invoke({"messages": [HumanMessage(content=f"{args.query}\n\nForce debate: {args.debate}")]})
-        selected_agents = json.loads(team_result["messages"][-1].content)
-        logger.info("Selected agents: %s", selected_agents)
-    except json.JSONDecodeError as e:
-        logger.error("Failed to parse teamformation output: %s", str(e), exc_info=True)
-        raise AgentError(f"TeamFormation agent output parsing failed: {e}") from e
-    except Exception as e:
-        logger.error("Error in TeamFormationAgent: %s", str(e), exc_info=True)
-        raise AgentError(f"TeamFormation agent failed: {e}") from e
+        return _run_query(query, files, output_dir, debate, verbose, run_id, on_event, workflows, stream,
+                          selected_agents, mode, resume, pending_uploads)
+    finally:
+        # Whatever failed (TeamFormation, workflow creation, the report), stop the conversions that
+        # have not started and release the run: telemetry listeners, kernels, attached documents
+        for future in pending_uploads:
+            future.cancel()  # no-op for finished conversions
+        end_run(run_id)
+
+def _run_query(query: str, files: list[str] | None, output_dir: str, debate: bool, verbose: bool, run_id: str,
+               on_event: Callable[[dict], None] | None, workflows: dict | None, stream: bool,
+               selected_agents: list[str] | None, mode: str | None, resume: bool,
+               pending_uploads: list[Future]) -> dict:
+    """Body of run_query; run_query ends the run and cancels pending_uploads however this returns or raises."""
+    logger = logging.getLogger(__name__)
+    from graph import create_workflow
+    from agents import agents
+    from tools.document_store import describe_documents, get_document_store
+    import checkpoints
+    import config
+
+    timings = {}  # seconds per stage
+    uploads = []  # per-file conversion results
+    status, error = "ok", None
+    stage_start = time.perf_counter()
+
+    # Telemetry for the whole run, TeamFormation and uploads included (written as metrics_<timestamp>.json)
+    metrics = get_metrics(run_id)
+    if on_event:
+        metrics.subscribe(on_event)
+
+    documents = get_document_store()
+
+    # Checkpoint the workflow state under the run id (None when checkpointing is off)
+    store = checkpoints.get_checkpoint_store()
+    if resume and store is None:
+        raise ConfigurationError("Resuming a run requires CHECKPOINT_ENABLED and langgraph-checkpoint-sqlite")
+    mode = mode or config.EXECUTION_MODE
+
+    # Start converting the uploads now, so OCR overlaps agent selection and workflow creation
+    if files and not resume:
+        pending_uploads.extend(convert_uploads(files, run_id))
+
+    if selected_agents is None:
+        # Run TeamFormationAgent to select agents based on query
+        logger.info("Running TeamFormationAgent...")
+        try:
+            with bind_run(run_id), agent_scope("teamformation"):
+                team_result = agents["teamformation"].invoke({"messages": [HumanMessage(content=f"{query}\n\nForce debate: {debate}")]})
+            selected_agents = json.loads(team_result["messages"][-1].content)
+            logger.info("Selected agents: %s", selected_agents)
+        except json.JSONDecodeError as e:
+            logger.error("Failed to parse teamformation output: %s", str(e), exc_info=True)
+            raise AgentError(f"TeamFormation agent output parsing failed: {e}") from e
+        except Exception as e:
+            logger.error("Error in TeamFormationAgent: %s", str(e), exc_info=True)
+            raise AgentError(f"TeamFormation agent failed: {e}") from e
+    timings["teamformation"] = time.perf_counter() - stage_start
+    metrics.emit("teamformation", agents=selected_agents)
 
     # Create workflow with selected agents
     try:
-        workflow = create_workflow(selected_agents)
+        checkpointer = store.saver if store else None
+        if workflows is None:
+            workflow = create_workflow(selected_agents, mode, checkpointer=checkpointer)
+        else:
+            key = (tuple(selected_agents), mode, checkpointer is not None)
+            if key not in workflows:
+                workflows[key] = create_workflow(selected_agents, mode, checkpointer=checkpointer)
+            workflow = workflows[key]
     except WorkflowError as e:
         logger.error("Workflow creation failed: %s", str(e), exc_info=True)
         raise
@@ -195,46 +365,85 @@ def main():
         raise WorkflowError(f"Unexpected workflow creation error: {e}") from e
 
     # Prepare output directory and timestamp
-    output_dir = Path(args.output_dir)
-    output_dir.mkdir(exist_ok=True)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if store:
+        store.save_run(run_id, query=query, files=files or [], debate=debate, selected_agents=selected_agents,
+                       mode=mode, output_dir=str(output_dir), status="running")
 
     # Initialize state dictionary for workflow
     state = {
-        "messages": [HumanMessage(content=f"{args.query}\n\nSelected agents: {json.dumps(selected_agents)}\n\nForce debate: {args.debate}")],
+        "messages": [HumanMessage(content=f"{query}\n\nSelected agents: {json.dumps(selected_agents)}\n\nForce debate: {debate}")],
         "documents": [],
         "routes": [],
         "final_synthesis": "",
         "iteration_count": 0,
         "routing_history": [],
-        "force_debate": args.debate,
+        "force_debate": debate,
         "sources": [],
         "debate_round": 0,
         "debate_count": 0,
     }
 
-    # Process uploaded files if provided
-    if args.file:
-        for file_path in args.file:
-            if args.verbose: print(f"Processing upload: {file_path}")
-            try:
-                md_content = convert_pdf_file(file_path)
-                if md_content.startswith(("File not found", "Invalid PDF", "OCR error")):
-                    logger.warning(f"Upload processing failed: {md_content}")
-                else:
-                    state["documents"].append(md_content)
-                    logger.info(f"Successfully processed upload: {file_path}")
-            except (OSError, ValueError) as e:
-                logger.warning(f"Upload error: {e}")
+    # Where to start: the query, or the run's checkpoints when resuming
+    graph_config = checkpoints.thread_config(run_id) if store else None
+    start = state
+    if resume:
+        try:
+            graph_config = checkpoints.resume_config(workflow, run_id)
+            state, start = workflow.get_state(checkpoints.thread_config(run_id)).values, None
+        except ConfigurationError:
+            logger.warning("Run %s has no checkpoints; starting it over", run_id)
+
+    # Collect the converted uploads in their original order (a resumed run has them in its checkpoints)
+    stage_start = time.perf_counter()
+    if files and start is not None:
+        if not pending_uploads:  # resuming a run that has no checkpoints
+            pending_uploads.extend(convert_uploads(files, run_id))
+        for future in pending_uploads:
+            upload = future.result()
+            if verbose: print(f"Processed upload: {upload['file']} ({upload['seconds']:.1f}s)")
+            if upload["ok"]:
+                # Chunked and indexed; the state keeps a descriptor, agents search the text
+                state["documents"].append(documents.ingest(upload["content"], Path(upload["file"]).name,
+                                                           source=upload["file"]))
+                logger.info("Successfully processed upload: %s (%.1fs)", upload["file"], upload["seconds"])
+            else:
+                logger.warning("Upload processing failed: %s", upload["error"])
+            metrics.emit("upload", file=upload["file"], ok=upload["ok"], error=upload["error"],
+                         seconds=round(upload["seconds"], 3))
+            uploads.append({k: v for k, v in upload.items() if k != "content"})
+        if state["documents"]:
+            state["messages"][0] = HumanMessage(
+                content=f"{state['messages'][0].content}\n\n{describe_documents(state['documents'])}")
+    # search_documents/read_chunk see the documents attached to this run
+    documents.attach(run_id, [d["doc_id"] for d in state.get("documents") or [] if isinstance(d, dict)])
+    timings["uploads"] = time.perf_counter() - stage_start  # waiting for conversions after agent selection
 
     # Invoke the workflow with the prepared state
-    logger.info("Invoking workflow...")
+    stage_start = time.perf_counter()
+    md_path = output_dir / f"report_{timestamp}.md"
+    draft = None
+    logger.info("Invoking workflow (run %s)...", run_id)
     try:
         # raise ValueError("Simulated workflow error")  # Uncomment to test
-        result = workflow.invoke(state)
+        with bind_run(run_id):
+            if start is None and graph_config is None:
+                logger.info("Run %s already finished; writing its report again", run_id)
+                result = state
+            elif stream:
+                # Agent outputs and synthesis tokens go to the report file as they are produced
+                draft = StreamingReport(md_path, report_header(query, selected_agents))
+                result = stream_workflow(workflow, start, draft, config=graph_config,
+                                         on_token=lambda node, text: metrics.emit("token", node=node, text=text))
+            else:
+                result = workflow.invoke(start, graph_config)
         logger.info("Workflow invoked successfully")
+        logger.info("Agents materialized: %s", agents.materialized())
     except (ValueError, KeyError, RuntimeError, TypeError) as e:
         logger.error(f"Workflow invoke error: {e}")
+        status, error = "failed", str(e)
         result = {
             "messages": state["messages"] + [AIMessage(content=f"**Error:** {str(e)}\nReflected: See caveats.")],
             "final_synthesis": f"Error occurred: {e}. Reflection: Check logs/caveats.",
@@ -242,54 +451,35 @@ def main():
         }
     except Exception as e:
         logger.error(f"Unexpected workflow invoke error: {e}")
+        status, error = "failed", str(e)
         result = {
             "messages": state["messages"] + [AIMessage(content=f"**Unexpected Error:** {str(e)}\nReflected: See caveats.")],
             "final_synthesis": f"Unexpected error occurred: {e}. Reflection: Check logs/caveats.",
             "routes": getattr(state, "routes", [])
         }
 
-    if args.verbose:
-        logger.debug(f"Workflow result: {result}")
+    timings["workflow"] = time.perf_counter() - stage_start
 
-    # Generate the report content in Markdown format
-    report_content = "# CompeteGrok Analysis Report\n\n"
-    report_content += f"**Query:** {args.query}\n\n"
-    report_content += f"**Selected Agents:** {selected_agents}\n\n"
-    report_content += f"**Timestamp:** {datetime.now()}\n\n"
-    report_content += f"**Routes:** {result.get('routes', 'N/A')}\n\n"
-    # Retrieve final synthesis from result, fallback to last message content if not present
-    final_synth = result.get("final_synthesis")
-    if not final_synth:
-        # Use the last AIMessage content if no final_synthesis
-        messages = result.get("messages", [])
-        for msg in reversed(messages):
-            if hasattr(msg, 'content') and msg.content.strip():
-                final_synth = msg.content
-                break
-    report_content += (final_synth or "No synthesis available.") + "\n\n"
-
-    # Append References section if sources are available
-    sources = result.get("sources", [])
-    if sources:
-        report_content += "### References\n"
-        for i, source in enumerate(sources, 1):
-            title = source.get("title", "Unknown Title")
-            url = source.get("url", "Unknown URL")
-            report_content += f"{i}. {title} - {url}\n"
-        report_content += "\n"
+    if verbose:
+        logger.debug(f"Workflow result: {result}")
 
-    # report_content += """
-    # **Privacy:** Ephemeral RAG; zero retention.
-    # **Disclaimer:** Not legal advice. Models have caveats (e.g. IIA assumption). Verify 2025 data.
-    # **LaTeX:** Inline $x$, display $$E=mc^2$$.
-    # """
+    stage_start = time.perf_counter()
 
     # Write the report to Markdown file
-    md_path = output_dir / f"report_{timestamp}.md"
     try:
-        with open(md_path, "w", encoding="utf-8") as f:
-            f.write(report_content)
+        if draft is None:
+            with open(md_path, "w", encoding="utf-8") as f:
+                f.write(build_report(query, selected_agents, result))
+        elif status == "ok":
+            draft.finalize(build_report(query, selected_agents, result))
+        else:
+            draft.fail(error)  # keep the outputs streamed before the failure
         logger.info("Report written to %s", md_path)
+        metrics_path = metrics.write(output_dir / f"metrics_{timestamp}.json")
+        totals = metrics.to_dict()["totals"]
+        logger.info("Metrics written to %s (%.1fs, %d LLM calls, %d tool calls, %d tokens in / %d out)",
+                    metrics_path, totals["wall_seconds"], totals["llm_calls"], totals["tool_calls"],
+                    totals["input_tokens"], totals["output_tokens"])
     except (OSError, IOError) as e:
         logger.error("Failed to write report to %s: %s", md_path, str(e), exc_info=True)
         raise FileProcessingError(f"Report writing failed: {e}") from e
@@ -325,6 +515,249 @@ def main():
         logger.error(f"PDF generation failed: {stderr_msg}. MD available: {md_path}")
     except FileNotFoundError:
         logger.error(f"Pandoc not found. Install from https://pandoc.org/. MD available: {md_path}")
+    timings["report"] = time.perf_counter() - stage_start
+    metrics.emit("report", path=str(md_path), status=status)
+    if store:
+        failed = status != "ok" or bool(result.get("last_error"))
+        store.save_run(run_id, status="failed" if failed else "completed", report=str(md_path))
+        if failed:
+            logger.info("Run %s is checkpointed; continue it with: python app.py --resume %s", run_id, run_id)
+
+    return {"run_id": run_id, "status": status, "error": error, "report": str(md_path),
+            "timings": timings, "totals": totals, "uploads": uploads}
+
+def resume_run(run_id: str, verbose: bool = False, on_event: Callable[[dict], None] | None = None,
+               stream: bool = False) -> dict:
+    """Continues a checkpointed run from its last completed node and writes a new report.
+
+    The query, uploads, agents, execution mode and output directory are those
+    recorded for the run (see checkpoints.py); TeamFormationAgent and the
+    agents that already finished are not run again.
+
+    Args:
+        run_id (str): Id of the run to continue (logged by run_query, listed by `python -m checkpoints list`).
+        verbose (bool): Passed on to run_query.
+        on_event (Callable[[dict], None] | None): Passed on to run_query.
+        stream (bool): Passed on to run_query.
+
+    Returns:
+        dict: The run summary (see run_query).
+
+    Raises:
+        ConfigurationError: If checkpointing is unavailable or run_id is unknown.
+    """
+    import checkpoints
+    import config
+    store = checkpoints.get_checkpoint_store()
+    run = store.get_run(run_id) if store else None
+    if run is None:
+        raise ConfigurationError(f"No checkpointed run {run_id} in {config.CHECKPOINT_PATH}")
+    return run_query(run["query"], run["files"], run["output_dir"], debate=run["debate"], verbose=verbose,
+                     run_id=run_id, on_event=on_event, stream=stream, selected_agents=run["selected_agents"],
+                     mode=run["mode"], resume=True)
+
+BATCH_SUMMARY_FIELDS = ["query_file", "status", "error", "report", "run_id", "seconds", "teamformation_seconds",
+                        "uploads_seconds", "workflow_seconds", "report_seconds", "llm_calls", "tool_calls",
+                        "input_tokens", "output_tokens", "cost_usd", "retries", "cache_hits"]
+
+def resolve_batch(spec: str) -> list[Path]:
+    """Query files for --batch: the .txt files in a directory, or the files matching a glob."""
+    if os.path.isdir(spec):
+        return sorted(Path(spec).glob("*.txt"))
+    return sorted(Path(p) for p in glob.glob(spec, recursive=True) if os.path.isfile(p))
+
+def run_batch(query_files: list[Path], output_dir: str = "./outputs", workers: int | None = None,
+              debate: bool = False, verbose: bool = False, stream: bool = False) -> Path:
+    """Runs many query files concurrently and writes a summary CSV.
+
+    Queries run in a bounded thread pool within this process, so interpreter
+    startup, agent construction, compiled workflows, provider connection pools
+    and the OCR/LLM caches are paid for once and shared. Each query writes its report to
+    output_dir/<query file stem>/. A failing query is recorded in the summary
+    and does not stop the batch.
+
+    Args:
+        query_files (list[Path]): Query .txt files (see parse_query_file).
+        output_dir (str): Parent directory of the per-query output directories.
+        workers (int | None): Queries in flight (default: BATCH_WORKERS).
+        debate (bool): Force the debate module for every query.
+        verbose (bool): Passed on to run_query.
+        stream (bool): Write each report incrementally (see run_query); progress is not printed.
+
+    Returns:
+        Path: The summary CSV (batch_summary_<timestamp>.csv in output_dir), one
+        row per query file in input order.
+    """
+    logger = logging.getLogger(__name__)
+    import config
+    workers = workers or config.BATCH_WORKERS
+    output_root = Path(output_dir)
+    output_root.mkdir(parents=True, exist_ok=True)
+
+    # One output directory per query; suffix repeated stems (same name in different directories)
+    out_dirs, seen = [], {}
+    for query_file in query_files:
+        seen[query_file.stem] = seen.get(query_file.stem, 0) + 1
+        name = query_file.stem if seen[query_file.stem] == 1 else f"{query_file.stem}_{seen[query_file.stem]}"
+        out_dirs.append(output_root / name)
+    workflows: dict = {}  # compiled workflows, shared by queries that select the same agents
+
+    def run_one(query_file: Path, out_dir: Path) -> dict:
+        row = {"query_file": str(query_file)}
+        started = time.perf_counter()
+        try:
+            query, files = parse_query_file(query_file)
+            if not query:
+                raise ValueError("Query cannot be empty.")
+            missing = [f for f in files if not os.path.isfile(f)]
+            if missing:
+                raise FileNotFoundError(f"File does not exist: {', '.join(missing)}")
+            out_dir.mkdir(parents=True, exist_ok=True)
+            summary = run_query(query, files, str(out_dir), debate=debate, verbose=verbose, workflows=workflows,
+                                stream=stream)
+            row.update(status=summary["status"], error=summary["error"], report=summary["report"],
+                       run_id=summary["run_id"])
+            row.update({f"{stage}_seconds": round(seconds, 3) for stage, seconds in summary["timings"].items()})
+            row.update({key: summary["totals"][key] for key in BATCH_SUMMARY_FIELDS if key in summary["totals"]})
+        except Exception as e:
+            logger.error("Batch query %s failed: %s", query_file, e, exc_info=verbose)
+            row.update(status="error", error=str(e))
+        row["seconds"] = round(time.perf_counter() - started, 3)
+        return row
+
+    logger.info("Running %d queries with %d workers", len(query_files), workers)
+    rows = [None] * len(query_files)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as pool:
+        futures = {pool.submit(run_one, query_file, out_dir): index
+                   for index, (query_file, out_dir) in enumerate(zip(query_files, out_dirs))}
+        for done, future in enumerate(as_completed(futures), 1):
+            row = rows[futures[future]] = future.result()
+            logger.info("[%d/%d] %s: %s in %.1fs", done, len(query_files), row["query_file"], row["status"],
+                        row["seconds"])
+
+    summary_path = output_root / f"batch_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    with open(summary_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=BATCH_SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    failed = sum(row["status"] != "ok" for row in rows)
+    logger.info("Batch finished: %d ok, %d failed; summary written to %s", len(rows) - failed, failed, summary_path)
+    return summary_path
+
+def main():
+    # Set up command-line argument parser
+    parser = argparse.ArgumentParser(description="CompeteGrok: IO Economics AI")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--query", type=str, help="Query text or path to .txt file (multi-line)")
+    source.add_argument("--batch", type=str, metavar="DIR|GLOB",
+                        help="Run every query .txt file in a directory (or matching a glob) concurrently")
+    source.add_argument("--serve", nargs="?", const="", default=None, metavar="[HOST:]PORT",
+                        help="Serve queries over a local HTTP/JSON API with warm agents (default: SERVE_HOST:SERVE_PORT)")
+    source.add_argument("--resume", type=str, metavar="RUN_ID",
+                        help="Continue a checkpointed run from its last completed node")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Concurrent queries in --batch/--serve mode (default: BATCH_WORKERS/SERVE_WORKERS)")
+    parser.add_argument("--file", type=str, nargs="*", help="PDF/Excel uploads for RAG")
+    parser.add_argument("--verbose", action="store_true", help="Verbose output")
+    parser.add_argument("--log-level", type=str, default=None, choices=["DEBUG", "INFO", "WARNING", "ERROR"], help="Set logging level")
+    parser.add_argument("--output-dir", type=str, default="./outputs", help="Output dir")
+    parser.add_argument("--debate", action="store_true", help="Force debate module regardless of supervisor routing")
+    parser.add_argument("--stream", action="store_true",
+                        help="Print node and tool events as they happen and write the report incrementally")
+    parser.add_argument("--llm-cache", type=str, default=None, choices=["record", "replay", "passthrough"],
+                        help="LLM record/replay cassette mode (default: LLM_CACHE_MODE)")
+    parser.add_argument("--cassette", type=str, default=None, help="LLM cassette file (default: LLM_CASSETTE_PATH)")
+    args = parser.parse_args()
+
+    # Validate user inputs
+    if args.query is not None and not args.query.strip():
+        parser.error("Query cannot be empty.")
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1.")
+
+    if args.serve is not None:
+        if args.file:
+            parser.error("--file cannot be combined with --serve; send uploads with each query.")
+        try:
+            from server import parse_address
+            parse_address(args.serve)
+        except ValueError:
+            parser.error(f"Invalid --serve address: {args.serve}")
+
+    if args.resume is not None and args.file:
+        parser.error("--file cannot be combined with --resume; the run's uploads are in its checkpoints.")
+
+    if args.batch:
+        if args.file:
+            parser.error("--file cannot be combined with --batch; list uploads under FILES: in each query file.")
+        query_files = resolve_batch(args.batch)
+        if not query_files:
+            parser.error(f"No query files found for --batch {args.batch}")
+
+    if args.file:
+        for file_path in args.file:
+            if not os.path.isfile(file_path):
+                parser.error(f"File does not exist: {file_path}")
+
+    if not os.path.isdir(args.output_dir):
+        try:
+            os.makedirs(args.output_dir, exist_ok=True)
+        except OSError as e:
+            parser.error(f"Cannot create output directory: {e}")
+
+    # Configure logging based on arguments
+    from compete_logging import setup_logging
+    log_level_str = args.log_level or ('DEBUG' if args.verbose else 'INFO')
+    setup_logging(log_level_str)
+    logger = logging.getLogger(__name__)
+    import config
+    for warning in config.missing_api_key_warnings():
+        logger.warning(warning)
+    # Agents are built on first use, so the cassette settings apply to all of them
+    if args.llm_cache:
+        config.LLM_CACHE_MODE = args.llm_cache
+    if args.cassette:
+        config.LLM_CASSETTE_PATH = args.cassette
+
+    if args.serve is not None:
+        from server import serve
+        serve(args.serve, args.output_dir, args.workers)
+        return
+
+    if args.resume is not None:
+        try:
+            resume_run(args.resume, verbose=args.verbose, on_event=print_progress if args.stream else None,
+                       stream=args.stream)
+        except ConfigurationError as e:
+            parser.error(str(e))
+        return
+
+    if args.batch:
+        summary_path = run_batch(query_files, args.output_dir, args.workers, debate=args.debate, verbose=args.verbose,
+                                 stream=args.stream)
+        print(f"Batch summary: {summary_path}")
+        return
+
+    # If query argument ends with .txt, treat it as a file path and parse it
+    if args.query.endswith('.txt'):
+        query_path = Path(args.query)
+        if query_path.exists():
+            args.query, file_paths = parse_query_file(query_path)
+            # Update args.file with parsed file paths if any
+            if file_paths:
+                if args.file is None:
+                    args.file = file_paths
+                else:
+                    args.file.extend(file_paths)
+            # Log the file loading if verbose mode
+            if args.verbose:
+                print(f"Loaded and parsed query from file: {query_path}")
+        else:
+            raise ValueError(f"Query file not found: {args.query}")
+
+    run_query(args.query, args.file, args.output_dir, debate=args.debate, verbose=args.verbose,
+              on_event=print_progress if args.stream else None, stream=args.stream)
 
     if args.verbose:
         logger.info("Done.")
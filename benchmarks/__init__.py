@@ -0,0 +1,4 @@
+"""End-to-end workflow benchmarks with scripted fake LLM and provider backends.
+
+Run `python -m benchmarks.workflow --help`. See fakes.py for the scripted model and backends.
+"""
@@ -0,0 +1,441 @@
+"""Local HTTP stand-ins for the external providers, with fault injection.
+
+Each StandInServer speaks enough of one provider's wire format for the real
+SDK client to work against it:
+
+- xai:       POST /v1/chat/completions (OpenAI-compatible, streamed or not; used by ChatOpenAI)
+- tavily:    POST /search, POST /extract
+- linkup:    POST /v1/search, POST /v1/fetch
+- mistral:   POST /v1/ocr (inline documents)
+- publisher: GET/HEAD /papers/<n>.pdf (text layer), /scans/<n>.pdf (image-only,
+             needs OCR) and /articles/<n> (HTML). Search results link here, so
+             fetch_paper_content, tavily_extract's URL check and
+             convert_pdf_url stay local.
+
+A FaultProfile adds latency (lognormal around a median), random 403/429/5xx
+responses in each provider's error format, and a token-bucket rate limit that
+answers 429 with Retry-After. The retry logic in tools/wrappers.py,
+tavily_extract, fetch_paper_content and the SDKs themselves can then be
+measured against a degraded provider without network access or quota.
+
+stand_ins() starts all five servers and points config.py's *_BASE_URL
+settings (and dummy API keys) at them for the duration of a block. The
+command line serves them until interrupted and prints the environment to use:
+
+    python -m benchmarks.fake_servers --latency-ms 300 --latency-sigma 0.5 --errors 429=0.1,503=0.05 --rate-limit 20
+"""
+
+import argparse
+import base64
+import json
+import math
+import random
+import re
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, Optional
+from unittest.mock import patch
+
+PROVIDERS = ("xai", "tavily", "linkup", "mistral", "publisher")
+
+# config.py setting -> provider, and the path prefix the SDK expects in its base URL
+BASE_URL_SETTINGS = {
+    "XAI_BASE_URL": ("xai", "/v1"),
+    "TAVILY_BASE_URL": ("tavily", ""),
+    "LINKUP_BASE_URL": ("linkup", "/v1"),
+    "MISTRAL_BASE_URL": ("mistral", ""),
+}
+API_KEY_SETTINGS = ("XAI_API_KEY", "TAVILY_API_KEY", "LINKUP_API_KEY", "MISTRAL_API_KEY")
+
+
+@dataclass
+class FaultProfile:
+    """Degradation applied to every request of a stand-in server."""
+
+    latency_ms: float = 0.0  # median latency
+    latency_sigma: float = 0.0  # lognormal shape; 0 = fixed, 0.5 puts p95 at ~2.3x the median
+    errors: Dict[int, float] = field(default_factory=dict)  # status -> probability, e.g. {429: 0.1, 503: 0.05}
+    rate_limit: Optional[float] = None  # sustained requests/second, None = unlimited
+    burst: Optional[int] = None  # bucket size; defaults to one second of rate_limit
+    seed: Optional[int] = None
+
+    def sample_latency(self, rng: random.Random) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        if self.latency_sigma <= 0:
+            return self.latency_ms / 1000
+        return rng.lognormvariate(math.log(self.latency_ms), self.latency_sigma) / 1000
+
+    def sample_error(self, rng: random.Random) -> Optional[int]:
+        draw, cumulative = rng.random(), 0.0
+        for status, probability in sorted(self.errors.items()):
+            cumulative += probability
+            if draw < cumulative:
+                return status
+        return None
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[int]):
+        self.rate = rate
+        self.capacity = float(capacity or max(1, math.ceil(rate)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> Optional[float]:
+        """Consume a token; returns None, or the seconds until one is available."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return None
+            return (1 - self.tokens) / self.rate
+
+
+def sample_pdf(pages: int = 2, scanned: bool = False) -> bytes:
+    """Small valid PDF: pages with a text layer, or image-only pages that need OCR."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+               b"<< /Type /XObject /Subtype /Image /Width 1 /Height 1 /ColorSpace /DeviceGray "
+               b"/BitsPerComponent 8 /Length 1 >>\nstream\n\x80\nendstream"]
+    kids = []
+    for number in range(1, pages + 1):
+        if scanned:
+            content = b"q 612 0 0 792 0 0 cm /Im1 Do Q"
+        else:
+            lines = [f"Page {number}: merger retrospective, market shares 40/30/30, HHI 3400."] * 6
+            content = b"BT /F1 11 Tf 72 720 Td 14 TL " + b" ".join(f"({line}) '".encode() for line in lines) + b" ET"
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        contents_ref = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+                       b"/Resources << /Font << /F1 3 0 R >> /XObject << /Im1 4 0 R >> >> >>" % contents_ref)
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def _count_pdf_pages(document_url: str) -> int:
+    """Pages of an inline (data URI) PDF; 1 when it cannot be told, e.g. for signed upload URLs."""
+    if not document_url.startswith("data:"):
+        return 1
+    try:
+        pdf = base64.b64decode(document_url.split(",", 1)[1])
+    except (IndexError, ValueError):
+        return 1
+    return max(1, len(re.findall(rb"/Type\s*/Page(?!s)", pdf)))
+
+
+def default_chat_responder(request: dict) -> str:
+    """Assistant reply for a chat completion request.
+
+    TeamFormation gets an agent list. Every other agent gets one JSON object
+    that passes the graph's output checks (EconPaperOutput, CaseLawOutput,
+    VerifierOutput), the arbiter's should_continue parsing and the remediation
+    decision. Load tests therefore run through the whole graph.
+    """
+    system = next((m.get("content") for m in request.get("messages", []) if m.get("role") == "system"), "") or ""
+    if "TeamFormationAgent" in str(system):
+        return json.dumps(["econpaper", "econquant", "caselaw", "verifier", "synthesis"])
+    return json.dumps({"papers": [], "cases": [], "citations": [], "should_continue": False,
+                       "action": "fallback", "reason": "stand-in response"})
+
+
+def _error_body(provider: str, status: int) -> dict:
+    message = f"Injected {status} from the {provider} stand-in"
+    if provider == "tavily":
+        return {"detail": {"error": message}}
+    if provider == "linkup":
+        return {"statusCode": status, "error": {"code": "STAND_IN_ERROR", "message": message, "details": []}}
+    if provider == "mistral":
+        return {"object": "error", "message": message, "type": "stand_in_error", "code": str(status)}
+    return {"error": {"message": message, "type": "stand_in_error", "code": status}}
+
+
+class StandInServer:
+    """One provider stand-in on a local port, served from a daemon thread."""
+
+    def __init__(self, provider: str, faults: Optional[FaultProfile] = None, host: str = "127.0.0.1",
+                 port: int = 0, links_base: Optional[str] = None,
+                 chat_responder: Callable[[dict], str] = default_chat_responder):
+        if provider not in PROVIDERS:
+            raise ValueError(f"Unknown provider {provider!r}; expected one of {PROVIDERS}")
+        self.provider = provider
+        self.faults = faults or FaultProfile()
+        self.links_base = links_base  # publisher URL that search results link to
+        self.chat_responder = chat_responder
+        self._rng = random.Random(self.faults.seed)
+        self._rng_lock = threading.Lock()
+        self._bucket = _TokenBucket(self.faults.rate_limit, self.faults.burst) if self.faults.rate_limit else None
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, int] = {}
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.stand_in = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name=f"stand-in-{self.provider}",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:  # shutdown() waits for serve_forever, which only start() runs
+            self._httpd.shutdown()
+            self._thread = None
+        self._httpd.server_close()
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def respond(self, method: str, path: str, body: bytes) -> tuple[int, dict, bytes]:
+        """(status, headers, body) for one request, after rate limiting, fault injection and latency."""
+        self._count("requests")
+        if self._bucket is not None:
+            wait = self._bucket.take()
+            if wait is not None:
+                self._count("429")
+                self._count("rate_limited")
+                return self._json(429, _error_body(self.provider, 429), {"Retry-After": str(math.ceil(wait))})
+        with self._rng_lock:
+            delay = self.faults.sample_latency(self._rng)
+            error = self.faults.sample_error(self._rng)
+        if delay:
+            time.sleep(delay)
+        if error is not None:
+            self._count(str(error))
+            headers = {"Retry-After": "1"} if error == 429 else {}
+            return self._json(error, _error_body(self.provider, error), headers)
+        try:
+            request = json.loads(body) if body else {}
+        except ValueError:
+            request = {}
+        status, headers, payload = getattr(self, f"_route_{self.provider}")(method, path.split("?")[0], request)
+        self._count(str(status))
+        return status, headers, payload
+
+    @staticmethod
+    def _json(status: int, payload: dict, headers: Optional[dict] = None) -> tuple[int, dict, bytes]:
+        return status, {"Content-Type": "application/json", **(headers or {})}, json.dumps(payload).encode()
+
+    def _not_found(self) -> tuple[int, dict, bytes]:
+        return self._json(404, _error_body(self.provider, 404))
+
+    def _link(self, kind: str, number: int) -> str:
+        base = self.links_base or "https://stand-in.invalid"
+        return f"{base}/{kind}/{number}.pdf" if kind != "articles" else f"{base}/articles/{number}"
+
+    def _route_xai(self, method: str, path: str, request: dict) -> tuple[int, dict, bytes]:
+        if method != "POST" or not path.endswith("/chat/completions"):
+            return self._not_found()
+        content = self.chat_responder(request)
+        prompt_tokens = sum(len(str(m.get("content") or "")) for m in request.get("messages", [])) // 4
+        completion_tokens = len(content) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        base = {"id": f"chatcmpl-standin-{self.stats.get('requests', 0)}", "created": int(time.time()),
+                "model": request.get("model", "stand-in")}
+        if request.get("stream"):
+            return self._sse_completion(base, content, usage, (request.get("stream_options") or {}).get("include_usage"))
+        return self._json(200, {
+            **base, "object": "chat.completion",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        })
+
+    @staticmethod
+    def _sse_completion(base: dict, content: str, usage: dict, include_usage: bool) -> tuple[int, dict, bytes]:
+        """Streamed chat completion: one chunk per few words, as server-sent events."""
+        def chunk(delta: dict, finish_reason: Optional[str] = None) -> dict:
+            return {**base, "object": "chat.completion.chunk",
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+
+        pieces = re.findall(r"\S+\s*|\s+", content) or [""]
+        events = [chunk({"role": "assistant", "content": ""})]
+        events += [chunk({"content": "".join(pieces[i:i + 4])}) for i in range(0, len(pieces), 4)]
+        events.append(chunk({}, "stop"))
+        if include_usage:
+            events.append({**base, "object": "chat.completion.chunk", "choices": [], "usage": usage})
+        body = "".join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+        return 200, {"Content-Type": "text/event-stream"}, body.encode()
+
+    def _route_tavily(self, method: str, path: str, request: dict) -> tuple[int, dict, bytes]:
+        if method == "POST" and path == "/search":
+            query = str(request.get("query", ""))
+            count = int(request.get("max_results") or 5)
+            results = [{"title": f"Stand-in result {i} for {query[:60]}", "url": self._link("papers", i),
+                        "content": "Merger retrospective evidence on prices and output. " * 8, "score": 0.9 - i / 100}
+                       for i in range(1, count + 1)]
+            return self._json(200, {"query": query, "results": results, "response_time": 0.01})
+        if method == "POST" and path == "/extract":
+            urls = request.get("urls") or []
+            urls = [urls] if isinstance(urls, str) else urls
+            return self._json(200, {"results": [{"url": url, "raw_content": "# Extracted\n" + "Body text. " * 300}
+                                                for url in urls], "failed_results": []})
+        return self._not_found()
+
+    def _route_linkup(self, method: str, path: str, request: dict) -> tuple[int, dict, bytes]:
+        if method == "POST" and path == "/v1/search":
+            results = [{"type": "text", "name": f"Deep result {i}", "url": self._link("articles", i), "favicon": "",
+                        "content": "Detailed analysis of the merger's effects. " * 20} for i in range(1, 6)]
+            return self._json(200, {"results": results})
+        if method == "POST" and path == "/v1/fetch":
+            return self._json(200, {"markdown": f"# {request.get('url')}\n" + "Holding and reasoning. " * 300,
+                                     "favicon": ""})
+        return self._not_found()
+
+    def _route_mistral(self, method: str, path: str, request: dict) -> tuple[int, dict, bytes]:
+        if method != "POST" or path != "/v1/ocr":
+            return self._not_found()
+        pages = request.get("pages") or range(_count_pdf_pages(request.get("document", {}).get("document_url", "")))
+        return self._json(200, {
+            "pages": [{"index": index, "markdown": f"# Page {index + 1}\n" + "Market shares table. " * 40,
+                       "images": [], "dimensions": {"dpi": 200, "height": 2200, "width": 1700}}
+                      for index in range(len(pages))],
+            "model": request.get("model", "mistral-ocr-latest"),
+            "usage_info": {"pages_processed": len(pages), "doc_size_bytes": None},
+        })
+
+    def _route_publisher(self, method: str, path: str, request: dict) -> tuple[int, dict, bytes]:
+        if method not in ("GET", "HEAD"):
+            return self._not_found()
+        match = re.fullmatch(r"/(papers|scans)/(\d+)\.pdf", path)
+        if match:
+            pdf = sample_pdf(pages=2 + int(match.group(2)) % 3, scanned=match.group(1) == "scans")
+            return 200, {"Content-Type": "application/pdf"}, pdf
+        if re.fullmatch(r"/articles/\d+", path):
+            html = "<html><body><h1>Stand-in article</h1>" + "<p>Merger analysis.</p>" * 50 + "</body></html>"
+            return 200, {"Content-Type": "text/html"}, html.encode()
+        return 404, {"Content-Type": "text/plain"}, b"Not found"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real providers
+
+    def _serve(self, method: str) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        status, headers, payload = self.server.stand_in.respond(method, self.path, body)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if method != "HEAD":
+            self.wfile.write(payload)
+
+    def do_GET(self) -> None:
+        self._serve("GET")
+
+    def do_HEAD(self) -> None:
+        self._serve("HEAD")
+
+    def do_POST(self) -> None:
+        self._serve("POST")
+
+    def log_message(self, format: str, *args) -> None:  # keep benchmark output clean
+        pass
+
+
+def start_stand_ins(faults: Optional[Dict[str, FaultProfile]] = None, host: str = "127.0.0.1",
+                    chat_responder: Callable[[dict], str] = default_chat_responder) -> Dict[str, StandInServer]:
+    """Start one stand-in per provider; faults maps provider (or "*" for all) to its FaultProfile."""
+    faults = faults or {}
+    servers: Dict[str, StandInServer] = {}
+    servers["publisher"] = StandInServer("publisher", faults.get("publisher", faults.get("*")), host).start()
+    for provider in ("xai", "tavily", "linkup", "mistral"):
+        servers[provider] = StandInServer(provider, faults.get(provider, faults.get("*")), host,
+                                          links_base=servers["publisher"].url,
+                                          chat_responder=chat_responder).start()
+    return servers
+
+
+def base_urls(servers: Dict[str, StandInServer]) -> Dict[str, str]:
+    """config.py *_BASE_URL values pointing at the stand-ins."""
+    return {setting: servers[provider].url + prefix for setting, (provider, prefix) in BASE_URL_SETTINGS.items()}
+
+
+@contextmanager
+def stand_ins(faults: Optional[Dict[str, FaultProfile]] = None,
+              chat_responder: Callable[[dict], str] = default_chat_responder) -> Iterator[Dict[str, StandInServer]]:
+    """Serve all providers locally and point config (base URLs, dummy keys) at them during the block."""
+    from tools import providers
+
+    servers = start_stand_ins(faults, chat_responder=chat_responder)
+    try:
+        with ExitStack() as stack:
+            for setting, url in base_urls(servers).items():
+                stack.enter_context(patch(f"config.{setting}", url))
+            for setting in API_KEY_SETTINGS:
+                stack.enter_context(patch(f"config.{setting}", "stand-in-key"))
+            providers.close_all()  # pooled clients keyed on the old settings must not be reused
+            yield servers
+            providers.close_all()
+    finally:
+        for server in servers.values():
+            server.stop()
+
+
+def parse_errors(spec: str) -> Dict[int, float]:
+    """'429=0.1,503=0.05' -> {429: 0.1, 503: 0.05}."""
+    errors = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        status, probability = item.split("=")
+        errors[int(status)] = float(probability)
+    return errors
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve local provider stand-ins with fault injection")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Median response latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.0, help="Lognormal spread of the latency")
+    parser.add_argument("--errors", type=parse_errors, default={}, help="Injected statuses, e.g. 429=0.1,503=0.05")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Requests/second per provider")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    profile = FaultProfile(latency_ms=args.latency_ms, latency_sigma=args.latency_sigma, errors=args.errors,
+                           rate_limit=args.rate_limit, seed=args.seed)
+    servers = start_stand_ins({"*": profile}, host=args.host)
+    print("# Provider stand-ins running; export these before starting app.py:")
+    for setting, url in base_urls(servers).items():
+        print(f"export {setting}={url}")
+    for setting in API_KEY_SETTINGS:
+        print(f"export {setting}=stand-in-key")
+    print(f"# Publisher (PDF/HTML) at {servers['publisher'].url}; Ctrl-C to stop", flush=True)
+    try:
+        while True:
+            time.sleep(5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for name, server in servers.items():
+            print(f"{name}: {server.stats}")
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""Scripted chat model and fake provider backends for workflow benchmarks.
+
+ScriptedChatModel stands in for the chat model of every agent. The agent is
+identified through run_context.get_agent(), which the graph and debate nodes
+set around each invoke. Each agent follows a fixed script: one or more rounds
+of tool calls (e.g. econpaper fans out to tavily_search and linkup_search),
+then a final answer. Final answers match the output the graph validates:
+EconPaperOutput, CaseLawOutput, VerifierOutput, the arbiter's should_continue
+JSON and the remediation decision. Routing, validation, source collection,
+debate rounds and tool fan-out therefore run the same code as in production.
+
+fake_backends() swaps every agent's model for the scripted one. It also
+replaces the Tavily, Linkup and Mistral clients and the run_code_py kernel
+pool with in-process fakes. Each fake sleeps for its configured latency, so a
+profile can mimic provider round trips without touching the network.
+"""
+
+import functools
+import importlib
+import json
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Iterator, List, Optional
+from unittest.mock import patch
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from run_context import get_agent
+
+
+@dataclass
+class BenchmarkProfile:
+    """Latencies (seconds) and sizes of the fake backends."""
+
+    llm_latency: float = 0.0
+    search_latency: float = 0.0
+    fetch_latency: float = 0.0
+    ocr_latency: float = 0.0
+    code_latency: float = 0.0
+    results: int = 3  # search results, papers and cases per answer
+    ocr_pages: int = 4
+    debate_rounds: int = 2
+    document: Optional[str] = None  # PDF path used by docanalyzer's convert_pdf_file call
+
+
+def _papers(n: int) -> str:
+    return json.dumps({"papers": [
+        {"paper_id": i, "title": f"Merger Effects in Concentrated Markets {i}", "authors": "Doe, J.; Roe, R.",
+         "outlet": "RAND Journal of Economics", "year": 2024, "doi": f"10.1111/rand.{1000 + i}",
+         "url": f"https://papers.example.org/{i}", "snippet": "Retrospective of horizontal mergers.",
+         "verified_via": "tavily_search"}
+        for i in range(1, n + 1)]})
+
+
+def _cases(n: int) -> str:
+    return json.dumps({"cases": [
+        {"case_id": i, "title": f"FTC v. Example Holdings {i}", "court": "D.C. Cir.", "year": 2023,
+         "url": f"https://cases.example.org/{i}", "snippet": "Market definition upheld.",
+         "verified_via": "linkup_fetch"}
+        for i in range(1, n + 1)]})
+
+
+def _citations(n: int) -> str:
+    return json.dumps({"citations": [
+        {"paper_id": i, "title": f"Merger Effects in Concentrated Markets {i}", "status": "verified",
+         "reason": "Matched on publisher site"}
+        for i in range(1, n + 1)]})
+
+
+def _thought(agent: str) -> dict:
+    return {"thought": f"{agent}: outline the analysis", "thoughtNumber": 1, "totalThoughts": 1,
+            "nextThoughtNeeded": False}
+
+
+_HHI_CODE = "shares = [40, 30, 30]\nsum(s ** 2 for s in shares)"
+
+
+def agent_script(agent: str, profile: BenchmarkProfile, messages: List[BaseMessage]) -> tuple[list, str]:
+    """(tool-call rounds, final answer) for agent; each round is a list of (tool, args)."""
+    query = next((m.content for m in messages if isinstance(m, HumanMessage)), "")[:200]
+    if agent == "econpaper":
+        return [[("tavily_search", {"query": query}), ("linkup_search", {"query": query})]], _papers(profile.results)
+    if agent == "caselaw":
+        return ([[("tavily_search", {"query": query})],
+                 [("linkup_fetch", {"url": "https://cases.example.org/1"})]], _cases(profile.results))
+    if agent == "verifier":
+        return [[("linkup_fetch", {"url": "https://papers.example.org/1"})]], _citations(profile.results)
+    if agent in ("econquant", "marketdef"):
+        return ([[("sequential_thinking", _thought(agent))], [("run_code_py", {"code": _HHI_CODE})]],
+                "HHI = 3400; the merger raises concentration by 1800 points.")
+    if agent == "explainer":
+        return ([[("sequential_thinking", _thought(agent)), ("tavily_search", {"query": query})]],
+                "The HHI assumes homogeneous products; caveats apply.")
+    if agent == "docanalyzer":
+        rounds = [[("convert_pdf_file", {"file_path": profile.document})]] if profile.document else []
+        return rounds, "The filing reports market shares of 40/30/30."
+    if agent in ("pro", "cons"):
+        return [[("tavily_search", {"query": f"{agent} {query}"[:200]})]], f"{agent.title()} argument on the merger."
+    if agent == "arbiter":
+        feedback_rounds = sum(isinstance(m, SystemMessage) and "Moderator Feedback" in m.content for m in messages)
+        should_continue = feedback_rounds + 1 < profile.debate_rounds
+        return [], json.dumps({"winner": "pro", "should_continue": should_continue,
+                               "feedback": "Quantify the efficiencies." if should_continue else None})
+    if agent == "remediation":
+        return [], json.dumps({"action": "fallback", "reason": "benchmark"})
+    return [], f"{agent} answer: final synthesis of the agent outputs."
+
+
+def _tool_rounds_so_far(messages: List[BaseMessage]) -> int:
+    """Tool-call rounds of the current agent invocation (the trailing AI/Tool message run)."""
+    rounds = 0
+    for message in reversed(messages):
+        if isinstance(message, ToolMessage):
+            continue
+        if isinstance(message, AIMessage) and message.tool_calls:
+            rounds += 1
+            continue
+        break
+    return rounds
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model that plays each agent's script; see agent_script()."""
+
+    model_name: str = "scripted"
+    latency: float = 0.0
+    profile: Any = None
+
+    def __init__(self, model_name: str = "scripted", cache: Any = None, **kwargs: Any):
+        # create_agent passes the agent's sampling params; they do not apply to a script
+        fields = {k: kwargs[k] for k in ("latency", "profile") if k in kwargs}
+        super().__init__(model_name=model_name, cache=cache, **fields)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: list, **kwargs: Any) -> Any:
+        names = [convert_to_openai_tool(t)["function"]["name"] for t in tools]
+        return self.bind(tool_names=names, **kwargs)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, tool_names: Optional[List[str]] = None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        agent = get_agent() or "default"
+        rounds, answer = agent_script(agent, self.profile or BenchmarkProfile(), messages)
+        done = _tool_rounds_so_far(messages)
+        calls = []
+        if done < len(rounds):
+            calls = [{"name": name, "args": args, "id": f"call_{agent}_{done}_{i}", "type": "tool_call"}
+                     for i, (name, args) in enumerate(rounds[done]) if name in (tool_names or [])]
+        content = "" if calls else answer
+        input_tokens = sum(_estimate_tokens(str(m.content)) for m in messages)
+        output_tokens = _estimate_tokens(content or json.dumps([c["args"] for c in calls]))
+        message = AIMessage(content=content, tool_calls=calls, usage_metadata={
+            "input_tokens": input_tokens, "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class FakeTavilyClient:
+    def __init__(self, profile: BenchmarkProfile):
+        self.profile = profile
+
+    def search(self, query: str, max_results: int = 5, **kwargs: Any) -> dict:
+        time.sleep(self.profile.search_latency)
+        return {"results": [{"url": f"https://search.example.org/{i}", "title": f"Result {i} for {query[:40]}",
+                             "content": "Merger retrospective evidence. " * 20}
+                            for i in range(min(max_results, self.profile.results))]}
+
+    def extract(self, urls: List[str], **kwargs: Any) -> dict:
+        time.sleep(self.profile.fetch_latency)
+        return {"results": [{"url": url, "raw_content": "# Extracted\n" + "Body text. " * 200} for url in urls]}
+
+
+class FakeLinkupClient:
+    def __init__(self, profile: BenchmarkProfile):
+        self.profile = profile
+
+    def search(self, query: str, **kwargs: Any) -> SimpleNamespace:
+        time.sleep(self.profile.search_latency)
+        return SimpleNamespace(results=[
+            SimpleNamespace(name=f"Deep result {i}", url=f"https://deep.example.org/{i}",
+                            content="Detailed analysis. " * 40)
+            for i in range(self.profile.results)])
+
+    def fetch(self, url: str, **kwargs: Any) -> SimpleNamespace:
+        time.sleep(self.profile.fetch_latency)
+        return SimpleNamespace(content=f"# {url}\n" + "Holding and reasoning. " * 200)
+
+
+class FakeMistralClient:
+    def __init__(self, profile: BenchmarkProfile):
+        self.profile = profile
+        self.ocr = SimpleNamespace(process=self._process)
+
+    def _process(self, **request: Any) -> SimpleNamespace:
+        time.sleep(self.profile.ocr_latency)
+        return SimpleNamespace(pages=[SimpleNamespace(markdown=f"# Page {i + 1}\n" + "Market shares table. " * 50)
+                                      for i in range(self.profile.ocr_pages)])
+
+
+class FakeKernelPool:
+    def __init__(self, profile: BenchmarkProfile):
+        self.profile = profile
+
+    def execute(self, code: str, **kwargs: Any) -> dict:
+        time.sleep(self.profile.code_latency)
+        return {"ok": True, "output": "3400\n", "error": None, "truncated": False}
+
+
+def _module(name: str) -> Any:
+    # tools/__init__ re-exports each tool under its module's name, so patch the module object itself
+    return importlib.import_module(name)
+
+
+@contextmanager
+def fake_backends(profile: BenchmarkProfile) -> Iterator[BenchmarkProfile]:
+    """Run agents on ScriptedChatModel and tools on the fake backends for the duration of the block."""
+    from agents import agents as registry
+
+    tavily, linkup = FakeTavilyClient(profile), FakeLinkupClient(profile)
+    mistral, kernels = FakeMistralClient(profile), FakeKernelPool(profile)
+    model = functools.partial(ScriptedChatModel, latency=profile.llm_latency, profile=profile)
+    with ExitStack() as stack:
+        stack.enter_context(patch("config.XAI_API_KEY", None))
+        stack.enter_context(patch.object(_module("agents.mock_model"), "MockChatModel", model))
+        for name in ("tools.tavily_search", "tools.tavily_extract"):
+            stack.enter_context(patch.object(_module(name), "get_tavily_client", lambda *a, **k: tavily))
+        for name in ("tools.linkup_search", "tools.linkup_fetch"):
+            stack.enter_context(patch.object(_module(name), "get_linkup_client", lambda *a, **k: linkup))
+        stack.enter_context(patch.object(_module("tools.pdf_ocr"), "get_mistral_client", lambda *a, **k: mistral))
+        stack.enter_context(patch.object(_module("tools.run_code_py"), "get_pool", lambda *a, **k: kernels))
+        stack.enter_context(patch("config.OCR_CACHE_ENABLED", False))  # every run pays for OCR
+        stack.enter_context(patch.dict(registry))
+        registry.reset()  # agents built from here on use the scripted model
+        yield profile
@@ -0,0 +1,152 @@
+"""Micro-benchmark: JSON extraction from large agent outputs.
+
+Compares json_utils (one string-aware scan, see json_utils.py) with the
+regexes it replaced in graph.py and debate.py, on synthetic agent outputs of
+about --size-kb each:
+
+- papers:  prose with citation markers and quotes, then a fenced JSON list of
+           papers (econpaper validation and source extraction);
+- route:   long supervisor reasoning ending in the route object;
+- arbiter: debate arbiter reasoning ending in {"should_continue", "feedback"};
+- prose:   no JSON at all, only brackets in the text (every parse of a plain
+           answer, e.g. explainer output, goes through this);
+- latex:   arbiter reasoning full of LaTeX braces and no verdict. The old
+           r'\{.*"should_continue".*\}' retries from every brace, so this case
+           is quadratic for it and capped at LATEX_MAX_KB.
+
+For each case it reports the median milliseconds per call and whether each
+parser got the expected result (the payload, or none where there is none).
+
+    python -m benchmarks.json_extract
+    python -m benchmarks.json_extract --size-kb 256 --repeat 9 --json out.json
+"""
+
+import argparse
+import json
+import re
+import statistics
+import time
+from typing import Any, Callable, Optional
+
+from json_utils import first_object, largest_json
+
+PARAGRAPH = ('The merging parties\' shares [1] imply an HHI change of 1800 (see "Horizontal Merger Guidelines" '
+             '[2, 3]). Under the logit model {IIA holds} diversion is proportional to share; the nested '
+             'logit relaxes this [4]. Margins of 40% {e.g. in cement} raise GUPPI above 5%.\n\n')
+
+
+LATEX = 'The diversion ratio is $D_{12} = \\frac{s_2}{1 - s_1}$ and UPP is $m_2 p_2 D_{12}$.\n\n'
+LATEX_MAX_KB = 64
+
+
+def _prose(size: int) -> str:
+    return PARAGRAPH * max(1, size // len(PARAGRAPH))
+
+
+def _papers(n: int) -> list[dict]:
+    return [{"title": f"Paper {i}: {{diversion}} and [prices]", "authors": ["A. Author", "B. Author"],
+             "year": 2025, "url": f"https://example.org/paper/{i}", "snippet": 'Says "yes" \\ [sic]'}
+            for i in range(n)]
+
+
+def _no_payload(value: Any) -> bool:
+    """No object and no list of objects, i.e. nothing validation or source extraction could use."""
+    return not isinstance(value, dict) and not (isinstance(value, list) and any(isinstance(v, dict) for v in value))
+
+
+def make_cases(size: int) -> dict[str, tuple[str, Callable[[Any], bool]]]:
+    """name -> (agent output of about size characters, check that the extracted value is the payload)."""
+    papers = _papers(max(1, size // 2 // 220))
+    route = {"route": "econpaper", "confidence": 0.9, "justify": "needs literature {IO}"}
+    arbiter = {"should_continue": True, "feedback": "Address the [efficiencies] argument."}
+    return {
+        "papers": (_prose(size // 2) + "```json\n" + json.dumps(papers) + "\n```",
+                   lambda v: isinstance(v, list) and len(v) == len(papers)),
+        "route": (_prose(size) + json.dumps(route), lambda v: v == route),
+        "arbiter": (_prose(size) + json.dumps(arbiter), lambda v: v == arbiter),
+        "prose": (_prose(size), _no_payload),
+        "latex": (LATEX * max(1, min(size, LATEX_MAX_KB * 1024) // len(LATEX)), lambda v: v is None),
+    }
+
+
+# The extraction code this replaced, kept verbatim for comparison
+def legacy_agent_json(content: str) -> Any:
+    json_match = re.search(r'(\[.*\]|\{.*\})', content, re.DOTALL)
+    try:
+        return json.loads(json_match.group(1) if json_match else content)
+    except json.JSONDecodeError:
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError:
+            return None
+
+
+def legacy_route(content: str) -> Any:
+    json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', content, re.DOTALL)
+    try:
+        return json.loads(json_match.group()) if json_match else None
+    except json.JSONDecodeError:
+        return None
+
+
+def legacy_arbiter(content: str) -> Any:
+    json_match = re.search(r'\{.*"should_continue".*\}', content, re.DOTALL)
+    try:
+        return json.loads(json_match.group()) if json_match else None
+    except json.JSONDecodeError:
+        return None
+
+
+PARSERS = {
+    "papers": (legacy_agent_json, largest_json),
+    "route": (legacy_route, first_object),
+    "arbiter": (legacy_arbiter, lambda text: first_object(text, lambda v: "should_continue" in v)),
+    "prose": (legacy_agent_json, largest_json),
+    "latex": (legacy_arbiter, lambda text: first_object(text, lambda v: "should_continue" in v)),
+}
+
+
+def _time(parse: Callable[[str], Any], text: str, repeat: int) -> tuple[float, Any]:
+    timings, value = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        value = parse(text)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000, value
+
+
+def run_benchmarks(size_kb: int = 1024, repeat: int = 5) -> list[dict]:
+    results = []
+    for name, (text, check) in make_cases(size_kb * 1024).items():
+        legacy, scanner = PARSERS[name]
+        legacy_ms, legacy_value = _time(legacy, text, repeat)
+        scanner_ms, scanner_value = _time(scanner, text, repeat)
+        results.append({"case": name, "chars": len(text), "legacy_ms": round(legacy_ms, 2),
+                        "scanner_ms": round(scanner_ms, 2), "speedup": round(legacy_ms / scanner_ms, 1),
+                        "legacy_found": bool(check(legacy_value)), "scanner_found": bool(check(scanner_value))})
+    return results
+
+
+def format_table(results: list[dict]) -> str:
+    lines = [f"{'case':<8} {'chars':>9} {'legacy ms':>10} {'scanner ms':>11} {'speedup':>8}  found (legacy/scanner)"]
+    for r in results:
+        lines.append(f"{r['case']:<8} {r['chars']:>9} {r['legacy_ms']:>10.2f} {r['scanner_ms']:>11.2f} "
+                     f"{r['speedup']:>7.1f}x  {r['legacy_found']}/{r['scanner_found']}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark JSON extraction from large agent outputs")
+    parser.add_argument("--size-kb", type=int, default=1024, help="Approximate size of each agent output")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed calls per parser and case (median reported)")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+    results = run_benchmarks(args.size_kb, args.repeat)
+    print(format_table(results))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
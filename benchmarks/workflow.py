@@ -0,0 +1,217 @@
+"""Benchmark create_workflow(...).invoke end to end on scripted fake backends.
+
+Each scenario compiles its workflow once, runs one warm-up invocation, then
+times --runs invocations. The report gives, per scenario:
+
+- p50 / p95 / mean run latency and the compile time;
+- node executions, LLM calls and tool calls per run (from the run's telemetry);
+- peak Python heap of one extra run traced with tracemalloc (kept out of the
+  timed runs, whose latency tracemalloc would inflate), and the process' max RSS.
+
+With zero backend latency (the default), the figures measure graph overhead
+alone: routing, context building, validation, reducers and telemetry. Set the
+--*-latency options to mimic provider round trips instead.
+
+    python -m benchmarks.workflow --runs 20
+    python -m benchmarks.workflow --scenario research --llm-latency 0.05 --json out.json
+    python -m benchmarks.workflow --baseline out.json --tolerance 0.25   # exit 1 on regression
+"""
+
+import argparse
+import dataclasses
+import json
+import math
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Optional
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.fakes import BenchmarkProfile, fake_backends
+from run_context import run_scope
+from telemetry import get_metrics
+
+SCENARIOS = {
+    "research": {
+        "agents": ["econpaper", "caselaw", "verifier", "synthesis"],
+        "query": "Find recent papers and precedents on hospital merger retrospectives.",
+    },
+    "quant": {
+        "agents": ["econquant", "marketdef", "explainer", "synthesis"],
+        "query": "Compute the HHI change for shares 40/30/30 and define the relevant market.",
+    },
+    "documents": {
+        "agents": ["docanalyzer", "synthesis"],
+        "query": "Analyze the uploaded merger filing.",
+    },
+    "debate": {
+        "agents": ["econquant", "pro", "cons", "arbiter", "synthesis"],
+        "query": "Debate whether the merger harms competition.",
+        "force_debate": True,
+    },
+    "full": {
+        "agents": ["econpaper", "econquant", "explainer", "marketdef", "docanalyzer", "caselaw",
+                   "verifier", "pro", "cons", "arbiter", "synthesis"],
+        "query": "Full competition assessment of the proposed merger.",
+        "force_debate": True,
+    },
+}
+
+
+def initial_state(scenario: dict) -> dict:
+    """Workflow input shaped like the one app.py builds."""
+    force_debate = scenario.get("force_debate", False)
+    selected = json.dumps(scenario["agents"])
+    return {
+        "messages": [HumanMessage(content=f"{scenario['query']}\n\nSelected agents: {selected}\n\nForce debate: {force_debate}")],
+        "documents": [],
+        "routes": [],
+        "final_synthesis": "",
+        "iteration_count": 0,
+        "routing_history": [],
+        "force_debate": force_debate,
+        "sources": [],
+        "debate_round": 0,
+        "debate_count": 0,
+    }
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _invoke(workflow, scenario: dict) -> tuple[float, dict, dict]:
+    with run_scope() as run_id:
+        metrics = get_metrics(run_id)
+        started = time.perf_counter()
+        result = workflow.invoke(initial_state(scenario))
+        elapsed = time.perf_counter() - started
+    return elapsed, result, metrics.to_dict()
+
+
+def _max_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024  # bytes on macOS, KiB elsewhere
+
+
+def run_scenario(name: str, runs: int, profile: BenchmarkProfile, mode: Optional[str] = None) -> dict:
+    """Benchmark one scenario; the fake backends must be active (see fake_backends)."""
+    from graph import create_workflow
+
+    scenario = SCENARIOS[name]
+    started = time.perf_counter()
+    workflow = create_workflow(scenario["agents"], mode)
+    compile_seconds = time.perf_counter() - started
+
+    _invoke(workflow, scenario)  # warm-up: builds the agents and imports tool dependencies
+    latencies, samples = [], []
+    for _ in range(runs):
+        elapsed, result, data = _invoke(workflow, scenario)
+        latencies.append(elapsed)
+        samples.append((result, data))
+
+    tracemalloc.start()
+    try:
+        _invoke(workflow, scenario)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    def per_run(key):
+        return sum(data["totals"][key] for _, data in samples) / runs
+
+    return {
+        "scenario": name,
+        "runs": runs,
+        "compile_ms": round(compile_seconds * 1000, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "mean_ms": round(sum(latencies) / runs * 1000, 2),
+        "nodes_per_run": sum(len(data["nodes"]) for _, data in samples) / runs,
+        "llm_calls_per_run": per_run("llm_calls"),
+        "tool_calls_per_run": per_run("tool_calls"),
+        "errors_per_run": per_run("errors"),
+        "completed_runs": sum(bool(result.get("final_synthesis")) for result, _ in samples),
+        "peak_heap_mb": round(peak / (1024 * 1024), 2),
+        "max_rss_mb": round(_max_rss_mb(), 1),
+    }
+
+
+def run_benchmarks(scenarios: list[str], runs: int, profile: BenchmarkProfile, mode: Optional[str] = None) -> list[dict]:
+    with tempfile.TemporaryDirectory() as tmp:
+        if profile.document is None:
+            # Unparseable locally, so the whole document goes through the (fake) OCR backend
+            profile = dataclasses.replace(profile, document=os.path.join(tmp, "filing.pdf"))
+            with open(profile.document, "wb") as f:
+                f.write(b"%PDF-1.4\n% benchmark placeholder\n")
+        with fake_backends(profile):
+            return [run_scenario(name, runs, profile, mode) for name in scenarios]
+
+
+def check_regressions(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """Scenarios whose p50 or p95 exceeds the baseline by more than tolerance (a fraction)."""
+    previous = {entry["scenario"]: entry for entry in baseline}
+    failures = []
+    for entry in results:
+        base = previous.get(entry["scenario"])
+        if not base:
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            if entry[key] > base[key] * (1 + tolerance):
+                failures.append(f"{entry['scenario']}: {key} {entry[key]} > {base[key]} (+{tolerance:.0%})")
+    return failures
+
+
+def format_table(results: list[dict]) -> str:
+    columns = ["scenario", "p50_ms", "p95_ms", "mean_ms", "compile_ms", "nodes_per_run", "llm_calls_per_run",
+               "tool_calls_per_run", "errors_per_run", "peak_heap_mb", "max_rss_mb"]
+    rows = [columns] + [[str(entry[c]) for c in columns] for entry in results]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    return "\n".join("  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the agent workflow on scripted fake backends")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run (repeatable; default: all)")
+    parser.add_argument("--runs", type=int, default=10, help="Timed runs per scenario")
+    parser.add_argument("--mode", choices=["plan", "supervisor"], default=None,
+                        help="Execution mode (default: EXECUTION_MODE)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds per LLM call")
+    parser.add_argument("--search-latency", type=float, default=0.0, help="Seconds per search call")
+    parser.add_argument("--fetch-latency", type=float, default=0.0, help="Seconds per fetch/extract call")
+    parser.add_argument("--ocr-latency", type=float, default=0.0, help="Seconds per OCR request")
+    parser.add_argument("--code-latency", type=float, default=0.0, help="Seconds per run_code_py call")
+    parser.add_argument("--results", type=int, default=3, help="Search results / papers / cases per answer")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p50/p95 slowdown vs the baseline")
+    args = parser.parse_args(argv)
+
+    profile = BenchmarkProfile(llm_latency=args.llm_latency, search_latency=args.search_latency,
+                               fetch_latency=args.fetch_latency, ocr_latency=args.ocr_latency,
+                               code_latency=args.code_latency, results=args.results)
+    results = run_benchmarks(args.scenario or list(SCENARIOS), args.runs, profile, args.mode)
+    print(format_table(results))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            failures = check_regressions(results, json.load(f), args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION {failure}", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    import logging
+    logging.basicConfig(level=logging.ERROR)  # the placeholder PDF's parse warning repeats every run
+    sys.exit(main())
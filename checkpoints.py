@@ -0,0 +1,208 @@
+"""Durable workflow checkpoints and resume.
+
+With CHECKPOINT_ENABLED, run_query compiles the workflow with a SQLite-backed
+LangGraph checkpointer (create_workflow(..., checkpointer=...)) and runs it
+with the run id as thread id. The graph state (messages, sources,
+routing_history, documents, ...) is saved after every step, and so is the
+output of each node that finished within a step whose other nodes failed.
+Next to the checkpoints, a run manifest records what is needed to rebuild
+the run: query, uploads, selected agents, execution mode and output
+directory.
+
+`python app.py --resume RUN_ID` rebuilds the same workflow and continues from
+the last checkpoint (see resume_config), so the research nodes that already
+finished are not paid for again. A run that ended because a node after the
+research failed (e.g. synthesis) restarts from just before that node. A run
+that finished cleanly is not re-run at all; only its report is written again,
+e.g. after a PDF rendering failure.
+
+Inspect or clean up the store with
+`python -m checkpoints [--path FILE] list|delete RUN_ID|prune [--days N]`.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+import config
+from exceptions import ConfigurationError
+
+try:
+    from langgraph.checkpoint.sqlite import SqliteSaver
+except ImportError:  # optional: without it runs are simply not checkpointed
+    SqliteSaver = None
+
+logger = logging.getLogger(__name__)
+
+RUN_FIELDS = ("run_id", "query", "files", "debate", "selected_agents", "mode", "output_dir", "status",
+              "report", "created_at", "updated_at")
+_JSON_FIELDS = ("files", "selected_agents")
+
+
+class CheckpointStore:
+    """SQLite file holding the LangGraph checkpoints and the manifest of every run."""
+
+    def __init__(self, path: str):
+        if SqliteSaver is None:
+            raise ConfigurationError("Checkpointing requires langgraph-checkpoint-sqlite "
+                                     "(pip install langgraph-checkpoint-sqlite)")
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.saver = SqliteSaver(self._conn)
+        self.saver.setup()  # WAL mode: concurrent runs (batch, serve) share one file
+        with self.saver.lock:  # one connection; the saver writes from the graph's worker threads
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs (run_id TEXT PRIMARY KEY, query TEXT, files TEXT, "
+                "debate INTEGER, selected_agents TEXT, mode TEXT, output_dir TEXT, status TEXT, "
+                "report TEXT, created_at REAL, updated_at REAL)"
+            )
+            self._conn.commit()
+
+    def save_run(self, run_id: str, **fields: Any) -> None:
+        """Create or update the manifest of run_id with the given RUN_FIELDS."""
+        unknown = set(fields) - set(RUN_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown run fields: {sorted(unknown)}")
+        values = {k: json.dumps(v) if k in _JSON_FIELDS else v for k, v in fields.items()}
+        now = time.time()
+        with self.saver.lock:
+            self._conn.execute("INSERT OR IGNORE INTO runs (run_id, created_at) VALUES (?, ?)", (run_id, now))
+            assignments = ", ".join(f"{k} = ?" for k in values)
+            self._conn.execute(f"UPDATE runs SET {assignments + ', ' if assignments else ''}updated_at = ? "
+                               f"WHERE run_id = ?", (*values.values(), now, run_id))
+            self._conn.commit()
+
+    def get_run(self, run_id: str) -> Optional[dict]:
+        with self.saver.lock:
+            row = self._conn.execute(f"SELECT {', '.join(RUN_FIELDS)} FROM runs WHERE run_id = ?",
+                                     (run_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def runs(self) -> list[dict]:
+        """All run manifests, newest first."""
+        with self.saver.lock:
+            rows = self._conn.execute(f"SELECT {', '.join(RUN_FIELDS)} FROM runs "
+                                      f"ORDER BY created_at DESC").fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    @staticmethod
+    def _to_dict(row: tuple) -> dict:
+        run = dict(zip(RUN_FIELDS, row))
+        for key in _JSON_FIELDS:
+            run[key] = json.loads(run[key]) if run[key] else []
+        run["debate"] = bool(run["debate"])
+        return run
+
+    def delete_run(self, run_id: str) -> None:
+        """Drop the checkpoints and the manifest of run_id."""
+        self.saver.delete_thread(run_id)
+        with self.saver.lock:
+            self._conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+            self._conn.commit()
+
+    def prune(self, days: float) -> list[str]:
+        """Delete the completed runs last updated more than days ago; returns their ids."""
+        cutoff = time.time() - days * 86400
+        with self.saver.lock:
+            run_ids = [row[0] for row in self._conn.execute(
+                "SELECT run_id FROM runs WHERE status = 'completed' AND updated_at < ?", (cutoff,))]
+        for run_id in run_ids:
+            self.delete_run(run_id)
+        return run_ids
+
+    def close(self) -> None:
+        with self.saver.lock:
+            self._conn.close()
+
+
+_stores: dict = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path: Optional[str] = None) -> CheckpointStore:
+    """Shared CheckpointStore for path (default: CHECKPOINT_PATH)."""
+    path = os.path.abspath(path or config.CHECKPOINT_PATH)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = CheckpointStore(path)
+            logger.info("Workflow checkpoints in %s", path)
+    return store
+
+
+def get_checkpoint_store() -> Optional[CheckpointStore]:
+    """Store for run_query, or None when CHECKPOINT_ENABLED is off or the SQLite saver is not installed."""
+    if not config.CHECKPOINT_ENABLED:
+        return None
+    if SqliteSaver is None:
+        logger.warning("langgraph-checkpoint-sqlite is not installed; runs are not checkpointed")
+        return None
+    return get_store()
+
+
+def thread_config(run_id: str) -> dict:
+    """LangGraph config that keys the checkpoints of a run by its id."""
+    return {"configurable": {"thread_id": run_id}}
+
+
+def resume_config(workflow: Any, run_id: str) -> Optional[dict]:
+    """Config to continue run_id from with workflow.invoke(None, ...), or None if there is nothing to re-run.
+
+    - The run stopped mid-graph (crash, interrupt, uncaught error): continue
+      from its latest checkpoint. Nodes that finished in the step that failed
+      are not run again.
+    - The run reached the end, but the last agent failed (its error is still
+      in last_error, e.g. a synthesis outage): restart from the checkpoint
+      taken just before that agent ran.
+    - The run finished cleanly: None.
+
+    Raises:
+        ConfigurationError: If run_id has no checkpoints.
+    """
+    thread = thread_config(run_id)
+    snapshot = workflow.get_state(thread)
+    if not snapshot.values:
+        raise ConfigurationError(f"No checkpoints for run {run_id}")
+    if snapshot.next:
+        logger.info("Resuming run %s before %s", run_id, ", ".join(snapshot.next))
+        return thread
+    failed = snapshot.values.get("last_agent")
+    if not (snapshot.values.get("last_error") and failed):
+        return None
+    for earlier in workflow.get_state_history(thread):
+        if failed in earlier.next:
+            logger.info("Resuming run %s from before its failed %s node", run_id, failed)
+            return earlier.config
+    return None
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="List or clean up workflow checkpoints")
+    parser.add_argument("--path", default=None, help="Checkpoint file (default: CHECKPOINT_PATH)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list")
+    delete = sub.add_parser("delete")
+    delete.add_argument("run_id")
+    prune = sub.add_parser("prune", help="Delete completed runs")
+    prune.add_argument("--days", type=float, default=7.0, help="Keep runs updated within this many days")
+    args = parser.parse_args(argv)
+    store = CheckpointStore(args.path or config.CHECKPOINT_PATH)
+    if args.command == "list":
+        for run in store.runs():
+            print(json.dumps({k: run[k] for k in ("run_id", "status", "selected_agents", "report")}
+                             | {"query": (run["query"] or "")[:80]}))
+    elif args.command == "delete":
+        store.delete_run(args.run_id)
+    else:
+        print(json.dumps({"deleted": store.prune(args.days)}))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
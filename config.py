@@ -1,5 +1,6 @@
 from dotenv import load_dotenv
 import os
+import sys
 load_dotenv()
 
 # Import custom logging and exceptions
@@ -16,15 +17,27 @@ LANGCHAIN_TRACING_V2 = os.getenv('LANGCHAIN_TRACING_V2')
 LANGCHAIN_PROJECT = os.getenv('LANGCHAIN_PROJECT')
 VERBOSE = os.getenv('VERBOSE')
 
-# Validate API keys
-if not XAI_API_KEY:
-    print("Warning: XAI_API_KEY not set. Using mock models.")
-if not TAVILY_API_KEY:
-    print("Warning: TAVILY_API_KEY not set. Tavily tools may fail.")
-if not MISTRAL_API_KEY:
-    print("Warning: MISTRAL_API_KEY not set. PDF conversion may fail.")
-if not LINKUP_API_KEY:
-    print("Warning: LINKUP_API_KEY not set. Linkup tools may fail.")
+# Provider endpoints. Point them at the local stand-ins (python -m benchmarks.fake_servers)
+# to load-test retries and fallbacks against degraded providers without network or quota.
+XAI_BASE_URL = os.getenv('XAI_BASE_URL', "https://api.x.ai/v1")
+TAVILY_BASE_URL = os.getenv('TAVILY_BASE_URL', "https://api.tavily.com")
+LINKUP_BASE_URL = os.getenv('LINKUP_BASE_URL', "https://api.linkup.so/v1")
+MISTRAL_BASE_URL = os.getenv('MISTRAL_BASE_URL', "https://api.mistral.ai")
+
+
+def missing_api_key_warnings() -> list:
+    """Warnings for unset provider keys.
+
+    Checked by the CLI after logging is configured instead of printed on import,
+    so importing config (tests, tools) has no side effects.
+    """
+    checks = [
+        (XAI_API_KEY, "XAI_API_KEY not set. Using mock models."),
+        (TAVILY_API_KEY, "TAVILY_API_KEY not set. Tavily tools may fail."),
+        (MISTRAL_API_KEY, "MISTRAL_API_KEY not set. PDF conversion may fail."),
+        (LINKUP_API_KEY, "LINKUP_API_KEY not set. Linkup tools may fail."),
+    ]
+    return [message for key, message in checks if not key]
 
 # Models from AGENTS.md
 SUPERVISOR_MODEL = "grok-4-1-fast-reasoning"
@@ -52,13 +65,43 @@ SAMPLING_PARAMS = {
     "synthesis": {"temperature": 0.6, "top_p": 0.95, "extra_body": {"top_k": 20}}
 }
 
+# Token prices (USD per million tokens) for the cost estimate in metrics_<timestamp>.json
+# (telemetry.py). Update from the provider's price list; unknown models are costed at 0.
+MODEL_PRICES = {
+    "grok-4-1-fast-reasoning": {"input": 0.20, "output": 0.50},
+    "grok-4-1-fast-non-reasoning": {"input": 0.20, "output": 0.50},
+    "grok-4-0709": {"input": 3.00, "output": 15.00},
+}
+
+# Record/replay cassette for agent LLM calls (llm_cache.py): "record" serves recorded
+# responses and records new ones, "replay" serves recorded responses only (a miss is an
+# error), "passthrough" always calls the model.
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "passthrough")
+LLM_CASSETTE_PATH = os.getenv("LLM_CASSETTE_PATH", ".cache/llm_cassette.sqlite")
+
+# Durable workflow checkpoints (checkpoints.py): the graph state is saved after every step,
+# keyed by run id, so `app.py --resume RUN_ID` continues a failed or interrupted run from its
+# last completed node instead of re-running every agent.
+CHECKPOINT_ENABLED = os.getenv("CHECKPOINT_ENABLED", "true").lower() not in ("0", "false", "no", "off")
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", ".cache/checkpoints.sqlite")
+
 # MCP Paths
-RUN_CODE_PY_CMD = r"C:\Users\abdur\Documents\python-MCP\venv\Scripts\python.exe"
-RUN_CODE_PY_ARGS = ["-u", r"C:\Users\abdur\Documents\python-MCP\run_code_py.py"]
+# Interpreter for the warm run_code_py kernels (tools/kernel_pool.py); needs numpy/pandas for quant work
+RUN_CODE_PY_CMD = os.getenv("RUN_CODE_PY_CMD", sys.executable)
 RUN_CODE_PY_ENV = {"EXECUTION_TIMEOUT": "1800"}
-RUN_CODE_R_CMD = "Rscript"
-RUN_CODE_R_ARGS = [r"C:\Users\abdur\OneDrive\Work\R-MCP\run_code_r.R"]
+RUN_CODE_PY_PRELOAD = ["numpy as np", "pandas as pd"]  # imported once per kernel, not per call
+# Rscript for the persistent run_code_r workers (tools/r_kernel_worker.R); needs jsonlite
+RUN_CODE_R_CMD = os.getenv("RUN_CODE_R_CMD", "Rscript")
 RUN_CODE_R_ENV = {}
+RUN_CODE_R_PRELOAD = ["stats", "sandwich", "lmtest", "fixest"]  # attached once per worker if installed
+
+# Code kernel limits (run_code_py, run_code_r)
+RUN_CODE_TIMEOUT = 180  # wall-clock seconds per call; the kernel is killed and restarted past this
+RUN_CODE_CPU_SECONDS = 120  # CPU seconds per call (RLIMIT_CPU, Linux/macOS)
+RUN_CODE_MEMORY_MB = 4096  # address-space cap per kernel (RLIMIT_AS; R workers: Linux only); 0 disables
+RUN_CODE_MAX_KERNELS = 4  # concurrent runs with a live kernel; least recently used is recycled
+RUN_CODE_WARM_SPARE = True  # keep one pre-started kernel ready for the next run
+RUN_CODE_MAX_OUTPUT_CHARS = 20000  # output returned to the agent is truncated beyond this
 
 # Determine npx command based on OS
 IS_WINDOWS = os.name == 'nt'
@@ -69,6 +112,33 @@ TAVILY_ARGS = ["@modelcontextprotocol/server-tavily-search"]
 TAVILY_ENV = {"TAVILY_API_KEY": TAVILY_API_KEY}
 TAVILY_MAX_RESULTS = 5
 
+# Shared provider connection pools (tools/providers.py)
+PROVIDER_POOL_SIZE = 20  # keep-alive connections per provider
+PROVIDER_TIMEOUT = 60  # seconds, search/fetch HTTP calls
+OCR_TIMEOUT = 300  # seconds, Mistral OCR calls
+
+# Persistent OCR cache (tools/ocr_cache.py), keyed by SHA-256 of the PDF bytes
+OCR_MODEL = "mistral-ocr-latest"
+OCR_CACHE_ENABLED = True
+OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", ".cache/ocr")
+OCR_CACHE_MAX_BYTES = 500 * 1024 * 1024  # LRU-evicted above this size
+
+# Text-layer fast path (tools/pdf_text.py): pages with a clean embedded text layer are
+# extracted locally; only scanned or garbled pages are sent to OCR.
+PDF_TEXT_FAST_PATH = True
+PDF_TEXT_MIN_CHARS = 200  # below this, pages with images are treated as scanned
+PDF_TEXT_MIN_READABLE_RATIO = 0.9  # share of letters/digits/punctuation in the extracted text
+
+# Sharded OCR (tools/pdf_ocr.py): pages needing OCR are sent in page-range shards
+OCR_SHARD_PAGES = 32  # pages per OCR request
+OCR_MAX_CONCURRENCY = 4  # shards in flight per document
+OCR_SHARD_RETRIES = 3  # attempts per shard before it is marked as failed
+
+# Streaming PDF input (tools/pdf_io.py)
+PDF_MAX_BYTES = 100 * 1024 * 1024  # downloads/files above this are rejected
+PDF_CHUNK_SIZE = 1024 * 1024  # download, hashing and upload chunk size
+OCR_INLINE_MAX_BYTES = 8 * 1024 * 1024  # larger OCR payloads are uploaded instead of sent as a data URI
+
 LINKUP_CMD = NPX_CMD
 LINKUP_ARGS = ["-y", "linkup-mcp-server"]
 LINKUP_ENV = {}
@@ -77,13 +147,53 @@ SEQUENTIAL_CMD = NPX_CMD
 SEQUENTIAL_ARGS = ["-y", "@modelcontextprotocol/server-sequential-thinking"]
 SEQUENTIAL_ENV = {}
 
-
-FILESYSTEM_CMD = NPX_CMD
-FILESYSTEM_ARGS = ["@modelcontextprotocol/server-filesystem", "-y", r"C:\Users\abdur\OneDrive\Work\compete-grok"]
-FILESYSTEM_ENV = {}
-
-if not XAI_API_KEY:
-    print("Warning: XAI_API_KEY missing. Tools/LLMs will use mocks.")
+# Token-budgeted agent context (context_builder.py): each agent node receives the original
+# query plus the newest prior answers that fit its budget; tool-call turns and routing
+# notes are left out. Budgets are in tokens; None means unlimited.
+CONTEXT_TOKEN_BUDGETS = {
+    "default": 16000,
+    "verifier": 24000,  # needs the full citation lists of research agents
+    "synthesis": 48000,  # integrates every agent's answer
+}
+CONTEXT_TOKENIZER = "o200k_base"  # tiktoken encoding; None (or tiktoken unavailable) estimates 4 chars/token
+CONTEXT_MIN_TRUNCATED_TOKENS = 200  # below this, an answer that does not fit is dropped rather than cut
+CONTEXT_SOURCES_MAX_TOKENS = 8000  # cap on the synthesis "Collected Sources" block; later sources are left out
+
+# Uploaded-document store (tools/document_store.py): uploads are chunked by page and section
+# and BM25-indexed; agents pull passages with search_documents / read_chunk instead of
+# receiving whole documents in their context.
+DOCUMENT_STORE_DIR = os.getenv("DOCUMENT_STORE_DIR", ".cache/documents")
+DOCUMENT_CHUNK_CHARS = 2000  # about 500 tokens per chunk
+DOCUMENT_SEARCH_MAX_K = 20  # passages per search_documents call
+DOCUMENT_SNIPPET_CHARS = 300  # snippet length in search results
+
+# sequential_thinking state (tools/sequential_thinking.py), kept per run and per agent
+SEQUENTIAL_THINKING_MAX_HISTORY = 50  # thoughts kept per store (and per branch); oldest dropped first
+SEQUENTIAL_THINKING_WINDOW = 5  # recent thoughts echoed back with each call, including the current one
+SEQUENTIAL_THINKING_SUMMARY_CHARS = 200  # earlier thoughts in the window are truncated to this length
+
+# In-process file readers (tools/fs_sandbox.py): only files under these roots can be read.
+# Override with FILESYSTEM_ROOTS (os.pathsep-separated).
+FILESYSTEM_ROOTS = [p for p in os.getenv("FILESYSTEM_ROOTS", "").split(os.pathsep) if p] or \
+    list(dict.fromkeys([os.path.dirname(os.path.abspath(__file__)), os.getcwd()]))
+FILE_READ_MAX_BYTES = 2 * 1024 * 1024  # per file
+FILE_READ_MAX_TOTAL_BYTES = 8 * 1024 * 1024  # per read_multiple_files call
+FILE_MMAP_THRESHOLD = 1024 * 1024  # files at least this large are read via mmap
+FILE_READ_WORKERS = 8  # concurrent reads in read_multiple_files
+
+# app.py --batch: queries in flight at once (override per run with --workers). Each query
+# runs its own workflow, so this also multiplies concurrent LLM and provider requests.
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', 4))
+
+# app.py --file: uploads converted (OCR) at once per query. Conversion starts before
+# TeamFormation, so it overlaps agent selection; the workflow starts once all are done.
+UPLOAD_WORKERS = int(os.getenv('UPLOAD_WORKERS', 4))
+
+# app.py --serve: local HTTP/JSON query server (server.py) with warm agents
+SERVE_HOST = os.getenv('SERVE_HOST', "127.0.0.1")
+SERVE_PORT = int(os.getenv('SERVE_PORT', 8765))
+SERVE_WORKERS = int(os.getenv('SERVE_WORKERS', 4))  # queries run concurrently; more are queued
+SERVE_MAX_JOBS = 200  # finished queries kept for status lookups; oldest are forgotten first
 
 LOG_LEVEL = 'DEBUG' if os.getenv('VERBOSE') else 'INFO'
 
@@ -108,3 +218,13 @@ STRICT_MODE = True
 MAX_CURRENT_ITERATION = 8
 HISTORY_THRESHOLD = 1
 DEBATE_ROUND_LIMIT = 2
+
+# Execution mode for create_workflow:
+# - "plan": compile the TeamFormation selection into a static DAG
+#   (specialists -> verifier -> debate -> synthesis) and run it level by level.
+# - "supervisor": re-plan the next hop in a supervisor node after every agent.
+EXECUTION_MODE = "plan"
+
+# Parallel fan-out (supervisor mode): when True, the supervisor dispatches every ready specialist agent
+# in the same graph step instead of one per supervisor pass.
+PARALLEL_FANOUT = True
@@ -0,0 +1,194 @@
+"""Token-budgeted context assembly for agent nodes.
+
+Agent nodes used to pass the whole shared message list to every agent:
+routing notes, tool-call round trips and every earlier agent's scratch work.
+As a result, each agent later in the pipeline paid for a larger prompt.
+build_context() assembles a smaller context instead:
+
+- the original query (the first HumanMessage) is always kept;
+- final answers of earlier agents (AIMessages without tool calls) are kept,
+  newest first, until the agent's token budget is used up. The newest answer
+  that does not fit whole is truncated; older ones are dropped;
+- tool calls and tool results are replaced by a one-line note of which tools ran;
+- supervisor routing notes are dropped; other system notes (errors,
+  remediation, moderator feedback) are kept like answers;
+- collected sources are passed to the synthesis agent, as many as fit in
+  CONTEXT_SOURCES_MAX_TOKENS, so a long source list cannot crowd out the answers.
+
+Tokens are counted with tiktoken when its encoding is available, otherwise
+estimated at CHARS_PER_TOKEN characters per token.
+"""
+
+import functools
+import json
+import logging
+from collections import Counter
+from typing import Any, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+import config
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4  # role and separators per chat message
+TRUNCATION_MARKER = "\n[... truncated to fit the context budget ...]"
+
+# Bookkeeping left in the shared history by the supervisor / planner; never useful to an agent
+_ROUTING_PREFIXES = ("Route data:", "Deterministic routes:", "Execution plan:")
+
+
+@functools.lru_cache(maxsize=None)
+def _encoder(name: Optional[str]):
+    """tiktoken encoding, or None when tiktoken or its (downloaded) encoding is unavailable."""
+    if not name:
+        return None
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception as e:  # not installed, or no network to fetch the BPE file
+        logger.info("Token counting falls back to a character estimate: %s", e)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoder = _encoder(config.CONTEXT_TOKENIZER)
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Leading part of text that fits in max_tokens (including the truncation marker)."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    keep = max(0, max_tokens - count_tokens(TRUNCATION_MARKER))
+    encoder = _encoder(config.CONTEXT_TOKENIZER)
+    if encoder is not None:
+        head = encoder.decode(encoder.encode(text, disallowed_special=())[:keep])
+    else:
+        head = text[:keep * CHARS_PER_TOKEN]
+    return head + TRUNCATION_MARKER
+
+
+def _content_text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return json.dumps(content, default=str)
+
+
+def message_tokens(message: BaseMessage) -> int:
+    tokens = count_tokens(_content_text(message)) + MESSAGE_OVERHEAD_TOKENS
+    for call in getattr(message, "tool_calls", None) or []:
+        tokens += count_tokens(call.get("name", "") + json.dumps(call.get("args", {}), default=str))
+    return tokens
+
+
+def token_budget(agent_name: str) -> Optional[int]:
+    """Context budget for agent_name (None: unlimited)."""
+    budgets = config.CONTEXT_TOKEN_BUDGETS
+    return budgets.get(agent_name, budgets.get("default"))
+
+
+def _is_relevant(message: BaseMessage) -> bool:
+    """Final answers, follow-up instructions and non-routing notes; not tool-call turns."""
+    if isinstance(message, HumanMessage):
+        return True
+    if isinstance(message, AIMessage):
+        return not getattr(message, "tool_calls", None) and bool(_content_text(message).strip())
+    if isinstance(message, SystemMessage):
+        return not _content_text(message).startswith(_ROUTING_PREFIXES)
+    return False
+
+
+def _sources_message(sources: list[dict[str, Any]], max_tokens: Optional[int]) -> SystemMessage:
+    """The synthesis "Collected Sources" note, keeping the first sources that fit in max_tokens."""
+    header = "Collected Sources:\n"
+    items = [json.dumps(source, separators=(',', ':')) for source in sources]
+    if max_tokens is not None:
+        # Room for the header, brackets, the omission note and the message overhead
+        available = max_tokens - count_tokens(header) - MESSAGE_OVERHEAD_TOKENS - 24
+        for count, item in enumerate(items):
+            available -= count_tokens(item) + 1
+            if available < 0:
+                items = items[:count]
+                break
+    text = header + "[" + ",".join(items) + "]"
+    if len(items) < len(sources):
+        text += f"\n({len(sources) - len(items)} more source(s) omitted to fit the context budget.)"
+    return SystemMessage(content=text)
+
+
+def build_context(messages: Sequence[BaseMessage], agent_name: str,
+                  sources: Optional[list[dict[str, Any]]] = None,
+                  budget: Optional[int] = None) -> list[BaseMessage]:
+    """Select and trim the messages passed to agent_name.
+
+    Args:
+        messages: The shared conversation (state["messages"]).
+        agent_name: Agent the context is built for; selects its budget.
+        sources: Collected sources, injected for the synthesis agent.
+        budget: Token budget, overriding CONTEXT_TOKEN_BUDGETS.
+
+    Returns:
+        list[BaseMessage]: Messages in their original order, plus a note on what was omitted.
+    """
+    budget = budget if budget is not None else token_budget(agent_name)
+    query_index = next((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), None)
+
+    tool_calls: Counter = Counter()
+    answers = []
+    for i, message in enumerate(messages):
+        if i == query_index:
+            continue
+        if isinstance(message, ToolMessage):
+            tool_calls[message.name or "tool"] += 1
+        elif _is_relevant(message):
+            answers.append(i)
+
+    remaining = budget
+    kept: dict[int, BaseMessage] = {}
+    if query_index is not None:
+        kept[query_index] = messages[query_index]
+        if remaining is not None:
+            remaining -= message_tokens(messages[query_index])
+
+    extra: list[BaseMessage] = []
+    if agent_name == "synthesis" and sources:
+        cap = config.CONTEXT_SOURCES_MAX_TOKENS
+        if remaining is not None:
+            cap = max(0, remaining) if cap is None else min(cap, max(0, remaining))
+        extra.append(_sources_message(sources, cap))
+        if remaining is not None:
+            remaining -= message_tokens(extra[-1])
+
+    dropped = truncated = 0
+    for i in reversed(answers):  # newest answers are the most relevant to the next agent
+        message = messages[i]
+        cost = message_tokens(message)
+        if remaining is None or cost <= remaining:
+            kept[i] = message
+            remaining = None if remaining is None else remaining - cost
+        elif remaining > config.CONTEXT_MIN_TRUNCATED_TOKENS:
+            text = truncate_to_tokens(_content_text(message), remaining - MESSAGE_OVERHEAD_TOKENS)
+            kept[i] = message.model_copy(update={"content": text})
+            remaining = 0
+            truncated += 1
+        else:
+            dropped += 1
+
+    notes = []
+    if tool_calls:
+        calls = ", ".join(f"{name} x{count}" for name, count in tool_calls.most_common())
+        notes.append(f"Earlier tool calls omitted ({calls}); their results are reflected in the agent answers above.")
+    if dropped or truncated:
+        notes.append(f"{dropped} older agent answer(s) omitted and {truncated} truncated to fit the context budget.")
+    if notes:
+        extra.append(SystemMessage(content="Context note: " + " ".join(notes)))
+
+    context = [kept[i] for i in sorted(kept)] + extra
+    logger.debug("Context for %s: %d -> %d messages, ~%d tokens (budget %s)", agent_name, len(messages),
+                 len(context), sum(message_tokens(m) for m in context), budget)
+    return context
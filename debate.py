@@ -4,12 +4,13 @@ from typing import TypedDict, Sequence, Any, Optional
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import BaseMessage, SystemMessage, AIMessage
 import logging
-import json
-import re
 
 from agents import agents
 import config
 from exceptions import DebateError
+from json_utils import first_object
+from run_context import agent_scope
+from telemetry import timed_node
 
 logger = logging.getLogger(__name__)
 
@@ -18,11 +19,13 @@ class DebateState(TypedDict):
     debate_round: int
     should_continue: bool
 
+@timed_node("pro")
 def pro_node(state: DebateState) -> dict:
     """Invoke the pro debate agent and return updated messages."""
     logger.debug("Entering pro_node")
     try:
-        result = agents["pro"].invoke({"messages": state["messages"]})
+        with agent_scope("pro"):
+            result = agents["pro"].invoke({"messages": state["messages"]})
         logger.info("Pro agent completed successfully")
         return {"messages": result["messages"]}
     except Exception as e:
@@ -30,11 +33,13 @@ def pro_node(state: DebateState) -> dict:
         error_msg = f"Error in pro debate agent: {e}. Reflect: retry or caveats."
         return {"messages": [SystemMessage(content=error_msg)]}
 
+@timed_node("cons")
 def cons_node(state: DebateState) -> dict:
     """Invoke the cons debate agent and return updated messages."""
     logger.debug("Entering cons_node")
     try:
-        result = agents["cons"].invoke({"messages": state["messages"]})
+        with agent_scope("cons"):
+            result = agents["cons"].invoke({"messages": state["messages"]})
         logger.info("Cons agent completed successfully")
         return {"messages": result["messages"]}
     except Exception as e:
@@ -42,11 +47,13 @@ def cons_node(state: DebateState) -> dict:
         error_msg = f"Error in cons debate agent: {e}. Reflect: retry or caveats."
         return {"messages": [SystemMessage(content=error_msg)]}
 
+@timed_node("arbiter")
 def arbiter_node(state: DebateState) -> dict:
     """Invoke the arbiter debate agent and increment debate round."""
     logger.debug("Entering arbiter_node")
     try:
-        result = agents["arbiter"].invoke({"messages": state["messages"]})
+        with agent_scope("arbiter"):
+            result = agents["arbiter"].invoke({"messages": state["messages"]})
         logger.info("Arbiter agent completed successfully")
         
         # Parse should_continue and feedback from arbiter output
@@ -56,16 +63,13 @@ def arbiter_node(state: DebateState) -> dict:
         
         if isinstance(last_msg, AIMessage):
             content = last_msg.content
-            # Look for JSON containing should_continue
-            # Use a more permissive regex to capture the full JSON object including feedback
-            json_match = re.search(r'\{.*"should_continue".*\}', content, re.DOTALL)
-            if json_match:
-                try:
-                    data = json.loads(json_match.group())
-                    should_continue = data.get("should_continue", False)
-                    feedback = data.get("feedback")
-                except json.JSONDecodeError:
-                    logger.warning("Failed to parse JSON from arbiter output")
+            # Look for the JSON object containing should_continue (and feedback)
+            data = first_object(content, lambda value: "should_continue" in value)
+            if data is not None:
+                should_continue = data.get("should_continue", False)
+                feedback = data.get("feedback")
+            elif "should_continue" in content:
+                logger.warning("Failed to parse JSON from arbiter output")
         
         # Inject feedback as a SystemMessage if continuing
         messages = result["messages"]
@@ -1,10 +1,9 @@
-from typing import TypedDict, Annotated, Sequence, Optional, Any
+from typing import TypedDict, Annotated, Sequence, Optional, Any, Union
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 import operator
 import logging
 import json
-import re
 from langchain_core.messages import SystemMessage
 
 logger = logging.getLogger(__name__)
@@ -18,6 +17,10 @@ from langchain_core.tools import tool
 import config
 from debate import debate_app, DebateState
 from exceptions import WorkflowError, AgentError, DebateError
+from run_context import agent_scope
+from context_builder import build_context
+from json_utils import first_object, json_spans, largest_json
+from telemetry import timed_node
 
 @tool
 def route_to_econpaper(reason: str) -> str:
@@ -74,9 +77,9 @@ router_tools = [
 def parse_supervisor_output(state):
     """Parse the Supervisor's JSON output from the last AIMessage in the state.
 
-    Extracts routing decision data (route, confidence, justify) from the last message's
-    content using regex to find JSON objects. If no JSON is found or parsing fails,
-    returns default values indicating end of workflow.
+    Extracts routing decision data (route, confidence, justify) from the first JSON
+    object embedded in the last message's content (see json_utils). If no JSON is
+    found or parsing fails, returns default values indicating end of workflow.
 
     Args:
         state (dict): The current agent state containing messages.
@@ -91,12 +94,15 @@ def parse_supervisor_output(state):
             logger.warning("No messages in state for parsing")
             return {"route": "END", "confidence": 1.0, "justify": "No messages"}
         msg = state["messages"][-1].content
-        # Use regex to find the first JSON object in the message content
-        json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', msg, re.DOTALL)
-        if not json_match:
+        # Find the first JSON object in the message content
+        spans = json_spans(msg)
+        if not spans:
             logger.warning("No JSON found in supervisor output")
             return {"route": "END", "confidence": 1.0, "justify": "No JSON found"}
-        route_data = json.loads(json_match.group())
+        route_data = first_object(msg, spans=spans)
+        if route_data is None:
+            logger.error("JSON parsing failed in supervisor output: no valid JSON object")
+            return {"route": "END", "confidence": 0.5, "justify": "JSON parse fail"}
         # Persist route data in a system message for report/logging purposes
         next_msg = SystemMessage(content=f"Route data: {route_data}")
         state["messages"].append(next_msg)  # Temp log
@@ -161,20 +167,85 @@ If documents are present in the state, prioritize docanalyzer.
 
 **FINAL SYNTHESIS:** When finishing without tool calls, provide a comprehensive, complete synthesis that directly answers the original query using all information from agent outputs. Include step-by-step explanations, mathematical derivations, caveats, and references as appropriate. Do not provide partial or summary responses."""
 
+def merge_sources(existing: list[dict], new: list[dict]) -> list[dict]:
+    """Reducer for the `sources` channel.
+
+    Appends the sources reported by a node to the accumulated list, skipping any
+    URL that is already present. Lets parallel agent nodes each return only the
+    sources they found without overwriting one another.
+
+    Args:
+        existing (list[dict]): Sources accumulated so far.
+        new (list[dict]): Sources returned by a node.
+
+    Returns:
+        list[dict]: Merged, URL-deduplicated list of sources.
+    """
+    merged = list(existing or [])
+    seen_urls = {s.get("url") for s in merged if isinstance(s, dict)}
+    for source in new or []:
+        url = source.get("url") if isinstance(source, dict) else None
+        if url and url in seen_urls:
+            continue
+        merged.append(source)
+        if url:
+            seen_urls.add(url)
+    return merged
+
+def merge_errors(existing: Optional[str], new: Optional[str]) -> Optional[str]:
+    """Reducer for the `last_error` channel.
+
+    Writing None clears the error. Errors reported by agents that failed in the
+    same parallel step are joined so remediation sees all of them.
+
+    Args:
+        existing (Optional[str]): Current error, if any.
+        new (Optional[str]): Error written by a node, or None to clear.
+
+    Returns:
+        Optional[str]: The combined error, or None.
+    """
+    if new is None or not existing:
+        return new
+    return f"{existing}\n{new}"
+
+def keep_latest(existing: Any, new: Any) -> Any:
+    """Reducer that keeps the most recently written value."""
+    return new
+
+def merge_failed_agents(existing: Optional[list[str]], new: Optional[list[str]]) -> list[str]:
+    """Reducer for the `failed_agents` channel.
+
+    Writing None clears the list. Agents that fail in the same parallel step
+    are all kept (once each), unlike `last_agent`, which keeps only one of them.
+
+    Args:
+        existing (Optional[list[str]]): Agents that failed so far.
+        new (Optional[list[str]]): Agents that failed in this step, or None to clear.
+
+    Returns:
+        list[str]: The failed agents, in order of failure.
+    """
+    if new is None:
+        return []
+    existing = existing or []
+    return existing + [name for name in new if name not in existing]
+
 class AgentState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], operator.add]
     routes: list[str]
     final_synthesis: str
-    documents: list[str]
-    iteration_count: int
-    routing_history: list[str]
-    sources: list[dict]
+    documents: list[dict]  # descriptors of the uploads (tools/document_store.py), not their text
+    iteration_count: Annotated[int, operator.add]
+    routing_history: Annotated[list[str], operator.add]
+    sources: Annotated[list[dict], merge_sources]
     debate_round: int
     debate_count: int
     force_debate: bool
-    last_error: Optional[str]
+    last_error: Annotated[Optional[str], merge_errors]
     remediation_decision: Optional[dict]
-    last_agent: str
+    last_agent: Annotated[str, keep_latest]
+    failed_agents: Annotated[list[str], merge_failed_agents]
 
 def parse_route_tool(name: str) -> str:
     """Parse the agent name from a route tool function name.
@@ -210,21 +281,21 @@ def route_agent(state) -> str:
     else:
         return "supervisor"
 
-def route_remediation(state) -> str:
+def route_remediation(state) -> Union[str, list[str]]:
     """Route based on remediation decision.
 
-    Handles rephrase (back to last agent), fallback/abort (to supervisor or END).
+    Handles rephrase (back to the failed agents), fallback/abort (to supervisor or END).
 
     Args:
         state (dict): The current agent state with remediation_decision.
 
     Returns:
-        str: Next node name or END.
+        Union[str, list[str]]: Next node name(s) or END.
     """
     decision = state.get("remediation_decision", {})
     action = decision.get("action")
     if action == "rephrase":
-        return state.get("last_agent", "supervisor")
+        return state.get("failed_agents") or state.get("last_agent", "supervisor")
     elif action == "fallback":
         # For simplicity, go to supervisor to handle fallback
         return "supervisor"
@@ -233,14 +304,51 @@ def route_remediation(state) -> str:
     else:
         return "supervisor"
 
-def create_workflow(selected_agents: list[str]) -> Any:
+SPECIALIST_AGENTS = ["econpaper", "econquant", "explainer", "marketdef", "docanalyzer", "caselaw"]
+CITATION_AGENTS = ["econpaper", "caselaw"]
+DEBATE_AGENTS = ["pro", "cons", "arbiter"]
+
+def build_execution_plan(selected_agents: list[str]) -> list[list[str]]:
+    """Compile the TeamFormation selection into a static execution plan.
+
+    The plan is a list of levels forming a dependency DAG: specialists →
+    verifier → debate → synthesis. Nodes within a level are independent and run
+    in the same graph step; each level waits for the one before it. Empty levels
+    are omitted, and the verifier is only planned when a citation-producing agent
+    (econpaper, caselaw) is selected.
+
+    Args:
+        selected_agents (list[str]): Agent names selected by TeamFormation.
+
+    Returns:
+        list[list[str]]: Ordered levels of graph node names.
+    """
+    specialists = [a for a in SPECIALIST_AGENTS if a in selected_agents]
+    levels = [specialists]
+    if "verifier" in selected_agents and any(a in specialists for a in CITATION_AGENTS):
+        levels.append(["verifier"])
+    if any(a in selected_agents for a in DEBATE_AGENTS):
+        levels.append(["debate"])
+    if "synthesis" in selected_agents:
+        levels.append(["synthesis"])
+    return [level for level in levels if level]
+
+def create_workflow(selected_agents: list[str], mode: Optional[str] = None, checkpointer: Any = None) -> Any:
     """Create the LangGraph workflow for the CompeteGrok agent system.
 
-    Builds a state graph with supervisor, agent nodes, debate subgraph, and remediation,
-    based on selected agents. Includes routing logic, loop prevention, and conditional edges.
+    Builds a state graph with agent nodes, debate subgraph, and remediation, based on
+    selected agents. In "plan" mode the selection is compiled once into an execution
+    plan (see build_execution_plan). Each level's agents feed one join node, which
+    sends the level to remediation if any of them failed and otherwise advances.
+    In "supervisor" mode a supervisor node decides the next hop after every agent,
+    with routing logic, loop prevention, and conditional edges; agents it
+    dispatches together also meet at a join before remediation or the supervisor.
 
     Args:
         selected_agents (list[str]): List of selected agent names.
+        mode (Optional[str]): "plan" or "supervisor". Defaults to config.EXECUTION_MODE.
+        checkpointer (Any): LangGraph checkpointer that saves the state after every step
+            (see checkpoints.py); invoke with a thread_id in the config to use it.
 
     Returns:
         Compiled LangGraph app ready for invocation.
@@ -248,12 +356,16 @@ def create_workflow(selected_agents: list[str]) -> Any:
     Raises:
         WorkflowError: If workflow creation fails.
     """
-    logger.debug("Creating workflow with selected agents: %s", selected_agents)
+    mode = mode or config.EXECUTION_MODE
+    logger.debug("Creating %s workflow with selected agents: %s", mode, selected_agents)
     try:
+        if mode not in ("plan", "supervisor"):
+            raise ValueError(f"Unknown execution mode: {mode}")
+
         # Validate and filter selected agents to only include valid ones
         valid_agents = ["econpaper", "econquant", "explainer", "marketdef", "docanalyzer", "caselaw", "synthesis", "verifier"]
         AGENT_NAMES = [name for name in selected_agents if name in valid_agents]
-        include_debate = any(name in selected_agents for name in ["pro", "con", "arbiter"])
+        include_debate = any(name in selected_agents for name in DEBATE_AGENTS)
 
         # Filter router_tools based on selected agents
         router_tools_filtered = []
@@ -267,18 +379,25 @@ def create_workflow(selected_agents: list[str]) -> Any:
                 router_tools_filtered.append(tool)
 
         # Create supervisor with filtered tools
-        supervisor_router_filtered = create_agent(
-            "supervisor_router",
-            SUPERVISOR_MODEL,
-            ROUTER_PROMPT,
-            tools=router_tools_filtered + [sequential_thinking]
-        )
+        if mode == "supervisor":
+            supervisor_router_filtered = create_agent(
+                "supervisor_router",
+                SUPERVISOR_MODEL,
+                ROUTER_PROMPT,
+                tools=router_tools_filtered + [sequential_thinking]
+            )
 
         agent_map = {name: name for name in AGENT_NAMES}
         if include_debate:
             agent_map["debate"] = "debate"
 
         def route_supervisor(state):
+            """Map the supervisor's routes to the next node(s).
+
+            With PARALLEL_FANOUT enabled, every route is returned at once so LangGraph
+            runs the agents in the same step; their updates are merged by the
+            AgentState reducers. Otherwise only the first route is followed.
+            """
             routes = state.get("routes", [])
             iteration_count = state.get("iteration_count", 0)
             routing_history = state.get("routing_history", [])
@@ -287,7 +406,9 @@ def create_workflow(selected_agents: list[str]) -> Any:
                 # Check if routing to same agent repeatedly
                 if any(routing_history.count(route) > 1 for route in routes):
                     return END
-                return routes[0]  # Single route for conditional; extend to parallel if needed
+                if config.PARALLEL_FANOUT:
+                    return list(routes)
+                return routes[0]
 
             # If no routes, route to synthesis for final synthesis if synthesis is selected, else end
             if "synthesis" in AGENT_NAMES:
@@ -307,29 +428,12 @@ def create_workflow(selected_agents: list[str]) -> Any:
             def node(state: AgentState) -> dict:
                 logger.debug("Entering agent node: %s", agent_name)
                 try:
-                    # For synthesis, filter messages to reduce context size
-                    messages_to_use = state["messages"]
-                    if agent_name == "synthesis":
-                        # Filter to key agent outputs: AIMessages without tool_calls (final responses) that are not routing messages
-                        filtered_messages = []
-                        for msg in state["messages"]:
-                            if isinstance(msg, AIMessage):
-                                content_lower = msg.content.lower()
-                                # Exclude supervisor routing messages and messages with tool_calls
-                                if not any(word in content_lower for word in ["route", "current state", "force debate"]) and not hasattr(msg, "tool_calls") or not msg.tool_calls:
-                                    filtered_messages.append(msg)
-                            elif isinstance(msg, HumanMessage):
-                                # Include the original query
-                                filtered_messages.append(msg)
-                        
-                        # Inject collected sources
-                        if state.get("sources"):
-                            sources_str = json.dumps(state["sources"], indent=2)
-                            filtered_messages.append(SystemMessage(content=f"Collected Sources:\n{sources_str}"))
-                        
-                        messages_to_use = filtered_messages
-
-                    result = agents[agent_name].invoke({"messages": messages_to_use})
+                    # Pass the query and prior answers that fit this agent's token budget,
+                    # not the whole history (tool chatter, routing notes, scratch work)
+                    messages_to_use = build_context(state["messages"], agent_name, sources=state.get("sources"))
+
+                    with agent_scope(agent_name):
+                        result = agents[agent_name].invoke({"messages": messages_to_use})
                     
                     # Calculate new messages to avoid duplication
                     new_messages = result["messages"][len(messages_to_use):]
@@ -343,17 +447,10 @@ def create_workflow(selected_agents: list[str]) -> Any:
                                 if not content or not content.strip():
                                     raise ValueError("Empty output from agent")
 
-                                # Extract JSON list or object
-                                json_match = re.search(r'(\[.*\]|\{.*\})', content, re.DOTALL)
-                                if json_match:
-                                    json_str = json_match.group(1)
-                                    try:
-                                        data = json.loads(json_str)
-                                    except json.JSONDecodeError:
-                                        # Fallback to whole string if regex extraction failed
-                                        data = json.loads(content)
-                                else:
-                                    # Fallback to whole string if no regex match
+                                # Extract the JSON list or object (the largest embedded value)
+                                data = largest_json(content)
+                                if data is None:
+                                    # Fallback to whole string; raises if it is not JSON either
                                     data = json.loads(content)
                                     
                                 if agent_name == "econpaper":
@@ -384,19 +481,14 @@ def create_workflow(selected_agents: list[str]) -> Any:
                                 final_synthesis = msg.content
                                 break
 
-                    # Collect sources from tool outputs
+                    # Collect sources from tool outputs (merged into state by merge_sources)
                     new_sources = []
                     existing_urls = {s.get("url") for s in state.get("sources", [])}
                     for msg in result["messages"]:
                         if isinstance(msg, AIMessage) and msg.content:
                             try:
                                 # Extract JSON if embedded in text
-                                content = msg.content
-                                json_match = re.search(r'(\[.*\]|\{.*\})', content, re.DOTALL)
-                                if json_match:
-                                    data = json.loads(json_match.group(1))
-                                else:
-                                    data = json.loads(content)
+                                data = largest_json(msg.content)
 
                                 # Normalize to list of items
                                 items = []
@@ -428,29 +520,32 @@ def create_workflow(selected_agents: list[str]) -> Any:
                             except (json.JSONDecodeError, AttributeError):
                                 pass
 
-                    return {
+                    # Return deltas only: agents may run in parallel, and the
+                    # AgentState reducers merge their updates.
+                    update = {
                         "messages": new_messages,
-                        "iteration_count": state.get("iteration_count", 0) + 1,
-                        "routing_history": state.get("routing_history", []) + [agent_name],
-                        "final_synthesis": final_synthesis,
-                        "sources": state.get("sources", []) + new_sources,
-                        "last_error": None,
-                        "last_agent": agent_name
+                        "iteration_count": 1,
+                        "routing_history": [agent_name],
+                        "sources": new_sources,
                     }
+                    if agent_name == "synthesis":
+                        update["final_synthesis"] = final_synthesis
+                    return update
                 except Exception as e:
                     logger.error("Error in %s: %s", agent_name, str(e), exc_info=True)
                     error_msg = f"Error in {agent_name}: {e}. Reflect: retry or caveats."
-                    final_synthesis = error_msg if agent_name == "synthesis" else state.get("final_synthesis", "")
-                    return {
+                    update = {
                         "messages": [SystemMessage(content=error_msg)],
-                        "iteration_count": state.get("iteration_count", 0) + 1,
-                        "routing_history": state.get("routing_history", []) + [agent_name],
-                        "final_synthesis": final_synthesis,
-                        "sources": state.get("sources", []),
+                        "iteration_count": 1,
+                        "routing_history": [agent_name],
                         "last_error": error_msg,
-                        "last_agent": agent_name
+                        "last_agent": agent_name,
+                        "failed_agents": [agent_name]
                     }
-            return node
+                    if agent_name == "synthesis":
+                        update["final_synthesis"] = error_msg
+                    return update
+            return timed_node(agent_name)(node)
 
         agent_nodes = {name: create_agent_node(name) for name in AGENT_NAMES}
 
@@ -484,22 +579,25 @@ def create_workflow(selected_agents: list[str]) -> Any:
 
                 # Deterministic routing logic based on selected_agents and routing_history
                 routing_history = state.get("routing_history", [])
-                last_agent = routing_history[-1] if routing_history else None
+                last_verifier = max((i for i, a in enumerate(routing_history) if a == "verifier"), default=-1)
+                unverified_research = any(a in ["econpaper", "caselaw"] for a in routing_history[last_verifier + 1:])
 
-                # Enforce verification: If econpaper or caselaw just ran, route to verifier
-                # unless verifier has already run for that specific research iteration.
-                if last_agent in ["econpaper", "caselaw"] and "verifier" in selected_agents:
+                # Enforce verification: If econpaper or caselaw ran since the last verifier
+                # pass, route to verifier before anything else.
+                if unverified_research and "verifier" in selected_agents:
                     routes = ["verifier"]
                 else:
-                    agents_to_route = [a for a in selected_agents if a not in ["synthesis", "verifier", "pro", "cons", "arbiter"] and a not in routing_history]
+                    agents_to_route = [a for a in selected_agents if a not in ["synthesis", "verifier", "pro", "cons", "arbiter"] and a in agent_map and a not in routing_history]
                     if agents_to_route:
-                        routes = [agents_to_route[0]]
+                        # Independent specialists are dispatched together in parallel mode
+                        routes = agents_to_route if config.PARALLEL_FANOUT else [agents_to_route[0]]
                     elif state.get("force_debate", False) and any(name in selected_agents for name in ["pro", "cons", "arbiter"]):
                         routes = ["debate"]
                     else:
                         routes = []
 
                 # Update routing_history
+                history_delta = list(routes)
                 routing_history = routing_history + routes
 
                 # Add routing message
@@ -511,8 +609,8 @@ def create_workflow(selected_agents: list[str]) -> Any:
                 # Check for loops
                 if current_iteration >= config.MAX_CURRENT_ITERATION:  # Hard limit
                     routes = []
-                elif len([h for h in routing_history if h in routes]) > config.HISTORY_THRESHOLD:  # Same agent twice
-                    routes = []
+                else:  # Same agent twice
+                    routes = [r for r in routes if routing_history.count(r) <= config.HISTORY_THRESHOLD]
 
                 # Set synthesis if no routes determined
                 final_synthesis = ""
@@ -523,10 +621,10 @@ def create_workflow(selected_agents: list[str]) -> Any:
                 return {
                     "messages": [routing_msg],
                     "routes": routes,
-                    "iteration_count": state.get("iteration_count", 0),
-                    "routing_history": routing_history,
+                    "routing_history": history_delta,
                     "final_synthesis": final_synthesis,
-                    "sources": state.get("sources", [])
+                    "last_error": None,
+                    "failed_agents": None
                 }
             except json.JSONDecodeError as e:
                 logger.error("JSON parsing error in supervisor: %s", str(e), exc_info=True)
@@ -537,13 +635,91 @@ def create_workflow(selected_agents: list[str]) -> Any:
 
         # Main workflow
         workflow = StateGraph(AgentState)
-        workflow.add_node("supervisor", supervisor_node)
+        if mode == "plan":
+            plan = [[name for name in level if name in agent_map] for level in build_execution_plan(selected_agents)]
+            plan = [level for level in plan if level]
+            level_of = {name: i for i, level in enumerate(plan) for name in level}
+            # Only planned nodes are reachable; e.g. a verifier with nothing to verify is dropped
+            agent_map = {name: name for name in agent_map if name in level_of}
+            logger.info("Execution plan: %s", " -> ".join(str(level) for level in plan))
+
         for name in AGENT_NAMES:
-            workflow.add_node(name, agent_nodes[name])
-        if include_debate:
+            if name in agent_map:
+                workflow.add_node(name, agent_nodes[name])
+        if "debate" in agent_map:
             workflow.add_node("debate", debate_node)
         workflow.add_node("remediation", remediation_node)
 
+        def join_node(state: AgentState) -> dict:
+            """Barrier after parallel agents: runs once all of the step's nodes have finished."""
+            if state.get("last_error"):
+                return {}
+            return {"failed_agents": None}  # the step succeeded; forget earlier failures
+
+        if mode == "plan":
+
+            def advance(level_index: int, state: AgentState):
+                """Return the nodes of the next runnable level after level_index, or END."""
+                for level in plan[level_index + 1:]:
+                    if level == ["debate"] and not state.get("force_debate", False):
+                        continue
+                    return list(level)
+                return END
+
+            def planner_node(state: AgentState) -> dict:
+                """Record the compiled execution plan in state before the first level runs."""
+                return {
+                    "messages": [SystemMessage(content=f"Execution plan: {plan}")],
+                    "routes": [name for level in plan for name in level]
+                }
+
+            def make_join_router(level_index: int):
+                def route_join(state: AgentState):
+                    if state.get("last_error"):
+                        return "remediation"
+                    return advance(level_index, state)
+                return route_join
+
+            def route_plan_remediation(state: AgentState):
+                """Plan-mode remediation routing: retry the failed agents or move on to the next level."""
+                decision = state.get("remediation_decision") or {}
+                action = decision.get("action")
+                failed = [name for name in state.get("failed_agents") or [] if name in level_of]
+                if action == "abort":
+                    return END
+                if not failed:
+                    return advance(level_of.get(state.get("last_agent"), -1), state)
+                # Earlier levels' failures were already remediated; only the latest level is retried
+                level_index = max(level_of[name] for name in failed)
+                if action == "rephrase" and state.get("iteration_count", 0) < config.MAX_CURRENT_ITERATION:
+                    return [name for name in failed if level_of[name] == level_index]
+                return advance(level_index, state)
+
+            next_nodes = {**agent_map, "remediation": "remediation", "__end__": END}
+            workflow.add_node("planner", planner_node)
+            workflow.set_entry_point("planner")
+            workflow.add_conditional_edges("planner", lambda state: advance(-1, state), next_nodes)
+            for index, level in enumerate(plan):
+                if level == ["synthesis"]:
+                    workflow.add_edge("synthesis", END)
+                elif level == ["debate"]:
+                    # Debate errors are reported in messages; the plan carries on
+                    workflow.add_conditional_edges("debate", lambda state, i=index: advance(i, state), next_nodes)
+                else:
+                    # Every member feeds one join, so the level is checked and advanced once,
+                    # not once per member (a failed member would otherwise fork the graph)
+                    join = f"join_{index}"
+                    workflow.add_node(join, join_node)
+                    for name in level:
+                        workflow.add_edge(name, join)
+                    workflow.add_conditional_edges(join, make_join_router(index), next_nodes)
+            workflow.add_conditional_edges("remediation", route_plan_remediation, next_nodes)
+
+            app = workflow.compile(checkpointer=checkpointer)
+            logger.info("Workflow created successfully")
+            return app
+
+        workflow.add_node("supervisor", timed_node("supervisor")(supervisor_node))
         workflow.set_entry_point("supervisor")
         workflow.add_conditional_edges(
             "supervisor",
@@ -551,10 +727,13 @@ def create_workflow(selected_agents: list[str]) -> Any:
             {**agent_map, "__end__": END, "END": END, "supervisor": "supervisor"}
         )
 
-        # Conditional edges from agents: success -> supervisor, failure -> remediation
+        # Agents dispatched together all feed one join, which checks for errors once:
+        # success -> supervisor, failure -> remediation (per-agent routing would fork the graph)
+        workflow.add_node("join", join_node)
         for name in AGENT_NAMES:
             if name != "synthesis":
-                workflow.add_conditional_edges(name, route_agent, {"supervisor": "supervisor", "remediation": "remediation"})
+                workflow.add_edge(name, "join")
+        workflow.add_conditional_edges("join", route_agent, {"supervisor": "supervisor", "remediation": "remediation"})
 
         if "synthesis" in AGENT_NAMES:
             workflow.add_edge("synthesis", END)
@@ -564,7 +743,7 @@ def create_workflow(selected_agents: list[str]) -> Any:
         # From remediation, conditional based on decision
         workflow.add_conditional_edges("remediation", route_remediation, {**agent_map, "__end__": END, "END": END, "supervisor": "supervisor"})
 
-        app = workflow.compile()
+        app = workflow.compile(checkpointer=checkpointer)
         logger.info("Workflow created successfully")
         return app
     except Exception as e:
@@ -572,6 +751,7 @@ def create_workflow(selected_agents: list[str]) -> Any:
         raise WorkflowError(f"Workflow creation failed: {e}") from e
 
 
+@timed_node("debate")
 def debate_node(state: AgentState) -> dict:
     """Invoke the debate subgraph and update state with debate results."""
     logger.debug("Entering debate node")
@@ -584,8 +764,7 @@ def debate_node(state: AgentState) -> dict:
         
         return {
             "messages": new_messages,
-            "debate_count": state.get("debate_count", 0) + 1,
-            "sources": state.get("sources", [])
+            "debate_count": state.get("debate_count", 0) + 1
         }
     except DebateError as e:
         logger.error("Debate-specific error: %s", str(e), exc_info=True)
@@ -594,22 +773,26 @@ def debate_node(state: AgentState) -> dict:
         logger.error("Unexpected error in debate: %s", str(e), exc_info=True)
         return {"messages": [SystemMessage(content=f"Error in debate: {e}. Reflect: retry or caveats.")], "last_error": str(e)}
 
+@timed_node("remediation")
 def remediation_node(state: AgentState) -> dict:
     """Handle remediation by invoking remediation agent and executing decision."""
     logger.debug("Entering remediation node")
     if not state.get("last_error"):
         logger.debug("No last error, skipping remediation")
-        return state
+        return {}
     try:
         # Create message for remediation agent
         error_msg = state["last_error"]
         task_instructions = "Process the error and decide on remediation action."
         tool_name = "unknown"  # Could be improved to extract from error
         human_msg = HumanMessage(content=f"Tool '{tool_name}' failed with error: '{error_msg}'. Task: {task_instructions}")
-        result = agents["remediation"].invoke({"messages": [human_msg]})
-        # Parse JSON decision
+        with agent_scope("remediation"):
+            result = agents["remediation"].invoke({"messages": [human_msg]})
+        # Parse JSON decision (the first JSON object, even if wrapped in prose or a code fence)
         content = result["messages"][-1].content
-        decision = json.loads(content)
+        decision = first_object(content)
+        if decision is None:
+            decision = json.loads(content)  # raises JSONDecodeError for the fallback below
         logger.info("Remediation decision: %s", decision)
         # Handle decision
         action = decision.get("action")
@@ -619,31 +802,44 @@ def remediation_node(state: AgentState) -> dict:
             retry_msg = SystemMessage(content=f"Remediation: Rephrase and retry. New query: {new_query}")
             return {
                 "messages": [retry_msg],
-                "remediation_decision": decision
+                "remediation_decision": decision,
+                "last_error": None
             }
         elif action == "fallback":
             new_tool = decision.get("new_tool", "supervisor")
             fallback_msg = SystemMessage(content=f"Remediation: Fallback to {new_tool}")
             return {
                 "messages": [fallback_msg],
-                "remediation_decision": decision
+                "remediation_decision": decision,
+                "last_error": None
             }
         elif action == "abort":
             abort_msg = SystemMessage(content="Remediation: Abort task")
             return {
                 "messages": [abort_msg],
                 "remediation_decision": decision,
-                "final_synthesis": "Task aborted due to unrecoverable error."
+                "final_synthesis": "Task aborted due to unrecoverable error.",
+                "last_error": None
             }
         else:
             logger.warning("Unknown remediation action: %s", action)
             return {
                 "messages": [SystemMessage(content="Remediation: Unknown action")],
-                "remediation_decision": decision
+                "remediation_decision": decision,
+                "last_error": None
             }
     except json.JSONDecodeError as e:
         logger.error("JSON parsing error in remediation: %s", str(e), exc_info=True)
-        return {"messages": [SystemMessage(content=f"Remediation parsing error: {e}")], "last_error": str(e)}
+        # Without a usable decision, fall back rather than retrying the failed agent
+        return {
+            "messages": [SystemMessage(content=f"Remediation parsing error: {e}")],
+            "remediation_decision": {"action": "fallback", "reason": f"Remediation parsing error: {e}"},
+            "last_error": None
+        }
     except Exception as e:
         logger.error("Unexpected error in remediation: %s", str(e), exc_info=True)
-        return {"messages": [SystemMessage(content=f"Error in remediation: {e}")], "last_error": str(e)}
+        return {
+            "messages": [SystemMessage(content=f"Error in remediation: {e}")],
+            "remediation_decision": {"action": "fallback", "reason": f"Error in remediation: {e}"},
+            "last_error": None
+        }
@@ -0,0 +1,109 @@
+"""Find and parse the JSON values embedded in agent output.
+
+Agents answer with JSON inside prose, Markdown fences or tool chatter. Greedy
+DOTALL regexes such as r'(\\[.*\\]|\\{.*\\})' span from the first bracket to the
+last one in the message, backtrack over the whole text on failure, and hand
+json.loads a slice that rarely parses when the message holds more than one
+value.
+
+json_spans() scans the text once instead, keeping a bracket stack. Outside
+brackets it jumps with a compiled regex to the next bracket that can open a
+JSON value, so braces and brackets in prose ("{IIA holds}", "[sic]") cost
+nothing; inside, it skips to the next bracket taking string literals whole,
+so brackets within JSON strings do not count, while quotes in the surrounding
+prose do not open strings. Every outermost bracket pair that closes is a
+candidate. A stray opener in the prose (e.g. "{a, b" or "[0, 1)") does not
+hide a complete value that follows it: brackets that never close are skipped
+and the text after them scanned again. Parsing is lazy (iter_json), so
+first_object stops at the first object it accepts.
+
+`python -m benchmarks.json_extract` compares this with the regexes it replaced
+on ~1 MB agent outputs.
+"""
+
+import json
+import re
+from typing import Any, Callable, Iterator, Optional
+
+# Outside brackets: a flat array of numbers/literals (e.g. a citation marker "[1]") taken whole,
+# or a bracket that can open a JSON value; "{IIA holds}" or "[sic]" in prose is skipped
+_START = re.compile(r'\[(?=\s*[-\d\]tfn])[^\[\]{}"]*\]|\{(?=\s*["}])|\[(?=\s*[-\d"{\[\]tfn])')
+# Inside brackets: skip plain text and whole string literals up to the next bracket, a quote that
+# is never closed, or the end of the text (which always matches, so the loop never backtracks)
+_NEXT = re.compile(r'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*([\[\]{}]|"|\Z)')
+_CLOSER = {"]": "[", "}": "{"}
+
+
+def json_spans(text: str) -> list[tuple[int, int]]:
+    """(start, end) slices of the outermost balanced {...} and [...] in text that may be JSON, in order.
+
+    A span starts at a bracket that can open a JSON value (a quote or "}"
+    after "{"); brackets nested in it are all counted. String-aware inside
+    brackets; a closer that does not match the innermost open bracket is
+    ignored. Both regexes consume everything between two brackets in one step.
+
+    When the text ends (or a string never closes) with brackets still open,
+    e.g. after a half-open interval "[0, 1)" in prose, those brackets can never
+    close: the scan marks them dead and restarts just after the outermost one,
+    so the values they swallowed are still found. Dead brackets are skipped
+    from then on; typically one restart suffices, which keeps the scan linear.
+    """
+    spans: list[tuple[int, int]] = []
+    stack: list[tuple[str, int]] = []  # open brackets: (char, position)
+    dead: set[int] = set()  # positions of brackets that never close
+    pos = 0
+    while True:
+        if not stack:
+            match = _START.search(text, pos)
+            if match is None:
+                break
+            token, pos = match.group(), match.end()
+            if len(token) > 1:
+                spans.append((match.start(), pos))  # a flat array
+            elif match.start() not in dead:
+                stack.append((token, match.start()))
+            continue
+        match = _NEXT.match(text, pos)
+        token, pos = match.group(1), match.end()
+        if token in ('"', ""):
+            # An unterminated string, or the end of the text: rescan after the outermost open bracket
+            dead.update(position for _, position in stack)
+            pos = stack[0][1] + 1
+            stack.clear()
+        elif token in "[{":
+            stack.append((token, pos - 1))
+        elif stack[-1][0] == _CLOSER[token]:
+            start = stack.pop()[1]
+            if not stack:
+                spans.append((start, pos))
+    return spans
+
+
+def iter_json(text: str, spans: Optional[list[tuple[int, int]]] = None) -> Iterator[Any]:
+    """Parsed values of the candidate spans (default: json_spans(text)) that are valid JSON, in order."""
+    for start, end in spans if spans is not None else json_spans(text):
+        try:
+            yield json.loads(text[start:end])
+        except ValueError:
+            continue
+
+
+def first_object(text: str, predicate: Optional[Callable[[dict], bool]] = None,
+                 spans: Optional[list[tuple[int, int]]] = None) -> Optional[dict]:
+    """First embedded JSON object (satisfying predicate, if given), or None.
+
+    Only spans that start with "{" are parsed, so citation markers and other
+    arrays before the object cost no json.loads.
+    """
+    spans = [span for span in (spans if spans is not None else json_spans(text)) if text[span[0]] == "{"]
+    return next((value for value in iter_json(text, spans) if predicate is None or predicate(value)), None)
+
+
+def largest_json(text: str) -> Any:
+    """The embedded JSON value with the longest source text, or None.
+
+    Picks an agent's main payload over short bracketed asides such as
+    citation markers ("[1]") that happen to be valid JSON too.
+    """
+    spans = sorted(json_spans(text), key=lambda span: span[0] - span[1])
+    return next(iter_json(text, spans), None)
@@ -0,0 +1,184 @@
+"""Record/replay cassette for chat model calls.
+
+create_agent passes an LLMCassette as the chat model's LangChain cache. The
+cache key is a SHA-256 over the model's llm_string (model, sampling params and
+bound tools, as LangChain serializes them) and the message list. Message ids
+are stripped from the key, because LangGraph assigns fresh ids on every run.
+Entries live in a local SQLite file.
+
+Modes (LLM_CACHE_MODE):
+
+- "record": serve recorded responses and record new ones. Rerunning a query
+  after a crash does not pay again for the calls that already succeeded.
+- "replay": serve recorded responses only; a miss raises CassetteMiss. This
+  gives deterministic, offline end-to-end runs and benchmarks.
+- "passthrough": no cassette; every call goes to the model.
+
+Inspect or clear a cassette with `python -m llm_cache [--path FILE] stats|clear`.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.messages import messages_from_dict, messages_to_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+import config
+import telemetry
+from exceptions import AgentError, ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+MODES = ("record", "replay", "passthrough")
+
+
+class CassetteMiss(AgentError):
+    """Replay mode found no recorded response for a chat model call."""
+
+
+def _strip_message_ids(node: Any) -> Any:
+    """Drop per-run message ids from a serialized message list (LangChain dumps format)."""
+    if isinstance(node, list):
+        return [_strip_message_ids(item) for item in node]
+    if isinstance(node, dict):
+        out = {}
+        for key, value in node.items():
+            if key == "kwargs" and isinstance(value, dict):
+                value = {k: v for k, v in value.items() if k != "id"}
+            out[key] = _strip_message_ids(value)
+        return out
+    return node
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    try:
+        normalized = json.dumps(_strip_message_ids(json.loads(prompt)), sort_keys=True)
+    except (TypeError, ValueError):
+        normalized = prompt
+    return hashlib.sha256(f"{llm_string}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+def _serialize(generations: Sequence[Generation]) -> str:
+    items = []
+    for generation in generations:
+        if isinstance(generation, ChatGeneration):
+            items.append({"message": messages_to_dict([generation.message])[0],
+                          "generation_info": generation.generation_info})
+        else:
+            items.append({"text": generation.text, "generation_info": generation.generation_info})
+    return json.dumps(items)
+
+
+def _deserialize(payload: str) -> list[Generation]:
+    generations = []
+    for item in json.loads(payload):
+        if "message" in item:
+            message = messages_from_dict([item["message"]])[0]
+            generations.append(ChatGeneration(message=message, generation_info=item.get("generation_info")))
+        else:
+            generations.append(Generation(text=item["text"], generation_info=item.get("generation_info")))
+    return generations
+
+
+class LLMCassette(BaseCache):
+    """SQLite-backed LangChain cache with record/replay semantics."""
+
+    def __init__(self, path: str, mode: str = "record"):
+        if mode not in ("record", "replay"):
+            raise ConfigurationError(f"LLMCassette mode must be 'record' or 'replay', not {mode!r}")
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")  # concurrent runs may share one cassette
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS calls (key TEXT PRIMARY KEY, llm_string TEXT, "
+            "generations TEXT NOT NULL, created_at REAL, hits INTEGER DEFAULT 0)"
+        )
+        self._conn.commit()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[list[Generation]]:
+        key = cache_key(prompt, llm_string)
+        with self._lock:
+            row = self._conn.execute("SELECT generations FROM calls WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE calls SET hits = hits + 1 WHERE key = ?", (key,))
+                self._conn.commit()
+        if row is not None:
+            telemetry.record_cache_hit("llm")
+            return _deserialize(row[0])
+        if self.mode == "replay":
+            raise CassetteMiss(f"No recorded LLM response in {self.path} (key {key[:16]}); "
+                               f"record it first with LLM_CACHE_MODE=record")
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        if self.mode != "record":
+            return
+        key = cache_key(prompt, llm_string)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO calls (key, llm_string, generations, created_at) VALUES (?, ?, ?, ?)",
+                (key, llm_string, _serialize(return_val), time.time()),
+            )
+            self._conn.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM calls")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, hits = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM calls").fetchone()
+        return {"path": self.path, "mode": self.mode, "entries": entries, "hits": hits,
+                "bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cassettes: dict = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCassette]:
+    """Cassette for the configured LLM_CACHE_MODE / LLM_CASSETTE_PATH, or None in passthrough mode."""
+    mode = config.LLM_CACHE_MODE
+    if mode not in MODES:
+        raise ConfigurationError(f"LLM_CACHE_MODE must be one of {MODES}, not {mode!r}")
+    if mode == "passthrough":
+        return None
+    key = (mode, os.path.abspath(config.LLM_CASSETTE_PATH))
+    with _cassettes_lock:
+        cassette = _cassettes.get(key)
+        if cassette is None:
+            cassette = _cassettes[key] = LLMCassette(config.LLM_CASSETTE_PATH, mode)
+            logger.info("LLM cassette %s in %s mode", config.LLM_CASSETTE_PATH, mode)
+    return cassette
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Inspect or clear the LLM record/replay cassette")
+    parser.add_argument("--path", default=None, help="Cassette file (default: LLM_CASSETTE_PATH)")
+    parser.add_argument("command", choices=["stats", "clear"])
+    args = parser.parse_args(argv)
+    cassette = LLMCassette(args.path or config.LLM_CASSETTE_PATH, "record")
+    if args.command == "clear":
+        cassette.clear()
+    print(json.dumps(cassette.stats(), indent=2))
+    cassette.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Per-run context shared by tools.
+
+A "run" is one end-to-end workflow invocation (one query). The current run id
+lives in a context variable, so it follows LangGraph nodes into worker threads.
+Tools that keep per-run state (code kernels, scratch stores) key it by
+get_run_id() and register cleanup with on_run_end(); the hooks fire when the
+run_scope() block exits. Graph nodes additionally bind the name of the agent
+they invoke with agent_scope(), for state that is private to one agent.
+"""
+
+import contextvars
+import logging
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RUN_ID = "default"
+
+_run_id: contextvars.ContextVar[str] = contextvars.ContextVar("run_id", default=DEFAULT_RUN_ID)
+_agent: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("agent", default=None)
+_hooks: list[Callable[[str], None]] = []
+_hooks_lock = threading.Lock()
+
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def get_run_id() -> str:
+    """Id of the run the caller belongs to, or DEFAULT_RUN_ID outside any run."""
+    return _run_id.get()
+
+
+def get_agent() -> Optional[str]:
+    """Name of the agent whose tools are running, or None outside any agent_scope."""
+    return _agent.get()
+
+
+@contextmanager
+def agent_scope(name: str) -> Iterator[str]:
+    """Bind the current agent name for the duration of the block."""
+    token = _agent.set(name)
+    try:
+        yield name
+    finally:
+        _agent.reset(token)
+
+
+def on_run_end(hook: Callable[[str], None]) -> None:
+    """Register hook(run_id) to be called when a run_scope exits."""
+    with _hooks_lock:
+        if hook not in _hooks:
+            _hooks.append(hook)
+
+
+def end_run(run_id: str) -> None:
+    """Fire the end-of-run hooks for run_id. Hook errors are logged, not raised."""
+    with _hooks_lock:
+        hooks = list(_hooks)
+    for hook in hooks:
+        try:
+            hook(run_id)
+        except Exception as e:
+            logger.warning(f"Run cleanup hook {getattr(hook, '__qualname__', hook)} failed for {run_id}: {e}")
+
+
+@contextmanager
+def bind_run(run_id: str) -> Iterator[str]:
+    """Attribute work to run_id without ending the run when the block exits."""
+    token = _run_id.set(run_id)
+    try:
+        yield run_id
+    finally:
+        _run_id.reset(token)
+
+
+@contextmanager
+def run_scope(run_id: Optional[str] = None) -> Iterator[str]:
+    """Bind a run id for the duration of the block, then release per-run resources."""
+    run_id = run_id or new_run_id()
+    token = _run_id.set(run_id)
+    try:
+        yield run_id
+    finally:
+        _run_id.reset(token)
+        end_run(run_id)
@@ -0,0 +1,284 @@
+"""Long-running HTTP/JSON server that keeps agents, workflows and provider pools warm.
+
+Started with `python app.py --serve [HOST:]PORT`. At startup every agent is
+built once (see warm_agents); compiled workflows are cached per agent
+selection. Provider connection pools, the OCR cache and the LLM cassette are
+process-wide anyway. A query therefore pays only for its own LLM and tool
+calls, not for interpreter startup and agent construction.
+
+Queries run concurrently in a bounded pool (SERVE_WORKERS). Endpoints:
+
+- POST /queries               {"query": "...", "files": [...], "debate": false}
+                              -> 202 {"id", "status", "events", "result"}
+- GET  /queries               all known queries, newest first
+- GET  /queries/<id>          status, error, timings, totals and report path
+- GET  /queries/<id>/events   progress as newline-delimited JSON, streamed
+                              from the first event until the query finishes
+- GET  /queries/<id>/report   the Markdown report
+- GET  /health                warm agents and query counts
+
+Events are the run's telemetry events (node_start/node_end, llm_end,
+tool_start/tool_end, retry, cache_hit), synthesis tokens (token) and the app
+stages (queued, started, teamformation, upload, report), then a final done or
+failed event. Reports are written incrementally (see streaming.py). Uploaded
+files are paths on the server and must lie under FILESYSTEM_ROOTS.
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator, Optional
+
+import config
+from run_context import new_run_id
+
+logger = logging.getLogger(__name__)
+
+FINISHED = ("done", "failed")
+
+
+class QueryJob:
+    """One submitted query: its progress events and outcome."""
+
+    def __init__(self, query: str, files: list[str], debate: bool):
+        self.id = new_run_id()  # doubles as the run id, so telemetry events carry it
+        self.query = query
+        self.files = files
+        self.debate = debate
+        self.status = "queued"
+        self.created_at = datetime.now(timezone.utc)
+        self.summary: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.events: list[dict] = []
+        self._changed = threading.Condition()
+
+    def add_event(self, event: dict) -> None:
+        with self._changed:
+            self.events.append(event)
+            self._changed.notify_all()
+
+    def finish(self, status: str, error: Optional[str] = None) -> None:
+        with self._changed:
+            self.status, self.error = status, error
+            self.events.append({"event": status, "run_id": self.id, "error": error})
+            self._changed.notify_all()
+
+    def iter_events(self, heartbeat: float = 15.0) -> Iterator[Optional[dict]]:
+        """Events from the first one until the job finishes; None every heartbeat seconds of silence."""
+        sent = 0
+        while True:
+            with self._changed:
+                if sent == len(self.events) and self.status not in FINISHED:
+                    self._changed.wait(heartbeat)
+                pending, finished = self.events[sent:], self.status in FINISHED
+            sent += len(pending)
+            if not pending and not finished:
+                yield None
+            yield from pending
+            if finished and sent == len(self.events):
+                return
+
+    def to_dict(self) -> dict:
+        summary = self.summary or {}
+        return {"id": self.id, "status": self.status, "query": self.query[:200], "files": self.files,
+                "debate": self.debate, "created_at": self.created_at.isoformat(), "error": self.error,
+                "report": summary.get("report"), "timings": summary.get("timings"),
+                "totals": summary.get("totals"), "events": len(self.events)}
+
+
+class QueryService:
+    """Runs submitted queries on warm agents in a bounded thread pool."""
+
+    def __init__(self, output_dir: str = "./outputs", workers: Optional[int] = None,
+                 max_jobs: Optional[int] = None):
+        self.output_dir = Path(output_dir)
+        self.workers = workers or config.SERVE_WORKERS
+        self.max_jobs = max_jobs or config.SERVE_MAX_JOBS
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="serve")
+        self._jobs: "OrderedDict[str, QueryJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._workflows: dict = {}  # compiled workflows keyed by the selected agents
+        self.warm: list[str] = []
+
+    def warm_agents(self) -> list[str]:
+        """Build every registered agent now, so the first queries do not pay for it."""
+        from agents import agents
+        started = time.perf_counter()
+        for name in list(agents):
+            try:
+                agents[name]
+            except Exception as e:
+                logger.warning(f"Could not build agent {name}: {e}")
+        self.warm = agents.materialized()
+        logger.info("Warmed %d agents in %.1fs", len(self.warm), time.perf_counter() - started)
+        return self.warm
+
+    def submit(self, query: str, files: Optional[list[str]] = None, debate: bool = False) -> QueryJob:
+        """Validate and queue a query; raises ValueError or PermissionError on bad input."""
+        from tools.fs_sandbox import resolve_path
+        if not isinstance(query, str) or not query.strip():
+            raise ValueError("Query cannot be empty.")
+        if not isinstance(files or [], list):
+            raise ValueError("files must be a list of paths")
+        resolved = [str(resolve_path(str(f))) for f in files or []]  # FileNotFoundError is an OSError
+        job = QueryJob(query.strip(), resolved, bool(debate))
+        job.add_event({"event": "queued", "run_id": job.id})
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._pool.submit(self._run, job)
+        return job
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond max_jobs (caller holds the lock)."""
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in [j.id for j in self._jobs.values() if j.status in FINISHED][:max(0, excess)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: QueryJob) -> None:
+        from app import run_query
+        job.status = "running"
+        job.add_event({"event": "started", "run_id": job.id})
+        try:
+            job.summary = run_query(job.query, job.files, str(self.output_dir / job.id), debate=job.debate,
+                                    run_id=job.id, on_event=job.add_event, workflows=self._workflows, stream=True)
+            job.finish("done" if job.summary["status"] == "ok" else "failed", job.summary["error"])
+        except Exception as e:
+            logger.error("Query %s failed: %s", job.id, e, exc_info=True)
+            job.finish("failed", str(e))
+
+    def get(self, job_id: str) -> Optional[QueryJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> list[QueryJob]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def health(self) -> dict:
+        counts: dict = {}
+        for job in self.jobs():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"status": "ok", "workers": self.workers, "agents": self.warm, "queries": counts}
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "CompeteGrok"
+
+    @property
+    def service(self) -> QueryService:
+        return self.server.service
+
+    def _send_json(self, status: int, payload) -> None:
+        body = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str) -> None:
+        self._send_json(status, {"error": message})
+
+    def do_GET(self) -> None:
+        path = self.path.split("?")[0].rstrip("/")
+        if path == "/health":
+            return self._send_json(200, self.service.health())
+        if path == "/queries":
+            return self._send_json(200, [job.to_dict() for job in self.service.jobs()])
+        match = re.fullmatch(r"/queries/([0-9a-f]+)(/events|/report)?", path)
+        job = self.service.get(match.group(1)) if match else None
+        if job is None:
+            return self._error(404, f"Not found: {path}")
+        if match.group(2) == "/events":
+            return self._stream_events(job)
+        if match.group(2) == "/report":
+            report = (job.summary or {}).get("report")
+            if not report or not Path(report).is_file():
+                return self._error(409, f"Query {job.id} has no report yet (status: {job.status})")
+            body = Path(report).read_bytes()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/markdown; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self._send_json(200, job.to_dict())
+
+    def do_POST(self) -> None:
+        if self.path.split("?")[0].rstrip("/") != "/queries":
+            return self._error(404, f"Not found: {self.path}")
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("Request body must be a JSON object")
+            job = self.service.submit(payload.get("query"), payload.get("files"), payload.get("debate", False))
+        except (ValueError, OSError) as e:  # bad JSON, empty query, missing or forbidden files
+            return self._error(400, str(e))
+        self._send_json(202, {"id": job.id, "status": job.status, "events": f"/queries/{job.id}/events",
+                              "result": f"/queries/{job.id}"})
+
+    def _stream_events(self, job: QueryJob) -> None:
+        # No Content-Length: the stream ends when the connection closes after the final event
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            for event in job.iter_events():
+                self.wfile.write(json.dumps(event if event is not None else {"event": "heartbeat"},
+                                            default=str).encode() + b"\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client went away; the query keeps running
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def create_server(host: str, port: int, service: QueryService) -> ThreadingHTTPServer:
+    httpd = ThreadingHTTPServer((host, port), _Handler)
+    httpd.daemon_threads = True
+    httpd.service = service
+    return httpd
+
+
+def parse_address(address: Optional[str]) -> tuple[str, int]:
+    """'[HOST:]PORT' -> (host, port), defaulting to SERVE_HOST and SERVE_PORT."""
+    if not address:
+        return config.SERVE_HOST, config.SERVE_PORT
+    host, _, port = address.rpartition(":")
+    return host or config.SERVE_HOST, int(port)
+
+
+def serve(address: Optional[str] = None, output_dir: str = "./outputs", workers: Optional[int] = None,
+          warm: bool = True) -> None:
+    """Serve queries until interrupted."""
+    host, port = parse_address(address)
+    service = QueryService(output_dir, workers)
+    if warm:
+        service.warm_agents()
+    httpd = create_server(host, port, service)
+    logger.info("Serving on http://%s:%d with %d workers", host, httpd.server_address[1], service.workers)
+    print(f"CompeteGrok serving on http://{host}:{httpd.server_address[1]} (Ctrl-C to stop)", flush=True)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        service.shutdown()
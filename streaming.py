@@ -0,0 +1,151 @@
+"""Streamed workflow execution with an incrementally written report.
+
+stream_workflow() runs a compiled workflow through workflow.stream instead of
+invoke. It follows the top-level state ("values") to return the same final
+state invoke would. It also reads two more streams:
+
+- "updates": each agent's output, appended to the report as soon as the node
+  finishes, so a crash near the end leaves every finished agent on disk;
+- "messages" from the agents' own graphs (subgraphs=True): synthesis tokens,
+  written straight into the report file as the model produces them.
+
+StreamingReport is that draft report. When the run succeeds, finalize()
+atomically replaces the draft with the regular report. When it fails, fail()
+appends the error to the draft, which is kept.
+
+print_progress() is the console listener for node, tool and retry telemetry
+events (see telemetry.RunMetrics.subscribe).
+"""
+
+import logging
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+logger = logging.getLogger(__name__)
+
+STREAMED_NODES = ("synthesis",)  # nodes whose tokens are written to the report as they arrive
+
+_print_lock = threading.Lock()  # parallel agent nodes report from their own threads
+
+
+class StreamingReport:
+    """Markdown report file written while the workflow runs."""
+
+    def __init__(self, path: Path, header: str):
+        self.path = Path(path)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._section: Optional[str] = None
+        self._write(header + "**Status:** in progress\n\n")
+
+    def _write(self, text: str) -> None:
+        self._file.write(text)
+        self._file.flush()  # readable (and safe) on disk at every step
+
+    def node_output(self, node: str, content: str) -> None:
+        """Append a finished node's answer under its own heading."""
+        if node in STREAMED_NODES and self._section == node:
+            self._write("\n\n")  # already streamed token by token
+        else:
+            self._write(f"## {node}\n\n{content.strip()}\n\n")
+        self._section = None
+
+    def token(self, node: str, text: str) -> None:
+        if self._section != node:
+            self._write(f"## {node}\n\n")
+            self._section = node
+        self._write(text)
+
+    def finalize(self, content: str) -> None:
+        """Replace the draft with the final report."""
+        self._file.close()
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(content, encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def fail(self, error: str) -> None:
+        """Keep the draft (outputs so far) and record why the run stopped."""
+        self._write(f"\n\n## Error\n\n{error}\n")
+        self._file.close()
+
+
+def _node_of(namespace: tuple) -> Optional[str]:
+    # ("synthesis:<task id>",) for the synthesis agent's graph; () for the workflow itself
+    return namespace[0].split(":", 1)[0] if namespace else None
+
+
+def _answer(delta: Any) -> str:
+    """Text of the AI answers in a node's state update."""
+    if not isinstance(delta, dict):
+        return ""
+    if delta.get("final_synthesis"):
+        return delta["final_synthesis"]
+    return "\n\n".join(m.content for m in delta.get("messages") or []
+                       if isinstance(m, AIMessage) and isinstance(m.content, str) and m.content.strip())
+
+
+def stream_workflow(workflow: Any, state: Optional[dict], report: Optional[StreamingReport] = None,
+                    on_token: Optional[Callable[[str, str], None]] = None, config: Optional[dict] = None) -> dict:
+    """Run workflow on state via workflow.stream and return the final state, as invoke would.
+
+    Node answers and STREAMED_NODES tokens go to report (if any); every token of
+    STREAMED_NODES is also passed to on_token(node, text). config is passed on
+    to workflow.stream; with a checkpointer, state None continues the
+    checkpointed run it names (see checkpoints.resume_config).
+    """
+    final = state
+    for namespace, mode, chunk in workflow.stream(state, config, stream_mode=["values", "updates", "messages"],
+                                                  subgraphs=True):
+        if mode == "messages":
+            message, _ = chunk
+            node = _node_of(namespace)
+            if node in STREAMED_NODES and isinstance(message, AIMessageChunk) and isinstance(message.content, str) \
+                    and message.content:
+                if report is not None:
+                    report.token(node, message.content)
+                if on_token is not None:
+                    on_token(node, message.content)
+        elif namespace:
+            continue  # the agents' own state; the workflow's updates below carry their answers
+        elif mode == "values":
+            final = chunk
+        elif mode == "updates" and report is not None:
+            for node, delta in chunk.items():
+                content = _answer(delta)
+                if content:
+                    report.node_output(node, content)
+    if final is None:
+        final = workflow.get_state(config).values
+    return final
+
+
+def print_progress(event: dict, stream=None) -> None:
+    """Print node, tool and retry telemetry events as they happen."""
+    stream = stream or sys.stdout
+    kind, t = event.get("event"), event.get("t", 0.0)
+    if kind == "node_start":
+        line = f"> {event['node']} started"
+    elif kind == "node_end":
+        line = f"< {event['node']} finished in {event['seconds']:.1f}s" + ("" if event.get("ok") else " (failed)")
+    elif kind == "tool_start":
+        line = f"  {event.get('agent') or '?'} -> {event['tool']}"
+    elif kind == "tool_end":
+        line = f"  {event['tool']} done in {event['seconds']:.1f}s" + (" (error)" if event.get("error") else "")
+    elif kind == "retry":
+        line = f"  retry: {event['kind']}"
+    elif kind == "teamformation":
+        line = f"Selected agents: {', '.join(event['agents'])}"
+    elif kind == "upload":
+        line = f"Upload {event['file']}: " + (f"converted in {event.get('seconds', 0.0):.1f}s" if event.get("ok")
+                                               else f"failed ({event.get('error')})")
+    elif kind == "report":
+        line = f"Report: {event['path']}"
+    else:
+        return
+    with _print_lock:
+        stream.write(f"[{t:7.1f}s] {line}\n")
+        stream.flush()
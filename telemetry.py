@@ -0,0 +1,291 @@
+"""Per-run latency, token, cost, retry and cache telemetry.
+
+Each run (see run_context.py) gets a RunMetrics accumulator. It is fed by:
+
+- TelemetryCallback, attached to every agent in create_agent, which records
+  each LLM round trip (wall time, prompt/completion tokens, model, errors,
+  retries) and each tool call (wall time, errors);
+- timed_node(), which wraps graph nodes and records their wall time;
+- record_cache_hit() / record_retry(), called by caches and retry loops
+  that run outside LangChain (OCR cache, OCR shard retries, LLM cassette).
+
+The CLI writes RunMetrics.to_dict() to metrics_<timestamp>.json next to the report.
+Events outside any run are attributed to DEFAULT_RUN_ID.
+
+Listeners added with RunMetrics.subscribe() receive each of these as a
+progress event dict (node_start/node_end, llm_end, tool_start/tool_end,
+retry, cache_hit) while the run is in flight; server.py streams them.
+"""
+
+import functools
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+import config
+from run_context import get_agent, get_run_id, on_run_end
+
+logger = logging.getLogger(__name__)
+
+
+def _usage_counter() -> Dict[str, float]:
+    return {"calls": 0, "seconds": 0.0, "errors": 0}
+
+
+class RunMetrics:
+    """Thread-safe accumulator for one run; agent nodes may run in parallel."""
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self.wall_seconds: Optional[float] = None
+        self._lock = threading.Lock()
+        self.nodes: list[dict] = []
+        self.llm: Dict[str, Dict[str, Any]] = defaultdict(
+            lambda: {"calls": 0, "seconds": 0.0, "errors": 0, "input_tokens": 0,
+                     "output_tokens": 0, "cost_usd": 0.0, "models": {}})
+        self.tools: Dict[str, Dict[str, float]] = defaultdict(_usage_counter)
+        self.retries: Dict[str, int] = defaultdict(int)
+        self.cache_hits: Dict[str, int] = defaultdict(int)
+        self._listeners: list[Callable[[dict], None]] = []
+
+    def subscribe(self, listener: Callable[[dict], None]) -> None:
+        """Call listener(event) for every event recorded from now on, from the recording thread."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def emit(self, event: str, **data: Any) -> None:
+        """Send a progress event to the listeners; listener errors are logged, not raised."""
+        if not self._listeners:
+            return
+        payload = {"event": event, "run_id": self.run_id, "t": round(time.perf_counter() - self._start, 3), **data}
+        for listener in list(self._listeners):
+            try:
+                listener(payload)
+            except Exception as e:
+                logger.warning(f"Telemetry listener failed on {event}: {e}")
+
+    def add_node(self, name: str, started: float, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.nodes.append({"node": name, "start_offset": round(started - self._start, 3),
+                               "seconds": round(seconds, 3), "ok": ok})
+        self.emit("node_end", node=name, seconds=round(seconds, 3), ok=ok)
+
+    def add_llm_call(self, agent: str, model: Optional[str], seconds: float,
+                     input_tokens: int = 0, output_tokens: int = 0, error: bool = False) -> None:
+        cost = estimate_cost(model, input_tokens, output_tokens)
+        with self._lock:
+            entry = self.llm[agent]
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+            entry["errors"] += int(error)
+            entry["input_tokens"] += input_tokens
+            entry["output_tokens"] += output_tokens
+            entry["cost_usd"] += cost
+            if model:
+                entry["models"][model] = entry["models"].get(model, 0) + 1
+        self.emit("llm_end", agent=agent, model=model, seconds=round(seconds, 3), input_tokens=input_tokens,
+                  output_tokens=output_tokens, error=error)
+
+    def add_tool_call(self, tool: str, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            entry = self.tools[tool]
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+            entry["errors"] += int(error)
+        self.emit("tool_end", tool=tool, seconds=round(seconds, 3), error=error)
+
+    def add_retry(self, kind: str) -> None:
+        with self._lock:
+            self.retries[kind] += 1
+        self.emit("retry", kind=kind)
+
+    def add_cache_hit(self, kind: str) -> None:
+        with self._lock:
+            self.cache_hits[kind] += 1
+        self.emit("cache_hit", kind=kind)
+
+    def finish(self) -> None:
+        if self.wall_seconds is None:
+            self.wall_seconds = time.perf_counter() - self._start
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            llm = {agent: {**v, "seconds": round(v["seconds"], 3), "cost_usd": round(v["cost_usd"], 6),
+                           "models": dict(v["models"])} for agent, v in self.llm.items()}
+            tools = {tool: {**v, "seconds": round(v["seconds"], 3)} for tool, v in self.tools.items()}
+            nodes = list(self.nodes)
+            retries, cache_hits = dict(self.retries), dict(self.cache_hits)
+        wall = self.wall_seconds if self.wall_seconds is not None else time.perf_counter() - self._start
+        totals = {
+            "wall_seconds": round(wall, 3),
+            "llm_calls": sum(v["calls"] for v in llm.values()),
+            "llm_seconds": round(sum(v["seconds"] for v in llm.values()), 3),
+            "input_tokens": sum(v["input_tokens"] for v in llm.values()),
+            "output_tokens": sum(v["output_tokens"] for v in llm.values()),
+            "cost_usd": round(sum(v["cost_usd"] for v in llm.values()), 6),
+            "tool_calls": sum(v["calls"] for v in tools.values()),
+            "tool_seconds": round(sum(v["seconds"] for v in tools.values()), 3),
+            "errors": sum(v["errors"] for v in llm.values()) + sum(v["errors"] for v in tools.values())
+                      + sum(not n["ok"] for n in nodes),
+            "retries": sum(retries.values()),
+            "cache_hits": sum(cache_hits.values()),
+        }
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at.isoformat(),
+            "totals": totals,
+            "nodes": nodes,
+            "llm": llm,
+            "tools": tools,
+            "retries": retries,
+            "cache_hits": cache_hits,
+        }
+
+    def write(self, path: Path) -> Path:
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        return path
+
+
+def estimate_cost(model: Optional[str], input_tokens: int, output_tokens: int) -> float:
+    """USD cost from MODEL_PRICES (per million tokens); 0 for unknown models."""
+    prices = config.MODEL_PRICES.get(model or "")
+    if not prices:
+        return 0.0
+    return (input_tokens * prices["input"] + output_tokens * prices["output"]) / 1_000_000
+
+
+_runs: Dict[str, RunMetrics] = {}
+_runs_lock = threading.Lock()
+
+
+def get_metrics(run_id: Optional[str] = None) -> RunMetrics:
+    """Metrics of run_id (default: the current run), created on first use."""
+    run_id = run_id or get_run_id()
+    with _runs_lock:
+        metrics = _runs.get(run_id)
+        if metrics is None:
+            metrics = _runs[run_id] = RunMetrics(run_id)
+    return metrics
+
+
+def _release_run(run_id: str) -> None:
+    """Stop the clock and forget the run; holders of the RunMetrics can still write it."""
+    with _runs_lock:
+        metrics = _runs.pop(run_id, None)
+    if metrics is not None:
+        metrics.finish()
+
+
+on_run_end(_release_run)
+
+
+def record_retry(kind: str) -> None:
+    get_metrics().add_retry(kind)
+
+
+def record_cache_hit(kind: str) -> None:
+    get_metrics().add_cache_hit(kind)
+
+
+def timed_node(name: str) -> Callable[[Callable], Callable]:
+    """Decorator recording the wall time of a graph node.
+
+    A node counts as failed if it raises or returns a last_error.
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            metrics = get_metrics()
+            metrics.emit("node_start", node=name)
+            started = time.perf_counter()
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = not (isinstance(result, dict) and result.get("last_error"))
+                return result
+            finally:
+                metrics.add_node(name, started, time.perf_counter() - started, ok)
+        return wrapper
+    return decorator
+
+
+class TelemetryCallback(BaseCallbackHandler):
+    """Records LLM round trips and tool calls of one agent into the current run's metrics."""
+
+    raise_error = False
+
+    def __init__(self, agent_name: str):
+        self.agent_name = agent_name
+        self._llm_runs: Dict[UUID, tuple] = {}
+        self._tool_runs: Dict[UUID, tuple] = {}
+
+    def _agent(self) -> str:
+        return get_agent() or self.agent_name
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages, *, run_id: UUID,
+                            metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        model = (metadata or {}).get("ls_model_name") or (kwargs.get("invocation_params") or {}).get("model")
+        self._llm_runs[run_id] = (time.perf_counter(), model, get_metrics())
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts, *, run_id: UUID,
+                     metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        self.on_chat_model_start(serialized, prompts, run_id=run_id, metadata=metadata, **kwargs)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        started, model, metrics = self._llm_runs.pop(run_id, (None, None, None))
+        if started is None:
+            return
+        input_tokens, output_tokens = _token_usage(response)
+        metrics.add_llm_call(self._agent(), model, time.perf_counter() - started, input_tokens, output_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        started, model, metrics = self._llm_runs.pop(run_id, (None, None, None))
+        if started is not None:
+            metrics.add_llm_call(self._agent(), model, time.perf_counter() - started, error=True)
+
+    def on_retry(self, retry_state: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        get_metrics().add_retry(f"llm:{self._agent()}")
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        metrics = get_metrics()
+        self._tool_runs[run_id] = (time.perf_counter(), name, metrics)
+        metrics.emit("tool_start", agent=self._agent(), tool=name)
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        started, name, metrics = self._tool_runs.pop(run_id, (None, None, None))
+        if started is not None:
+            metrics.add_tool_call(name, time.perf_counter() - started)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        started, name, metrics = self._tool_runs.pop(run_id, (None, None, None))
+        if started is not None:
+            metrics.add_tool_call(name, time.perf_counter() - started, error=True)
+
+
+def _token_usage(response) -> tuple[int, int]:
+    """(input, output) tokens from an LLMResult: message usage_metadata, else llm_output token_usage."""
+    input_tokens = output_tokens = 0
+    found = False
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                found = True
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+    if not found:
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        input_tokens = usage.get("prompt_tokens", 0)
+        output_tokens = usage.get("completion_tokens", 0)
+    return input_tokens, output_tokens
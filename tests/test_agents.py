@@ -40,4 +40,46 @@ def test_supervisor_prompt_content():
 def test_supervisor_tools_include_sequential_thinking():
     """Test that supervisor tools include sequential thinking."""
     tool_names = [tool.name for tool in SUPERVISOR_TOOLS]
-    assert "sequential_thinking" in tool_names
\ No newline at end of file
+    assert "sequential_thinking" in tool_names
+
+
+def test_agent_registry_builds_on_first_access():
+    """Agents are created lazily, once, and reported as materialized."""
+    from agents import AgentRegistry
+    factory = MagicMock(return_value="agent")
+    registry = AgentRegistry({"pro": factory, "cons": MagicMock()})
+
+    assert set(registry) == {"pro", "cons"} and len(registry) == 2
+    assert registry.materialized() == []
+    assert registry["pro"] == "agent"
+    assert registry["pro"] == "agent"
+    factory.assert_called_once()
+    assert registry.materialized() == ["pro"]
+    with pytest.raises(KeyError):
+        registry["unknown"]
+
+
+def test_agent_registry_patch_dict_does_not_materialize():
+    """patch.dict copies and restores the registry without building agents."""
+    from agents import AgentRegistry
+    factory = MagicMock(return_value="real")
+    registry = AgentRegistry({"pro": factory})
+
+    with patch.dict(registry, {"arbiter": "mock"}):
+        registry["pro"] = "mock"
+        assert registry["pro"] == "mock"
+        assert "arbiter" in registry
+    factory.assert_not_called()
+    assert "arbiter" not in registry
+    assert registry.materialized() == []
+    assert registry["pro"] == "real"
+
+
+def test_importing_agents_does_not_build_any_agent():
+    """A fresh import knows the full roster but builds nothing."""
+    import subprocess
+    code = "from agents import agents; print(len(agents), agents.materialized())"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         cwd=os.path.join(os.path.dirname(__file__), '..'), timeout=120)
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip().splitlines()[-1] == "14 []"
@@ -4,7 +4,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 # Import only the function to avoid module-level arg parsing
-from app import fix_md_math
+from app import convert_uploads, fix_md_math, parse_query_file, resolve_batch, run_batch
 
 def test_fix_md_math():
     """Test the fix_md_math function for dedenting LaTeX math blocks."""
@@ -51,4 +51,142 @@ def test_fix_md_math_no_math():
     finally:
         os.unlink(temp_path)
         if os.path.exists(fixed_path):
-            os.unlink(fixed_path)
\ No newline at end of file
+            os.unlink(fixed_path)
+
+def test_parse_query_file(tmp_path):
+    """QUERY:/FILES: sections are split; plain files are one query."""
+    sectioned = tmp_path / "query_1.txt"
+    sectioned.write_text('"""\nQUERY:\nCompute the HHI\nfor 40/30/30\nFILES:\na.pdf\n\nb.pdf\n"""', encoding="utf-8")
+    assert parse_query_file(sectioned) == ("Compute the HHI\nfor 40/30/30", ["a.pdf", "b.pdf"])
+    plain = tmp_path / "query_2.txt"
+    plain.write_text("Explain the Lerner Index\n", encoding="utf-8")
+    assert parse_query_file(plain) == ("Explain the Lerner Index", [])
+
+
+def test_run_batch_summary(tmp_path):
+    """Queries run concurrently into their own directories; failures are recorded, not raised."""
+    import csv
+    import threading
+    import time
+    from unittest.mock import patch
+
+    inputs = tmp_path / "inputs"
+    inputs.mkdir()
+    for i in range(4):
+        (inputs / f"query_{i}.txt").write_text(f"Query {i}", encoding="utf-8")
+    (inputs / "query_bad.txt").write_text("QUERY:\nx\nFILES:\nmissing.pdf\n", encoding="utf-8")
+    in_flight, peak, lock = [0], [0], threading.Lock()
+    caches = []
+
+    def fake_run_query(query, files, output_dir, debate=False, verbose=False, **kwargs):
+        caches.append(kwargs["workflows"])
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        if query == "Query 3":
+            raise RuntimeError("boom")
+        return {"run_id": query[-1], "status": "ok", "error": None, "report": f"{output_dir}/report.md",
+                "timings": {"teamformation": 0.01, "uploads": 0.0, "workflow": 0.04, "report": 0.0},
+                "totals": {"llm_calls": 3, "tool_calls": 1, "input_tokens": 10, "output_tokens": 5}}
+
+    query_files = resolve_batch(str(inputs))
+    assert [f.name for f in query_files] == ["query_0.txt", "query_1.txt", "query_2.txt", "query_3.txt", "query_bad.txt"]
+    with patch("app.run_query", side_effect=fake_run_query):
+        summary = run_batch(query_files, str(tmp_path / "out"), workers=2)
+    with open(summary, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["query_file"] for row in rows] == [str(f) for f in query_files]  # input order
+    assert [row["status"] for row in rows] == ["ok", "ok", "ok", "error", "error"]
+    assert rows[0]["report"] == str(tmp_path / "out" / "query_0" / "report.md") and rows[0]["llm_calls"] == "3"
+    assert rows[3]["error"] == "boom" and "missing.pdf" in rows[4]["error"]
+    assert peak[0] == 2
+    assert len(caches) == 4 and all(cache is caches[0] for cache in caches)  # one workflow cache per batch
+    assert resolve_batch(str(inputs / "query_[12].txt")) == query_files[1:3]
+
+
+def test_convert_uploads_concurrent_in_order(tmp_path):
+    """Uploads convert in parallel; results keep the input order and carry per-file timing and errors."""
+    import importlib
+    import threading
+    import time
+    from unittest.mock import patch
+
+    in_flight, peak, lock = [0], [0], threading.Lock()
+
+    class FakeConvert:
+        def invoke(self, args):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.1 if args["file_path"] == "a.pdf" else 0.02)  # the first file finishes last
+            with lock:
+                in_flight[0] -= 1
+            if args["file_path"] == "bad.pdf":
+                return {"success": False, "error": "Invalid PDF: bad.pdf"}
+            return {"success": True, "content": f"# {args['file_path']}"}
+
+    files = ["a.pdf", "b.pdf", "bad.pdf", "c.pdf"]
+    with patch.object(importlib.import_module("tools.convert_pdf_file"), "convert_pdf_file", FakeConvert()):
+        results = [future.result() for future in convert_uploads(files, "run", workers=3)]
+    assert [r["file"] for r in results] == files
+    assert [r["content"] for r in results] == ["# a.pdf", "# b.pdf", None, "# c.pdf"]
+    assert results[2]["ok"] is False and results[2]["error"] == "Invalid PDF: bad.pdf"
+    assert results[0]["seconds"] >= 0.1 and peak[0] == 3
+
+
+def test_oversized_upload_is_a_failed_conversion(tmp_path):
+    """A PDF over PDF_MAX_BYTES is reported as an error, not ingested as the document's text."""
+    from unittest.mock import patch
+    from app import convert_upload
+
+    pdf = tmp_path / "large.pdf"
+    pdf.write_bytes(b"%PDF-1.4\n" + b"0" * 200)
+    with patch("config.PDF_MAX_BYTES", 100):
+        result = convert_upload(str(pdf), "run")
+    assert result["ok"] is False and result["content"] is None
+    assert result["error"].startswith("PDF too large")
+
+
+def test_failed_teamformation_releases_the_run(tmp_path):
+    """The run (and its event listener) is released even when the query fails before the workflow."""
+    from unittest.mock import MagicMock, patch
+    import telemetry
+    from app import run_query
+    from exceptions import AgentError
+
+    teamformation = MagicMock()
+    teamformation.invoke.side_effect = RuntimeError("provider down")
+    with patch.dict("agents.agents", {"teamformation": teamformation}), \
+            patch("config.CHECKPOINT_ENABLED", False), pytest.raises(AgentError):
+        run_query("Query", output_dir=str(tmp_path), run_id="failed-run", on_event=lambda event: None)
+    assert "failed-run" not in telemetry._runs
+
+
+def test_failed_query_cancels_pending_uploads(tmp_path):
+    """Conversions that have not started are cancelled when the query fails before collecting them."""
+    import importlib
+    import time
+    from unittest.mock import MagicMock, patch
+    from app import run_query
+    from exceptions import AgentError
+
+    converted = []
+
+    class SlowConvert:
+        def invoke(self, args):
+            converted.append(args["file_path"])
+            time.sleep(0.2)
+            return {"success": True, "content": f"# {args['file_path']}"}
+
+    teamformation = MagicMock()
+    teamformation.invoke.side_effect = RuntimeError("provider down")
+    with patch.object(importlib.import_module("tools.convert_pdf_file"), "convert_pdf_file", SlowConvert()), \
+            patch.dict("agents.agents", {"teamformation": teamformation}), patch("config.UPLOAD_WORKERS", 1), \
+            patch("config.CHECKPOINT_ENABLED", False):
+        with pytest.raises(AgentError):
+            run_query("Query", files=["a.pdf", "b.pdf", "c.pdf"], output_dir=str(tmp_path))
+        time.sleep(0.5)
+    assert converted == ["a.pdf"]  # the one already running finishes; the others never start
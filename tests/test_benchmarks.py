@@ -0,0 +1,36 @@
+from benchmarks.fakes import BenchmarkProfile
+from benchmarks.workflow import check_regressions, percentile, run_benchmarks
+
+
+def test_scenarios_run_clean_on_fake_backends():
+    """Smoke test: scripted agents route, validate, debate and call tools without errors."""
+    results = {r["scenario"]: r for r in run_benchmarks(["research", "debate", "documents"], 2, BenchmarkProfile())}
+    research, debate, documents = results["research"], results["debate"], results["documents"]
+    for entry in results.values():
+        assert entry["errors_per_run"] == 0 and entry["completed_runs"] == 2
+        assert entry["p95_ms"] >= entry["p50_ms"] > 0 and entry["peak_heap_mb"] > 0
+    # econpaper, caselaw, verifier, synthesis; econpaper fans out to two searches, caselaw makes two rounds
+    assert research["nodes_per_run"] == 4 and research["tool_calls_per_run"] == 5
+    # econquant, debate, two pro/cons/arbiter rounds, synthesis
+    assert debate["nodes_per_run"] == 9
+    assert documents["tool_calls_per_run"] == 1
+
+
+def test_agents_restored_after_benchmark():
+    import agents.mock_model
+    from agents import agents as registry
+    model_class, materialized = agents.mock_model.MockChatModel, registry.materialized()
+    profile = BenchmarkProfile()
+    run_benchmarks(["documents"], 1, profile)
+    assert agents.mock_model.MockChatModel is model_class
+    assert registry.materialized() == materialized  # scripted agents are discarded
+    assert profile.document is None
+
+
+def test_percentiles_and_regression_check():
+    assert percentile([5, 1, 4, 2, 3], 50) == 3
+    assert percentile([float(i) for i in range(1, 101)], 95) == 95.0
+    baseline = [{"scenario": "research", "p50_ms": 10.0, "p95_ms": 20.0}]
+    assert check_regressions([{"scenario": "research", "p50_ms": 11.0, "p95_ms": 21.0}], baseline, 0.2) == []
+    failures = check_regressions([{"scenario": "research", "p50_ms": 13.0, "p95_ms": 21.0}], baseline, 0.2)
+    assert failures and failures[0].startswith("research: p50_ms")
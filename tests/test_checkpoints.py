@@ -0,0 +1,55 @@
+from unittest.mock import patch
+
+from langchain_core.messages import AIMessage
+
+from benchmarks.fake_servers import default_chat_responder, stand_ins
+
+SYNTHESIS = "The merger raises the HHI by 1800 points to 3400, well above the 2500 threshold."
+
+
+class Outage:
+    def invoke(self, *args, **kwargs):
+        raise RuntimeError("provider outage")
+
+
+def test_resume_reruns_only_the_failed_synthesis(tmp_path):
+    """A run whose synthesis failed resumes from just before synthesis; finished agents are not re-run."""
+    from agents import agents as registry
+    from app import resume_run, run_query
+    from checkpoints import get_store, thread_config
+    from graph import create_workflow
+
+    calls = []
+
+    def responder(request: dict) -> str:
+        is_synthesis = "SynthesisAgent" in str(request["messages"][0].get("content"))
+        calls.append("synthesis" if is_synthesis else "research")
+        return SYNTHESIS if is_synthesis else default_chat_responder(request)
+
+    selected = ["econquant", "synthesis"]
+    with stand_ins(chat_responder=responder), patch.dict(registry), \
+            patch("config.CHECKPOINT_PATH", str(tmp_path / "checkpoints.sqlite")):
+        registry.reset()
+        synthesis = registry["synthesis"]
+        registry["synthesis"] = Outage()
+        first = run_query("HHI change for shares 40/30/30?", output_dir=str(tmp_path / "out"),
+                          selected_agents=selected)
+        store = get_store()
+        assert store.get_run(first["run_id"])["status"] == "failed"
+        assert calls and "synthesis" not in calls
+
+        registry["synthesis"] = synthesis
+        research_calls = len(calls)
+        resumed = resume_run(first["run_id"])
+        assert calls[research_calls:] == ["synthesis"]  # econquant's answer came from the checkpoint
+        assert SYNTHESIS in open(resumed["report"], encoding="utf-8").read()
+        assert store.get_run(first["run_id"])["status"] == "completed"
+
+        state = create_workflow(selected, checkpointer=store.saver).get_state(thread_config(first["run_id"])).values
+        assert state["routing_history"] == ["econquant", "synthesis"]
+        assert state["final_synthesis"] == SYNTHESIS and not state.get("last_error")
+        assert any(isinstance(m, AIMessage) and m.content == SYNTHESIS for m in state["messages"])
+
+        # A finished run is not re-run; only its report is written again
+        again = resume_run(first["run_id"])
+        assert again["status"] == "ok" and len(calls) == research_calls + 1
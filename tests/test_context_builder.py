@@ -0,0 +1,73 @@
+import pytest
+from unittest.mock import patch
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from context_builder import build_context, count_tokens, TRUNCATION_MARKER
+
+
+@pytest.fixture(autouse=True)
+def char_estimate():
+    # Deterministic counting (4 chars/token) without fetching a tiktoken encoding
+    with patch("config.CONTEXT_TOKENIZER", None), patch("config.CONTEXT_MIN_TRUNCATED_TOKENS", 20):
+        yield
+
+
+def _history():
+    return [
+        HumanMessage(content="What is the HHI for shares 40/30/30?"),
+        SystemMessage(content="Execution plan: [['econquant'], ['synthesis']]"),
+        AIMessage(content="", tool_calls=[{"name": "run_code_py", "args": {"code": "print(1)"}, "id": "c1"}]),
+        ToolMessage(content="x" * 4000, tool_call_id="c1", name="run_code_py"),
+        AIMessage(content="HHI = 3400 (econquant answer)"),
+        SystemMessage(content="Deterministic routes: ['caselaw']"),
+        AIMessage(content="Relevant precedent: Ohio v. Amex (caselaw answer)"),
+    ]
+
+
+def test_drops_tool_chatter_and_routing_notes():
+    context = build_context(_history(), "explainer", budget=10_000)
+    contents = [m.content for m in context]
+    assert contents[0].startswith("What is the HHI")
+    assert "HHI = 3400 (econquant answer)" in contents
+    assert "Relevant precedent: Ohio v. Amex (caselaw answer)" in contents
+    assert not any(isinstance(m, ToolMessage) or getattr(m, "tool_calls", None) for m in context)
+    assert not any(c.startswith(("Execution plan", "Deterministic routes")) for c in contents)
+    assert "run_code_py x1" in contents[-1]
+
+
+def test_budget_keeps_query_and_newest_answers():
+    history = [HumanMessage(content="query")] + [AIMessage(content=f"answer {i} " + "y" * 400) for i in range(5)]
+    context = build_context(history, "explainer", budget=200)
+    kept = [m.content for m in context if isinstance(m, AIMessage)]
+    assert context[0].content == "query"
+    assert kept[-1].startswith("answer 4") and not kept[-1].endswith(TRUNCATION_MARKER)
+    assert kept[0].startswith("answer 3") and kept[0].endswith(TRUNCATION_MARKER)
+    assert len(kept) == 2
+    assert "3 older agent answer(s) omitted and 1 truncated" in context[-1].content
+    assert sum(count_tokens(m.content) for m in context[:-1]) <= 200
+
+
+def test_synthesis_gets_sources_and_per_agent_budget():
+    sources = [{"url": "http://example.com", "title": "Paper"}]
+    with patch("config.CONTEXT_TOKEN_BUDGETS", {"default": 10, "synthesis": 10_000}):
+        synthesis = build_context(_history(), "synthesis", sources=sources)
+        explainer = build_context(_history(), "explainer", sources=sources)
+    assert any(m.content.startswith("Collected Sources:") and "example.com" in m.content for m in synthesis)
+    assert not any(m.content.startswith("Collected Sources:") for m in explainer)
+    assert not any(isinstance(m, AIMessage) for m in explainer)
+
+
+def test_long_source_list_is_capped_for_synthesis():
+    """Sources beyond CONTEXT_SOURCES_MAX_TOKENS are left out rather than crowding out the answers."""
+    sources = [{"url": f"http://example.com/{i}", "title": "Paper " + "t" * 200} for i in range(200)]
+    with patch("config.CONTEXT_SOURCES_MAX_TOKENS", 1000):
+        context = build_context(_history(), "synthesis", sources=sources, budget=1500)
+    note = next(m.content for m in context if m.content.startswith("Collected Sources:"))
+    assert count_tokens(note) <= 1000 and "example.com/0" in note and "more source(s) omitted" in note
+    assert "HHI = 3400 (econquant answer)" in [m.content for m in context]
+
+
+def test_unlimited_budget_keeps_every_answer():
+    history = [HumanMessage(content="q")] + [AIMessage(content="z" * 10_000) for _ in range(3)]
+    context = build_context(history, "explainer", budget=None)
+    assert len(context) == 4
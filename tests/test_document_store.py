@@ -0,0 +1,53 @@
+import json
+from unittest.mock import patch
+
+from run_context import bind_run, end_run
+from tools.document_store import chunk_markdown, describe_documents, get_document_store
+from tools.pdf_ocr import PAGE_SEPARATOR
+from tools.read_chunk import read_chunk
+from tools.search_documents import search_documents
+
+FILING = PAGE_SEPARATOR.join([
+    "# Introduction\n\nThe parties propose to merge their cement businesses.",
+    "Further background on the transaction.\n\n## Market definition\n\nThe relevant product market is grey "
+    "cement; a SSNIP test shows white cement is not a substitute.",
+    "## Efficiencies\n\nThe parties claim logistics savings of 40 million euros per year.\n\n" + "Filler. " * 300,
+])
+
+
+def test_chunk_markdown_by_page_and_section():
+    chunks = chunk_markdown(FILING, max_chars=1000)
+    assert [(c["page"], c["section"]) for c in chunks[:4]] == [
+        (1, "Introduction"), (2, "Introduction"), (2, "Market definition"), (3, "Efficiencies")]
+    assert chunks[1]["text"] == "Further background on the transaction."  # a new page starts a new chunk
+    assert all(len(c["text"]) <= 1000 for c in chunks) and chunks[-1]["section"] == "Efficiencies"
+    assert [c["chunk_id"] for c in chunks] == list(range(len(chunks)))
+
+
+def test_search_and_read_chunks_of_the_run(tmp_path):
+    with patch("config.DOCUMENT_STORE_DIR", str(tmp_path)):
+        store = get_document_store()
+        doc = store.ingest(FILING, "filing.pdf", source="/uploads/filing.pdf")
+        assert doc["pages"] == 3 and doc["sections"] == ["Introduction", "Market definition", "Efficiencies"]
+        assert store.ingest(FILING, "filing.pdf")["doc_id"] == doc["doc_id"]  # content-addressed
+        assert (tmp_path / f"{doc['doc_id']}.json").is_file()
+        assert f"doc_id {doc['doc_id']}: filing.pdf, 3 pages" in describe_documents([doc])
+
+        store.attach("run-a", [doc["doc_id"]])
+        with bind_run("run-a"):
+            hits = json.loads(search_documents.invoke({"query": "SSNIP substitute white cement", "k": 2}))
+            assert hits[0]["section"] == "Market definition" and hits[0]["page"] == 2
+            assert len(hits) <= 2 and "SSNIP" in hits[0]["snippet"]
+            text = read_chunk.invoke({"doc_id": doc["doc_id"], "chunk_id": hits[0]["chunk_id"]})
+            assert text.startswith("[filing.pdf, page 2, section: Market definition;") and "grey cement" in text
+            assert f"; chunk {hits[0]['chunk_id']} (chunks 0 to {doc['chunks'] - 1})]" in text
+            assert "has chunks 0 to" in read_chunk.invoke({"doc_id": doc["doc_id"], "chunk_id": 999})
+        with bind_run("run-b"):  # other runs do not see run-a's uploads
+            assert search_documents.invoke({"query": "cement"}) == "No uploaded documents for this query."
+            assert read_chunk.invoke({"doc_id": doc["doc_id"], "chunk_id": 0}).startswith("Unknown document")
+
+        end_run("run-a")
+        assert store.documents("run-a") == [] and not store._documents and not store._indexes
+        store.attach("run-c", [doc["doc_id"]])  # e.g. a resumed run: reloaded from disk
+        assert store.documents("run-c")[0].chunks[0]["section"] == "Introduction"
+        end_run("run-c")
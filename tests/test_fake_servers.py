@@ -0,0 +1,54 @@
+import random
+from unittest.mock import patch
+
+from benchmarks.fake_servers import FaultProfile, StandInServer, parse_errors, stand_ins
+
+
+def test_sdks_work_against_stand_ins():
+    """Real Tavily, Linkup, Mistral and ChatOpenAI clients talk to the local servers via the config base URLs."""
+    from langchain_core.messages import HumanMessage
+
+    from agents import create_agent
+    from tools import convert_pdf_url, linkup_fetch, linkup_search, tavily_search
+
+    with stand_ins() as servers, patch("config.OCR_CACHE_ENABLED", False):
+        publisher = servers["publisher"].url
+        search = tavily_search.invoke({"query": "hospital mergers"})
+        assert "Mock" not in search["content"] and search["sources"][0]["url"].startswith(publisher)
+        assert "Mock" not in linkup_search.invoke({"query": "hospital mergers"})["content"]
+        assert linkup_fetch.invoke({"url": f"{publisher}/articles/1"})["content"].startswith("# ")
+        # Image-only PDF: no text layer, so every page goes to the Mistral stand-in
+        converted = convert_pdf_url.invoke({"url": f"{publisher}/scans/1.pdf"})
+        assert converted["success"] and converted["content"].count("Market shares table") > 40
+        agent = create_agent("teamformation", "grok-4", "You are the TeamFormationAgent.", [])
+        reply = agent.invoke({"messages": [HumanMessage(content="Assemble a team")]})["messages"][-1].content
+        assert "econquant" in reply
+        assert all(servers[name].stats["requests"] >= 1 for name in ("xai", "tavily", "linkup", "mistral"))
+
+
+def test_injected_errors_exercise_fallbacks():
+    from tools import fetch_paper_content, tavily_search
+
+    faults = {"tavily": FaultProfile(errors={429: 1.0}), "publisher": FaultProfile(errors={403: 1.0})}
+    with stand_ins(faults) as servers:
+        assert "Mock" in tavily_search.invoke({"query": "merger"})["content"]
+        assert servers["tavily"].stats == {"requests": 1, "429": 1}
+        # PDF 403 -> alternative search (rate limited) -> tavily_extract's URL check (403) -> Linkup fetch
+        result = fetch_paper_content.invoke({"url": f"{servers['publisher'].url}/papers/1.pdf"})
+        assert result["content"].startswith("[HTML Fallback]")
+        assert servers["linkup"].stats["200"] == 1
+
+
+def test_fault_profile_and_rate_limit():
+    profile = FaultProfile(latency_ms=100, latency_sigma=0.5, errors=parse_errors("429=0.25,503=0.25"))
+    rng = random.Random(0)
+    draws = [profile.sample_error(rng) for _ in range(2000)]
+    assert 400 < draws.count(429) < 600 and 400 < draws.count(503) < 600
+    latencies = sorted(profile.sample_latency(rng) for _ in range(2000))
+    assert 0.09 < latencies[1000] < 0.11 and latencies[1900] > 0.2
+
+    server = StandInServer("tavily", FaultProfile(rate_limit=1, burst=2))
+    statuses = [server.respond("POST", "/search", b'{"query": "q"}')[0] for _ in range(4)]
+    assert statuses == [200, 200, 429, 429]
+    assert server.respond("POST", "/search", b"{}")[1]["Retry-After"] == "1"
+    server.stop()
@@ -0,0 +1,69 @@
+import os
+import pytest
+from unittest.mock import patch
+
+from tools.fs_sandbox import read_text, resolve_path
+from tools.read_text_file import read_text_file
+from tools.read_multiple_files import read_multiple_files
+
+
+@pytest.fixture
+def root(tmp_path):
+    sandbox = tmp_path / "sandbox"
+    sandbox.mkdir()
+    with patch("config.FILESYSTEM_ROOTS", [str(sandbox)]):
+        yield sandbox
+
+
+def test_relative_paths_resolve_inside_root(root):
+    (root / "notes.md").write_text("# Notes\nHHI rose by 250.", encoding="utf-8")
+    assert read_text_file.invoke({"path": "notes.md"}) == "# Notes\nHHI rose by 250."
+
+
+def test_paths_escaping_the_root_are_denied(root, tmp_path):
+    secret = tmp_path / "secret.txt"
+    secret.write_text("nope")
+    os.symlink(secret, root / "link.txt")
+    for path in ("../secret.txt", str(secret), "link.txt"):
+        with pytest.raises(PermissionError):
+            resolve_path(path)
+    assert "Access denied" in read_text_file.invoke({"path": "../secret.txt"})
+
+
+def test_encoding_detection(root):
+    (root / "bom.txt").write_bytes("Café".encode("utf-8-sig"))
+    (root / "utf16.txt").write_bytes("Marché pertinent".encode("utf-16"))
+    (root / "utf32.txt").write_bytes("Marché pertinent".encode("utf-32"))
+    (root / "latin.txt").write_bytes(("Le marché pertinent et la concurrence effective. " * 20).encode("cp1252"))
+    assert read_text("bom.txt")["content"] == "Café"
+    assert read_text("utf16.txt")["content"] == "Marché pertinent"
+    assert read_text("utf32.txt")["content"] == "Marché pertinent"
+    latin = read_text("latin.txt")
+    assert "marché pertinent" in latin["content"] and latin["encoding"] != "utf-8"
+
+
+def test_large_files_are_capped_via_mmap(root):
+    (root / "big.txt").write_text("é" * 600_000, encoding="utf-8")  # 1.2 MB, above the mmap threshold
+    with patch("config.FILE_READ_MAX_BYTES", 1001):  # cuts a two-byte character in half
+        result = read_text("big.txt")
+    assert result["truncated"] and result["encoding"] == "utf-8"
+    assert result["content"] == "é" * 500
+
+
+def test_binary_files_are_rejected(root):
+    (root / "data.bin").write_bytes(b"\x00\x01\x02" * 100)
+    with pytest.raises(ValueError, match="Binary"):
+        read_text("data.bin")
+
+
+def test_read_multiple_files_preserves_order_and_budgets_total(root):
+    for name in ("a", "b", "c"):
+        (root / f"{name}.txt").write_text(name * 100)
+    with patch("config.FILE_READ_MAX_TOTAL_BYTES", 150):
+        result = read_multiple_files.invoke({"paths": ["a.txt", "missing.txt", "b.txt", "c.txt"]})
+    files = result["files"]
+    assert [os.path.basename(f["path"]) for f in files] == ["a.txt", "missing.txt", "b.txt", "c.txt"]
+    assert files[0]["content"] == "a" * 100 and not files[0]["truncated"]
+    assert "error" in files[1]
+    assert files[2]["content"] == "b" * 50 and files[2]["truncated"]
+    assert files[3]["content"] == ""
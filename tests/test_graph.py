@@ -6,7 +6,7 @@ import os
 # Add project root to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from graph import create_workflow
+from graph import create_workflow, build_execution_plan
 from exceptions import WorkflowError
 
 def test_create_workflow_basic():
@@ -64,3 +64,72 @@ def test_create_workflow_invalid_agent():
         # But create_workflow might just try to create it.
         # If create_agent raises error, we catch it.
         pass
+
+
+def test_build_execution_plan_levels():
+    """Specialists share a level, followed by verifier, debate and synthesis."""
+    plan = build_execution_plan(["synthesis", "verifier", "caselaw", "econpaper", "marketdef", "pro", "cons", "arbiter"])
+    assert plan == [["econpaper", "marketdef", "caselaw"], ["verifier"], ["debate"], ["synthesis"]]
+
+def test_build_execution_plan_skips_verifier_without_citations():
+    """The verifier is only planned when a citation-producing agent is selected."""
+    assert build_execution_plan(["econquant", "verifier", "synthesis"]) == [["econquant"], ["synthesis"]]
+
+def test_plan_level_joins_once_when_a_parallel_agent_fails():
+    """A failed member of a parallel level is remediated once; later levels run once."""
+    import json
+    import benchmarks.fakes as fakes
+    from benchmarks.fakes import BenchmarkProfile, fake_backends
+    from benchmarks.workflow import initial_state
+    from run_context import run_scope
+
+    agents = ["econpaper", "econquant", "verifier", "synthesis"]
+    script, answers = fakes.agent_script, []
+
+    def flaky_script(agent, profile, messages):
+        rounds, answer = script(agent, profile, messages)
+        if agent == "remediation":
+            return [], json.dumps({"action": "rephrase", "new_args": {"query": "merger retrospectives"}})
+        if agent == "econpaper" and fakes._tool_rounds_so_far(messages) == len(rounds):
+            answers.append(answer)
+            if len(answers) == 1:
+                return rounds, "Sorry, no papers."  # fails EconPaperOutput validation
+        return rounds, answer
+
+    with fake_backends(BenchmarkProfile()), patch.object(fakes, "agent_script", flaky_script), run_scope():
+        workflow = create_workflow(agents, "plan")
+        nodes = [node for chunk in workflow.stream(initial_state({"agents": agents, "query": "Merger papers"}),
+                                                    stream_mode="updates") for node in chunk]
+    runs = [node for node in nodes if not node.startswith("join_")]
+    assert runs[0] == "planner" and set(runs[1:3]) == {"econpaper", "econquant"}  # one parallel step
+    assert runs[3:] == ["remediation", "econpaper", "verifier", "synthesis"]  # only the failed agent is retried
+
+
+def test_supervisor_fanout_joins_once_when_a_parallel_agent_fails():
+    """A failed agent of a parallel step is remediated once; the supervisor and synthesis run once after it."""
+    import json
+    import benchmarks.fakes as fakes
+    from benchmarks.fakes import BenchmarkProfile, fake_backends
+    from benchmarks.workflow import initial_state
+    from run_context import run_scope
+
+    agents = ["econquant", "marketdef", "synthesis"]
+    script, calls = fakes.agent_script, []
+
+    def flaky_script(agent, profile, messages):
+        if agent == "remediation":
+            return [], json.dumps({"action": "rephrase", "new_args": {"query": "HHI thresholds"}})
+        if agent == "econquant":
+            calls.append(agent)
+            if len(calls) == 1:
+                raise RuntimeError("quant backend down")
+        return script(agent, profile, messages)
+
+    with fake_backends(BenchmarkProfile()), patch.object(fakes, "agent_script", flaky_script), \
+            patch("config.PARALLEL_FANOUT", True), run_scope():
+        workflow = create_workflow(agents, "supervisor")
+        nodes = [node for chunk in workflow.stream(initial_state({"agents": agents, "query": "Market concentration"}),
+                                                    stream_mode="updates") for node in chunk]
+    runs = [node for node in nodes if node != "join"]
+    assert runs[0] == "supervisor" and set(runs[1:3]) == {"econquant", "marketdef"}  # one parallel step
+    assert runs[3:] == ["remediation", "econquant", "supervisor", "synthesis"]  # no fork: each runs once
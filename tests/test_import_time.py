@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+# Provider SDKs that must only load when a tool or agent first needs them
+LAZY_MODULES = ("mistralai", "tavily", "linkup", "pypdf", "langchain_openai")
+
+# Generous ceiling for `app.py --help` (about 0.3s on a warm dev machine) so a
+# regression back to eager imports, which costs several seconds, fails loudly
+HELP_IMPORT_BUDGET_SECONDS = 2.0
+
+
+def _importtime(args: list[str]) -> dict[str, int]:
+    """Run python -X importtime with args and return {module: cumulative microseconds}."""
+    env = {k: v for k, v in os.environ.items() if k != "MISTRAL_API_KEY"}
+    out = subprocess.run([sys.executable, "-X", "importtime", *args], capture_output=True,
+                         text=True, cwd=ROOT, env=env, timeout=120)
+    assert out.returncode == 0, out.stderr[-2000:]
+    modules = {}
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def _top_level_seconds(modules: dict[str, int], roots: tuple[str, ...]) -> float:
+    return sum(us for name, us in modules.items() if name in roots) / 1e6
+
+
+def test_cli_help_skips_heavy_imports():
+    """--help must not import the workflow, agents or provider SDKs."""
+    modules = _importtime(["app.py", "--help"])
+    loaded = [name for name in modules if name.split(".")[0] in LAZY_MODULES + ("graph", "agents", "langgraph")]
+    assert loaded == []
+    assert _top_level_seconds(modules, tuple(n for n in modules if "." not in n)) < HELP_IMPORT_BUDGET_SECONDS
+
+
+def test_importing_workflow_defers_provider_sdks():
+    """graph/agents/tools import without provider SDKs and without MISTRAL_API_KEY."""
+    modules = _importtime(["-c", "import graph, tools"])
+    assert "graph" in modules
+    assert [name for name in modules if name.split(".")[0] in LAZY_MODULES] == []
+
+
+def test_missing_api_keys_are_reported_not_printed(capsys):
+    """config reports missing keys on request instead of printing at import."""
+    import config
+    from unittest.mock import patch
+    with patch("config.MISTRAL_API_KEY", None):
+        assert any("MISTRAL_API_KEY" in w for w in config.missing_api_key_warnings())
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,36 @@
+import json
+
+from benchmarks.json_extract import run_benchmarks
+from json_utils import first_object, json_spans, largest_json
+
+PAPERS = [{"title": "Upward pricing {pressure} [revisited]", "url": "https://example.org/1", "note": 'a "quoted" \\ ]'}]
+
+
+def test_spans_are_string_aware_and_skip_prose_brackets():
+    text = 'The {IIA holds} case [sic] [1], then {a, b and ```json\n' + json.dumps(PAPERS) + '\n```'
+    spans = json_spans(text)
+    assert [text[start:end] for start, end in spans] == ["[1]", json.dumps(PAPERS)]
+    assert largest_json(text) == PAPERS  # the payload, not the citation marker
+    assert json_spans('{"a": [1}, 2]} and {"b": "never closed') == [(0, 14)]  # mismatched closer ignored
+
+
+def test_first_object_with_predicate():
+    text = 'Reasoning [2, 3] {"route": "x"} more {note} {"should_continue": true, "feedback": "Cite [1] {p. 3}"}'
+    assert first_object(text) == {"route": "x"}
+    assert first_object(text, lambda value: "should_continue" in value)["feedback"] == "Cite [1] {p. 3}"
+    assert first_object("{note: {\"a\": 1}}") == {"a": 1}  # nested in a brace that is not JSON
+    assert first_object("no JSON here, only [1] and {braces}") is None
+
+
+def test_unclosed_opener_does_not_hide_later_values():
+    text = 'Confidence in [0, 1). Decision: {"route": "econpaper"}'
+    assert [text[start:end] for start, end in json_spans(text)] == ['{"route": "econpaper"}']
+    assert first_object(text) == {"route": "econpaper"}
+    assert first_object('[He said "x. {"route": "a"}') == {"route": "a"}  # unterminated quote
+    assert json_spans('[1] then [0, 1) and [2, 3) {"q": [1]} [0, 1)') == [(0, 3), (27, 37)]
+
+
+def test_benchmark_finds_payloads_where_legacy_regexes_did_not():
+    results = {r["case"]: r for r in run_benchmarks(size_kb=16, repeat=1)}
+    assert all(r["scanner_found"] for r in results.values())
+    assert not results["papers"]["legacy_found"] and not results["arbiter"]["legacy_found"]
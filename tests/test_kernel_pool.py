@@ -0,0 +1,92 @@
+import shutil
+import sys
+import pytest
+from unittest.mock import patch
+
+from run_context import run_scope, get_run_id, DEFAULT_RUN_ID
+from tools.kernel_pool import KernelPool, KernelTimeout, get_pool, shutdown_all
+from tools.run_code_py import WORKER_SCRIPT, run_code_py
+from tools.run_code_r import WORKER_SCRIPT as R_WORKER_SCRIPT, run_code_r
+
+
+@pytest.fixture
+def pool():
+    pool = KernelPool("python-test", [sys.executable, "-u", WORKER_SCRIPT], warm_spare=False, max_kernels=2)
+    yield pool
+    pool.shutdown()
+
+
+def test_state_persists_within_a_run_and_is_isolated_across_runs(pool):
+    assert pool.execute("x = 21", run_id="a", timeout=30)["ok"]
+    assert pool.execute("x * 2", run_id="a", timeout=30)["output"] == "42\n"
+    result = pool.execute("x", run_id="b", timeout=30)
+    assert not result["ok"] and "NameError" in result["error"]
+
+
+def test_output_is_streamed_before_the_call_finishes(pool):
+    seen = []
+    code = "import sys, time\nprint('first')\nsys.stdout.flush()\ntime.sleep(0.2)\nprint('second')"
+    result = pool.execute(code, run_id="a", timeout=30, on_output=lambda kind, data: seen.append((kind, data)))
+    assert seen == [("stdout", "first\n"), ("stdout", "second\n")]
+    assert result["output"] == "first\nsecond\n"
+
+
+def test_wall_clock_timeout_kills_and_replaces_kernel(pool):
+    pool.execute("x = 1", run_id="a", timeout=30)
+    with pytest.raises(KernelTimeout):
+        pool.execute("import time; time.sleep(10)", run_id="a", timeout=0.5)
+    assert pool.runs() == []
+    result = pool.execute("'x' in globals()", run_id="a", timeout=30)
+    assert result["output"] == "False\n"
+
+
+def test_least_recently_used_kernel_is_recycled(pool):
+    for run in ("a", "b", "c"):
+        pool.execute("pass", run_id=run, timeout=30)
+    assert pool.runs() == ["b", "c"]
+
+
+def test_kernels_are_released_when_the_run_ends():
+    try:
+        with run_scope() as run_id:
+            assert get_run_id() == run_id
+            assert "7" in run_code_py.invoke({"code": "y = 7\ny"})
+            assert "7" in run_code_py.invoke({"code": "y"})
+            assert run_id in get_pool("python", None).runs()
+        assert get_run_id() == DEFAULT_RUN_ID
+        assert run_id not in get_pool("python", None).runs()
+    finally:
+        shutdown_all()
+
+
+@pytest.mark.skipif(not hasattr(__import__("resource"), "prlimit"), reason="prlimit is Linux-only")
+def test_parent_side_memory_limit():
+    pool = KernelPool("python-test", [sys.executable, "-u", WORKER_SCRIPT], warm_spare=False, memory_mb=512)
+    try:
+        result = pool.execute("b = bytearray(1024 ** 3)", run_id="a", timeout=30)
+        assert "MemoryError" in result["error"]
+    finally:
+        pool.shutdown()
+
+
+def test_run_code_r_without_rscript_falls_back_to_mock():
+    with patch("config.RUN_CODE_R_CMD", "/nonexistent/Rscript"), patch("config.RUN_CODE_WARM_SPARE", False):
+        try:
+            result = run_code_r.invoke({"code": "1 + 1"})
+        finally:
+            shutdown_all()
+    assert result.startswith("Mock")
+
+
+@pytest.mark.skipif(shutil.which("Rscript") is None, reason="R is not installed")
+def test_r_worker_keeps_objects_between_calls():
+    pool = KernelPool("r-test", ["Rscript", "--vanilla", R_WORKER_SCRIPT], warm_spare=False)
+    try:
+        assert pool.execute("d <- data.frame(x = 1:10, y = 2 * (1:10))", run_id="a", timeout=60)["ok"]
+        fit = pool.execute("fit <- lm(y ~ x, data = d)\nunname(round(coef(fit)[2], 3))", run_id="a", timeout=60)
+        assert fit["ok"] and "2" in fit["output"]
+        failed = pool.execute("stop('boom')", run_id="a", timeout=60)
+        assert not failed["ok"] and "boom" in failed["error"]
+        assert pool.execute("exists('fit')", run_id="a", timeout=60)["output"].strip() == "[1] TRUE"
+    finally:
+        pool.shutdown()
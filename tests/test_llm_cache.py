@@ -0,0 +1,61 @@
+import pytest
+from unittest.mock import patch
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration
+
+from exceptions import ConfigurationError
+from llm_cache import CassetteMiss, LLMCassette, cache_key, get_llm_cache
+from run_context import run_scope
+from telemetry import get_metrics
+
+
+def _agent(mode, path):
+    from agents import create_agent
+    with patch("config.LLM_CACHE_MODE", mode), patch("config.LLM_CASSETTE_PATH", str(path)):
+        return create_agent("econquant", "grok-4-1-fast-reasoning", "You compute HHI.", [])
+
+
+def test_record_then_replay_through_create_agent(tmp_path):
+    cassette = tmp_path / "cassette.sqlite"
+    query = {"messages": [HumanMessage(content="HHI for 40/30/30?")]}
+    recorded = _agent("record", cassette).invoke(query)["messages"][-1]
+
+    with run_scope("llm-cache-replay") as run_id:
+        metrics = get_metrics(run_id)
+        with patch("agents.mock_model.MockChatModel._generate", side_effect=AssertionError("model called")):
+            replayed = _agent("replay", cassette).invoke(query)["messages"][-1]
+    assert replayed.content == recorded.content
+    assert metrics.to_dict()["cache_hits"] == {"llm": 1}
+
+    with pytest.raises(CassetteMiss):
+        _agent("replay", cassette).invoke({"messages": [HumanMessage(content="A query never recorded")]})
+
+
+def test_key_ignores_message_ids_but_not_model_params(tmp_path):
+    from langchain_core.load import dumps
+    first = dumps([HumanMessage(content="q", id="run-1")])
+    second = dumps([HumanMessage(content="q", id="run-2")])
+    assert cache_key(first, "model=a") == cache_key(second, "model=a")
+    assert cache_key(first, "model=a") != cache_key(first, "model=b")
+
+    cassette = LLMCassette(str(tmp_path / "c.sqlite"), "record")
+    message = AIMessage(content="", tool_calls=[{"name": "run_code_py", "args": {"code": "1"}, "id": "c1"}],
+                        usage_metadata={"input_tokens": 3, "output_tokens": 2, "total_tokens": 5})
+    cassette.update(first, "model=a", [ChatGeneration(message=message)])
+    hit = cassette.lookup(second, "model=a")[0].message
+    assert hit.tool_calls == message.tool_calls and hit.usage_metadata == message.usage_metadata
+    assert cassette.lookup(first, "model=b") is None
+    assert cassette.stats()["entries"] == 1
+
+
+def test_passthrough_and_invalid_modes(tmp_path):
+    with patch("config.LLM_CACHE_MODE", "passthrough"):
+        assert get_llm_cache() is None
+    with patch("config.LLM_CACHE_MODE", "bogus"), pytest.raises(ConfigurationError):
+        get_llm_cache()
+    with patch("config.LLM_CACHE_MODE", "record"), patch("config.LLM_CASSETTE_PATH", str(tmp_path / "c.sqlite")):
+        assert get_llm_cache() is get_llm_cache()
+    replay = LLMCassette(str(tmp_path / "c.sqlite"), "replay")
+    replay.update("[]", "m", [ChatGeneration(message=AIMessage(content="x"))])  # replay never records
+    with pytest.raises(CassetteMiss):
+        replay.lookup("[]", "m")
@@ -0,0 +1,107 @@
+import asyncio
+import os
+import time
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+
+from tools import ocr_cache
+from tools.ocr_cache import OCRCache, hash_pdf
+from tools.convert_pdf_file import convert_pdf_file
+from tools.convert_pdf_url import convert_pdf_url
+
+PDF_BYTES = b"%PDF-1.4 test document"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Point the process-wide OCR cache at a temporary directory."""
+    test_cache = OCRCache(str(tmp_path / "ocr"), max_bytes=10 * 1024 * 1024)
+    with patch.object(ocr_cache, "_cache", test_cache):
+        yield test_cache
+
+
+def _mistral_client(pages):
+    client = MagicMock()
+    client.ocr.process.return_value = MagicMock(pages=[MagicMock(markdown=p) for p in pages])
+    client.ocr.process_async = AsyncMock(return_value=client.ocr.process.return_value)
+    return client
+
+
+def test_put_get_roundtrip_and_url_alias(cache):
+    digest = hash_pdf(PDF_BYTES)
+    assert cache.get(digest) is None
+    cache.put(digest, ["page 1", "page 2"], source="paper.pdf")
+    cache.add_alias("https://example.com/paper.pdf", digest)
+    assert cache.get(digest) == ["page 1", "page 2"]
+    assert cache.get_by_url("https://example.com/paper.pdf") == ["page 1", "page 2"]
+    assert cache.get_by_url("https://example.com/other.pdf") is None
+
+
+def test_lru_eviction_respects_size_cap(tmp_path):
+    small = OCRCache(str(tmp_path / "ocr"), max_bytes=10 ** 9)
+    for i, name in enumerate(["a", "b", "c"]):
+        small.put(name * 64, ["x" * 1000])
+        os.utime(small._entry_path(name * 64), (time.time() - 100 + i, time.time() - 100 + i))
+    small.get("a" * 64)  # touch the oldest so "b" becomes least recently used
+    sizes = {e["sha256"][0]: e["bytes"] for e in small.entries()}
+    small.evict(max_bytes=sizes["a"] + sizes["c"])
+    remaining = {e["sha256"][0] for e in small.entries()}
+    assert remaining == {"a", "c"}
+
+
+def test_purge_drops_orphaned_aliases(cache):
+    digest = hash_pdf(PDF_BYTES)
+    cache.put(digest, ["page"])
+    cache.add_alias("https://example.com/paper.pdf", digest)
+    assert cache.purge() == 1
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["aliases"] == 0
+
+
+def test_convert_pdf_file_ocrs_identical_bytes_once(cache, tmp_path):
+    first, second = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    first.write_bytes(PDF_BYTES)
+    second.write_bytes(PDF_BYTES)
+    client = _mistral_client(["# Title", "Body"])
+    with patch("tools.pdf_ocr.get_mistral_client", return_value=client):
+        assert convert_pdf_file.invoke({"file_path": str(first)})["content"] == "# Title\n\n---\n\nBody"
+        assert convert_pdf_file.invoke({"file_path": str(second)})["content"] == "# Title\n\n---\n\nBody"
+    client.ocr.process.assert_called_once()
+
+
+def test_convert_pdf_url_alias_skips_download(cache):
+    response = MagicMock(status_code=200, headers={})
+    response.__enter__.return_value = response
+    response.iter_content.return_value = iter([PDF_BYTES])
+    session = MagicMock()
+    session.get.return_value = response
+    client = _mistral_client(["page"])
+    with patch("tools.convert_pdf_url.get_http_session", return_value=session), \
+         patch("tools.pdf_ocr.get_mistral_client", return_value=client):
+        convert_pdf_url.invoke({"url": "https://example.com/paper.pdf"})
+        result = convert_pdf_url.invoke({"url": "https://example.com/paper.pdf"})
+    assert result == {"success": True, "content": "page"}
+    session.get.assert_called_once()
+    client.ocr.process.assert_called_once()
+
+
+def test_async_conversion_shares_cache(cache, tmp_path):
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(PDF_BYTES)
+    client = _mistral_client(["page"])
+    with patch("tools.pdf_ocr.get_async_mistral_client", return_value=client):
+        asyncio.run(convert_pdf_file.ainvoke({"file_path": str(pdf)}))
+        asyncio.run(convert_pdf_file.ainvoke({"file_path": str(pdf)}))
+    client.ocr.process_async.assert_awaited_once()
+    assert cache.get(hash_pdf(PDF_BYTES)) == ["page"]
+
+
+def test_cli_stats_and_purge(tmp_path, capsys):
+    root = str(tmp_path / "ocr")
+    OCRCache(root, max_bytes=10 ** 6).put(hash_pdf(PDF_BYTES), ["page"], source="paper.pdf")
+    ocr_cache.main(["--dir", root, "list"])
+    assert "paper.pdf" in capsys.readouterr().out
+    ocr_cache.main(["--dir", root, "purge", "--all"])
+    assert "Removed 1 entries" in capsys.readouterr().out
+    ocr_cache.main(["--dir", root, "stats"])
+    assert "Entries: 0" in capsys.readouterr().out
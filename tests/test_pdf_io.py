@@ -0,0 +1,90 @@
+import asyncio
+import hashlib
+import os
+import pytest
+from unittest.mock import MagicMock, patch
+
+from exceptions import FileProcessingError
+from tools.pdf_io import spool_pdf, aspool_pdf, check_local_pdf, hash_file
+from tools.pdf_ocr import ocr_pdf_pages
+
+URL = "https://example.com/filing.pdf"
+
+
+def _chunks(data: bytes, size: int = 1024):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def test_spool_hashes_and_writes_stream_to_temp_file():
+    data = b"%PDF-1.7\n" + os.urandom(10_000)
+    path, digest = spool_pdf(URL, {"Content-Length": str(len(data))}, _chunks(data))
+    try:
+        assert digest == hashlib.sha256(data).hexdigest()
+        with open(path, "rb") as f:
+            assert f.read() == data
+        assert hash_file(path) == digest
+    finally:
+        os.unlink(path)
+
+
+def test_spool_rejects_non_pdf_after_first_chunk():
+    consumed = []
+
+    def html():
+        for i in range(100):
+            consumed.append(i)
+            yield b"<html>" + b"x" * 2000
+
+    with pytest.raises(FileProcessingError, match="did not return a PDF"):
+        spool_pdf(URL, {}, html())
+    assert len(consumed) == 1
+
+
+def test_spool_enforces_size_ceiling(tmp_path):
+    with patch("config.PDF_MAX_BYTES", 4096), patch("tempfile.tempdir", str(tmp_path)):
+        with pytest.raises(FileProcessingError, match="too large"):
+            spool_pdf(URL, {"Content-Length": "999999"}, iter([]))
+        with pytest.raises(FileProcessingError, match="exceeds"):
+            spool_pdf(URL, {}, _chunks(b"%PDF" + b"0" * 10_000))
+    assert list(tmp_path.iterdir()) == []  # partial download was removed
+
+
+def test_async_spool_matches_sync():
+    data = b"%PDF-1.4\n" + b"1" * 5000
+
+    async def stream():
+        for chunk in _chunks(data):
+            yield chunk
+
+    path, digest = asyncio.run(aspool_pdf(URL, {}, stream()))
+    try:
+        assert digest == hashlib.sha256(data).hexdigest()
+        assert os.path.getsize(path) == len(data)
+    finally:
+        os.unlink(path)
+
+
+def test_check_local_pdf(tmp_path):
+    good, bad = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    good.write_bytes(b"%PDF-1.4 ok")
+    bad.write_bytes(b"not a pdf")
+    assert check_local_pdf(str(good)) is None
+    assert check_local_pdf(str(bad)).startswith("Invalid PDF file")
+    assert check_local_pdf(str(tmp_path / "missing.pdf")).startswith("File not found")
+
+
+def test_large_payload_is_uploaded_instead_of_inlined(tmp_path):
+    pdf = tmp_path / "scan.pdf"
+    pdf.write_bytes(b"%PDF-1.4 not parseable locally")
+    client = MagicMock()
+    client.files.upload.return_value = MagicMock(id="file-1")
+    client.files.get_signed_url.return_value = MagicMock(url="https://signed.example/file-1")
+    client.ocr.process.return_value = MagicMock(pages=[MagicMock(markdown="page")])
+    with patch("config.OCR_CACHE_ENABLED", False), patch("config.OCR_INLINE_MAX_BYTES", 0), \
+         patch("tools.pdf_ocr.get_mistral_client", return_value=client):
+        assert ocr_pdf_pages(str(pdf)) == ["page"]
+    uploaded = client.files.upload.call_args.kwargs["file"]["content"]
+    assert uploaded.closed and uploaded.name == str(pdf)  # streamed from disk, not read into memory
+    assert client.ocr.process.call_args.kwargs["document"]["document_url"] == "https://signed.example/file-1"
+    client.files.delete.assert_called_once_with(file_id="file-1")
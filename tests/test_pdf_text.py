@@ -0,0 +1,184 @@
+import asyncio
+import base64
+import io
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import ArrayObject, DecodedStreamObject, DictionaryObject, NameObject, NumberObject
+from tenacity import wait_none
+
+from tools.pdf_ocr import ocr_pdf_pages, aocr_pdf_pages
+from tools.pdf_text import _page_has_images, extract_text_pages, open_pdf, subset_pdf
+
+BODY = ("Market definition in merger review starts from the hypothetical monopolist test. "
+        "Demand substitution constrains pricing when customers can switch to alternatives. ") * 3
+
+
+def _make_pdf(kinds: list[str]) -> bytes:
+    """Build a PDF whose pages are "text" (a real text layer), "scan" (image only), "form" (an image
+    inside a Form XObject), "vector" (paths only) or "blank" (nothing drawn)."""
+    writer = PdfWriter()
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    })
+    for i, kind in enumerate(kinds):
+        page = writer.add_blank_page(width=612, height=792)
+        stream = DecodedStreamObject()
+        if kind == "text":
+            lines = [BODY[j:j + 80] for j in range(0, len(BODY), 80)]
+            ops = " ".join(f"({line}) Tj 0 -14 Td" for line in [f"Page {i + 1}"] + lines)
+            stream.set_data(f"BT /F1 11 Tf 50 740 Td {ops} ET".encode("latin-1"))
+            page[NameObject("/Resources")] = DictionaryObject({
+                NameObject("/Font"): DictionaryObject({NameObject("/F1"): writer._add_object(font)})
+            })
+        elif kind == "vector":
+            stream.set_data(b"50 700 m 300 700 l 300 500 l h f")
+        elif kind == "blank":
+            stream.set_data(b"")
+        else:
+            image = DecodedStreamObject()
+            image.set_data(b"\x80" * 3)
+            image.update({
+                NameObject("/Type"): NameObject("/XObject"),
+                NameObject("/Subtype"): NameObject("/Image"),
+                NameObject("/Width"): NumberObject(1),
+                NameObject("/Height"): NumberObject(1),
+                NameObject("/ColorSpace"): NameObject("/DeviceRGB"),
+                NameObject("/BitsPerComponent"): NumberObject(8),
+            })
+            stream.set_data(b"q 612 0 0 792 0 0 cm /Im0 Do Q")
+            xobject = writer._add_object(image)
+            if kind == "form":
+                form = DecodedStreamObject()
+                form.set_data(b"/Im0 Do")
+                form.update({
+                    NameObject("/Type"): NameObject("/XObject"),
+                    NameObject("/Subtype"): NameObject("/Form"),
+                    NameObject("/BBox"): ArrayObject([NumberObject(0), NumberObject(0), NumberObject(1), NumberObject(1)]),
+                    NameObject("/Resources"): DictionaryObject({
+                        NameObject("/XObject"): DictionaryObject({NameObject("/Im0"): xobject})
+                    }),
+                })
+                xobject = writer._add_object(form)
+            page[NameObject("/Resources")] = DictionaryObject({
+                NameObject("/XObject"): DictionaryObject({NameObject("/Im0"): xobject})
+            })
+        page[NameObject("/Contents")] = writer._add_object(stream)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def no_cache():
+    with patch("config.OCR_CACHE_ENABLED", False):
+        yield
+
+
+def test_classifies_text_and_scanned_pages():
+    pages = extract_text_pages(open_pdf(_make_pdf(["text", "scan", "text"])))
+    assert pages[0].startswith("Page 1") and "hypothetical monopolist" in pages[0]
+    assert pages[1] is None
+    assert pages[2].startswith("Page 3")
+
+
+def test_textless_pages_go_to_ocr_unless_blank():
+    """Images nested in Form XObjects and vector-only drawings are OCR'd; only empty pages are skipped."""
+    reader = open_pdf(_make_pdf(["form", "vector", "blank"]))
+    assert extract_text_pages(reader) == [None, None, ""]
+    assert _page_has_images(reader.pages[0]) and not _page_has_images(reader.pages[1])
+
+
+def test_garbled_text_layer_goes_to_ocr():
+    reader = MagicMock()
+    reader.pages = [MagicMock(extract_text=MagicMock(return_value="(cid:12)(cid:7)(cid:9) " * 40))]
+    assert extract_text_pages(reader) == [None]
+
+
+def test_subset_pdf_keeps_requested_pages_in_order():
+    reader = open_pdf(_make_pdf(["text", "scan", "text"]))
+    subset = PdfReader(io.BytesIO(subset_pdf(reader, [2, 0])))
+    assert len(subset.pages) == 2
+    assert subset.pages[0].extract_text().startswith("Page 3")
+
+
+def test_only_scanned_pages_are_ocrd_and_merged_in_order():
+    pdf = _make_pdf(["text", "scan", "text", "scan"])
+    client = MagicMock()
+    client.ocr.process.return_value = MagicMock(pages=[MagicMock(markdown="OCR A"), MagicMock(markdown="OCR B")])
+    with patch("tools.pdf_ocr.get_mistral_client", return_value=client):
+        pages = ocr_pdf_pages(pdf)
+    sent = client.ocr.process.call_args.kwargs["document"]["document_url"]
+    sent_pdf = PdfReader(io.BytesIO(base64.b64decode(sent.split(",", 1)[1])))
+    assert len(sent_pdf.pages) == 2
+    assert [p[:6] for p in pages] == ["Page 1", "OCR A", "Page 3", "OCR B"]
+
+
+def test_born_digital_pdf_skips_ocr():
+    client = MagicMock()
+    with patch("tools.pdf_ocr.get_mistral_client", return_value=client):
+        pages = ocr_pdf_pages(_make_pdf(["text", "text"]))
+    client.ocr.process.assert_not_called()
+    assert len(pages) == 2
+
+
+def _page_numbers(kwargs) -> list[str]:
+    """Fake OCR: echo the "Page N" line of every page in the submitted PDF."""
+    data = base64.b64decode(kwargs["document"]["document_url"].split(",", 1)[1])
+    return [page.extract_text().splitlines()[0] for page in PdfReader(io.BytesIO(data)).pages]
+
+
+def test_large_documents_are_ocrd_in_concurrent_shards():
+    pdf = _make_pdf(["text"] * 10)
+    client = MagicMock()
+    client.ocr.process.side_effect = lambda **kw: MagicMock(pages=[MagicMock(markdown=f"OCR {n}") for n in _page_numbers(kw)])
+    with patch("config.PDF_TEXT_FAST_PATH", False), patch("config.OCR_SHARD_PAGES", 3), \
+         patch("tools.pdf_ocr.get_mistral_client", return_value=client):
+        pages = ocr_pdf_pages(pdf)
+    assert client.ocr.process.call_count == 4
+    assert pages == [f"OCR Page {i}" for i in range(1, 11)]
+
+
+def test_failed_shard_is_retried_then_replaced_by_placeholder():
+    pdf = _make_pdf(["text"] * 4)
+    calls = {"n": 0}
+
+    def flaky(**kw):
+        numbers = _page_numbers(kw)
+        calls["n"] += 1
+        if numbers[0] == "Page 3":
+            raise RuntimeError("upstream 503")
+        return MagicMock(pages=[MagicMock(markdown=f"OCR {n}") for n in numbers])
+
+    client = MagicMock()
+    client.ocr.process.side_effect = flaky
+    with patch("config.PDF_TEXT_FAST_PATH", False), patch("config.OCR_SHARD_PAGES", 2), \
+         patch("tools.pdf_ocr._RETRY_WAIT", wait_none()), \
+         patch("tools.pdf_ocr.get_mistral_client", return_value=client):
+        pages = ocr_pdf_pages(pdf)
+    assert calls["n"] == 1 + 3  # first shard once, second shard exhausts its retries
+    assert pages[:2] == ["OCR Page 1", "OCR Page 2"]
+    assert pages[2].startswith("[OCR failed for pages 3-4")
+
+
+def test_async_shards_respect_concurrency_limit():
+    pdf = _make_pdf(["text"] * 8)
+    state = {"active": 0, "peak": 0}
+
+    async def fake_ocr(**kw):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.01)
+        state["active"] -= 1
+        return MagicMock(pages=[MagicMock(markdown=f"OCR {n}") for n in _page_numbers(kw)])
+
+    client = MagicMock()
+    client.ocr.process_async = AsyncMock(side_effect=fake_ocr)
+    with patch("config.PDF_TEXT_FAST_PATH", False), patch("config.OCR_SHARD_PAGES", 1), \
+         patch("config.OCR_MAX_CONCURRENCY", 3), \
+         patch("tools.pdf_ocr.get_async_mistral_client", return_value=client):
+        pages = asyncio.run(aocr_pdf_pages(pdf))
+    assert state["peak"] == 3
+    assert pages == [f"OCR Page {i}" for i in range(1, 9)]
@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+
+from tools import providers
+from tools.tavily_search import tavily_search
+from tools.linkup_search import linkup_search
+
+
+@pytest.fixture(autouse=True)
+def reset_pools():
+    providers.close_all()
+    yield
+    providers.close_all()
+
+
+def test_sync_clients_are_shared():
+    """Repeated lookups return the same pooled client instead of building a new one."""
+    factory = MagicMock()
+    first = providers.get_tavily_client(factory)
+    second = providers.get_tavily_client(factory)
+    assert first is second
+    factory.assert_called_once()
+    assert providers.get_http_session() is providers.get_http_session()
+
+
+def test_async_clients_are_per_event_loop():
+    """Async clients are reused within a loop but never shared across loops."""
+    factory = MagicMock(side_effect=lambda **kwargs: object())
+
+    async def lookup_twice():
+        return providers.get_async_tavily_client(factory), providers.get_async_tavily_client(factory)
+
+    a1, a2 = asyncio.run(lookup_twice())
+    b1, _ = asyncio.run(lookup_twice())
+    assert a1 is a2
+    assert a1 is not b1
+
+
+def test_tavily_search_reuses_client_across_calls():
+    """Two searches construct the Tavily client only once."""
+    with patch('tools.providers._sdk_class') as sdk_class:  # the tavily SDK class
+        mock_client = sdk_class.return_value
+        mock_client.return_value.search.return_value = {
+            "results": [{"title": "T", "content": "C", "url": "https://example.com"}]
+        }
+        tavily_search.invoke({"query": "a"})
+        result = tavily_search.invoke({"query": "b"})
+        assert mock_client.call_count == 1
+        assert result["sources"][0]["url"] == "https://example.com"
+
+
+def test_tavily_search_ainvoke_uses_async_client():
+    """ainvoke awaits the async Tavily client rather than blocking a thread."""
+    with patch('tools.providers._sdk_class') as sdk_class:  # the tavily SDK class
+        mock_client = sdk_class.return_value
+        mock_client.return_value.search = AsyncMock(return_value={
+            "results": [{"title": "T", "content": "C", "url": "https://example.com"}]
+        })
+        result = asyncio.run(tavily_search.ainvoke({"query": "a"}))
+        mock_client.return_value.search.assert_awaited_once()
+        assert result["content"] == "T: C"
+
+
+def test_linkup_search_ainvoke_uses_async_search():
+    """linkup_search.ainvoke goes through the SDK's async_search on the pooled client."""
+    hit = MagicMock(url="https://example.com", content="C")
+    hit.name = "T"
+    client = MagicMock()
+    client.async_search = AsyncMock(return_value=MagicMock(results=[hit]))
+    with patch('tools.linkup_search.get_linkup_client', return_value=client):
+        result = asyncio.run(linkup_search.ainvoke({"query": "a"}))
+    client.async_search.assert_awaited_once()
+    assert result["sources"] == [{"url": "https://example.com", "title": "T", "snippet": "C"}]
+
+
+def test_pooled_linkup_client_keeps_the_pool_timeout():
+    """The SDK's timeout=None does not disable the pooled client's timeout; timeouts raise the SDK's error."""
+    import httpx
+    import linkup
+
+    timeouts = []
+
+    def handler(request):
+        timeouts.append(request.extensions["timeout"]["read"])
+        raise httpx.ReadTimeout("slow", request=request)
+
+    providers._clients[("linkup-http",)] = httpx.Client(transport=httpx.MockTransport(handler), timeout=0.5)
+    client = providers.pooled_linkup_client_class()(api_key="test-key")
+    with pytest.raises(linkup.LinkupTimeoutError):
+        client.search(query="a", depth="standard", output_type="searchResults")
+    assert timeouts == [0.5]
@@ -104,3 +104,42 @@ def test_reset_thoughts():
     reset_thoughts()
     
     assert len(thought_history) == 0
+
+def _think(n, text=None, **extra):
+    return json.loads(sequential_thinking.invoke({
+        "thought": text or f"Thought {n}",
+        "thoughtNumber": n,
+        "totalThoughts": 100,
+        "nextThoughtNeeded": True,
+        **extra,
+    }))
+
+def test_runs_and_agents_have_separate_histories():
+    from run_context import run_scope, agent_scope
+    from tools.sequential_thinking import get_store
+    with run_scope("run-a") as run_id:
+        with agent_scope("econquant"):
+            _think(1)
+            result = _think(2)
+            assert result["history_length"] == 2
+        with agent_scope("caselaw"):
+            assert _think(1)["history_length"] == 1
+        assert len(get_store(run_id, "econquant").history) == 2
+    with run_scope("run-b"), agent_scope("econquant"):
+        assert _think(1)["history_length"] == 1
+    # Stores of finished runs are released; nothing leaked into the default store
+    assert len(get_store("run-a", "econquant").history) == 0
+    assert len(thought_history) == 0
+
+def test_response_is_a_bounded_window():
+    from unittest.mock import patch
+    with patch("config.SEQUENTIAL_THINKING_WINDOW", 3), \
+         patch("config.SEQUENTIAL_THINKING_SUMMARY_CHARS", 10), \
+         patch("config.SEQUENTIAL_THINKING_MAX_HISTORY", 4):
+        for n in range(1, 10):
+            result = _think(n, text=f"Thought number {n} with details")
+        assert result["history_length"] == 9
+        assert [t["thoughtNumber"] for t in result["thought_history"]] == [7, 8, 9]
+        assert result["thought_history"][0]["thought"] == "Thought nu..."
+        assert result["thought_history"][-1]["thought"] == "Thought number 9 with details"
+        assert len(thought_history) == 4
@@ -0,0 +1,68 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+
+from benchmarks.fake_servers import stand_ins
+from server import QueryService, create_server, parse_address
+
+
+def _request(url: str, payload=None):
+    data = json.dumps(payload).encode() if payload is not None else None
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=60) as response:
+        return response.status, response.read()
+
+
+def test_serve_queries_with_streamed_events(tmp_path):
+    """Queries run on warm agents (here against the provider stand-ins) and stream their progress."""
+    from agents import agents as registry
+
+    with stand_ins(), patch.dict(registry), patch("config.CHECKPOINT_PATH", str(tmp_path / "checkpoints.sqlite")):
+        registry.reset()  # agents warmed here point at the stand-ins; drop them afterwards
+        service = QueryService(str(tmp_path), workers=2)
+        warm = service.warm_agents()
+        assert "teamformation" in warm and "synthesis" in warm
+        httpd = create_server("127.0.0.1", 0, service)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{httpd.server_address[1]}"
+        try:
+            status, body = _request(f"{base}/queries", {"query": "Compute the HHI for shares 40/30/30"})
+            assert status == 202
+            job_id = json.loads(body)["id"]
+            _, stream = _request(f"{base}/queries/{job_id}/events")  # returns once the query has finished
+            events = [json.loads(line) for line in stream.splitlines()]
+            names = [e["event"] for e in events]
+            assert names[:2] == ["queued", "started"] and names[-1] == "done"
+            assert names.index("teamformation") < names.index("node_start") < names.index("report")
+            assert {"node_end", "llm_end"} <= set(names)
+
+            _, body = _request(f"{base}/queries/{job_id}")
+            result = json.loads(body)
+            assert result["status"] == "done" and result["totals"]["llm_calls"] >= 1
+            _, report = _request(f"{base}/queries/{job_id}/report")
+            assert report.startswith(b"# CompeteGrok Analysis Report")
+            assert (tmp_path / job_id).is_dir()
+
+            # The same agent selection reuses the compiled workflow
+            _, body = _request(f"{base}/queries", {"query": "And for 50/50?"})
+            _request(f"{base}/queries/{json.loads(body)['id']}/events")
+            assert len(service._workflows) == 1
+            assert json.loads(_request(f"{base}/health")[1])["queries"] == {"done": 2}
+
+            for payload in ({"query": " "}, {"query": "x", "files": ["/etc/passwd"]}):
+                try:
+                    _request(f"{base}/queries", payload)
+                    raise AssertionError("expected a 400")
+                except urllib.error.HTTPError as e:
+                    assert e.code == 400
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+            service.shutdown()
+
+
+def test_parse_address():
+    assert parse_address("0.0.0.0:9000") == ("0.0.0.0", 9000)
+    assert parse_address("9001")[1] == 9001
@@ -0,0 +1,75 @@
+import io
+from unittest.mock import patch
+
+from benchmarks.fake_servers import default_chat_responder, stand_ins
+from benchmarks.workflow import initial_state
+from streaming import StreamingReport, print_progress, stream_workflow
+
+SYNTHESIS = "The merger raises the HHI by 1800 points to 3400, well above the 2500 threshold. " * 5
+
+
+def _responder(request: dict) -> str:
+    system = str(request["messages"][0].get("content"))
+    return SYNTHESIS if "SynthesisAgent" in system else default_chat_responder(request)
+
+
+def test_stream_workflow_writes_report_incrementally(tmp_path):
+    """Agent outputs land in the report as nodes finish; synthesis tokens as the model streams them."""
+    from agents import agents as registry
+    from graph import create_workflow
+
+    scenario = {"agents": ["econquant", "synthesis"], "query": "HHI change for shares 40/30/30?"}
+    seen = []
+
+    class Draft(StreamingReport):
+        def token(self, node, text):
+            super().token(node, text)
+            seen.append(self.path.read_text(encoding="utf-8"))  # already on disk
+
+    with stand_ins(chat_responder=_responder), patch.dict(registry):
+        registry.reset()
+        workflow = create_workflow(scenario["agents"])
+        draft = Draft(tmp_path / "report.md", "# Report\n\n")
+        tokens = []
+        result = stream_workflow(workflow, initial_state(scenario), draft,
+                                 on_token=lambda node, text: tokens.append((node, text)))
+        expected = workflow.invoke(initial_state(scenario))
+
+    assert result["final_synthesis"] == expected["final_synthesis"] == SYNTHESIS
+    assert len(tokens) > 5 and {node for node, _ in tokens} == {"synthesis"}
+    assert "".join(text for _, text in tokens) == SYNTHESIS
+    assert "## econquant" in seen[0] and "## synthesis" in seen[0] and len(seen[-1]) > len(seen[0])
+    text = (tmp_path / "report.md").read_text(encoding="utf-8")
+    assert text.count(SYNTHESIS) == 1 and "**Status:** in progress" in text
+
+
+def test_streaming_report_finalize_and_fail(tmp_path):
+    done = StreamingReport(tmp_path / "done.md", "# Report\n\n")
+    done.node_output("econpaper", "Three papers.")
+    done.finalize("# Final report\n")
+    assert (tmp_path / "done.md").read_text(encoding="utf-8") == "# Final report\n"
+    assert not (tmp_path / "done.md.tmp").exists()
+
+    failed = StreamingReport(tmp_path / "failed.md", "# Report\n\n")
+    failed.node_output("econpaper", "Three papers.")
+    failed.token("synthesis", "The merger")
+    failed.fail("provider outage")
+    text = (tmp_path / "failed.md").read_text(encoding="utf-8")
+    assert "## econpaper\n\nThree papers." in text and "## synthesis\n\nThe merger" in text
+    assert text.endswith("## Error\n\nprovider outage\n")
+
+
+def test_print_progress():
+    out = io.StringIO()
+    for event in [{"event": "node_start", "t": 0.5, "node": "econpaper"},
+                  {"event": "tool_start", "t": 0.6, "agent": "econpaper", "tool": "tavily_search"},
+                  {"event": "tool_end", "t": 1.6, "tool": "tavily_search", "seconds": 1.0, "error": True},
+                  {"event": "llm_end", "t": 2.0, "agent": "econpaper"},  # not printed
+                  {"event": "node_end", "t": 2.5, "node": "econpaper", "seconds": 2.0, "ok": True}]:
+        print_progress(event, out)
+    assert out.getvalue().splitlines() == [
+        "[    0.5s] > econpaper started",
+        "[    0.6s]   econpaper -> tavily_search",
+        "[    1.6s]   tavily_search done in 1.0s (error)",
+        "[    2.5s] < econpaper finished in 2.0s",
+    ]
@@ -13,7 +13,8 @@ def test_tavily_extract_fallback_success():
         mock_head.return_value.status_code = 200
         
         # Mock TavilyClient to raise an exception
-        with patch("tools.tavily_extract.TavilyClient") as mock_tavily_client:
+        with patch("tools.providers._sdk_class") as sdk_class:  # the tavily SDK class
+            mock_tavily_client = sdk_class.return_value
             # The TavilyClient constructor is called, then .extract()
             mock_instance = mock_tavily_client.return_value
             mock_instance.extract.side_effect = Exception("Tavily API failure")
@@ -46,7 +47,8 @@ def test_tavily_extract_fallback_failure():
     with patch("requests.head") as mock_head:
         mock_head.return_value.status_code = 200
         
-        with patch("tools.tavily_extract.TavilyClient") as mock_tavily_client:
+        with patch("tools.providers._sdk_class") as sdk_class:  # the tavily SDK class
+            mock_tavily_client = sdk_class.return_value
             mock_instance = mock_tavily_client.return_value
             mock_instance.extract.side_effect = Exception("Tavily API failure")
             
@@ -0,0 +1,74 @@
+import json
+import pytest
+from unittest.mock import patch
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.tools import tool
+
+import telemetry
+from run_context import run_scope
+from telemetry import TelemetryCallback, get_metrics, timed_node
+
+
+@tool
+def _lookup(term: str) -> str:
+    """Test tool."""
+    if term == "fail":
+        raise ValueError("boom")
+    return term.upper()
+
+
+def test_agent_llm_calls_are_recorded_per_run():
+    """create_agent attaches the callback; LLM round trips land in the current run's metrics."""
+    from agents import create_agent
+    agent = create_agent("econquant", "grok-4-1-fast-reasoning", "You compute HHI.", [])
+    with run_scope("telemetry-agent") as run_id:
+        metrics = get_metrics(run_id)
+        agent.invoke({"messages": [HumanMessage(content="HHI for 40/30/30?")]})
+    data = metrics.to_dict()
+    assert data["llm"]["econquant"]["calls"] == 1
+    assert data["llm"]["econquant"]["models"] == {"grok-4-1-fast-reasoning": 1}
+    assert data["totals"]["wall_seconds"] >= data["totals"]["llm_seconds"]
+    assert metrics.llm["econquant"]["seconds"] > 0  # unrounded; a warm mock call takes well under 1 ms
+
+
+def test_tool_calls_and_errors_are_recorded():
+    callback = TelemetryCallback("caselaw")
+    with run_scope("telemetry-tools") as run_id:
+        metrics = get_metrics(run_id)
+        _lookup.invoke({"term": "amex"}, config={"callbacks": [callback]})
+        with pytest.raises(ValueError):
+            _lookup.invoke({"term": "fail"}, config={"callbacks": [callback]})
+    assert metrics.to_dict()["tools"]["_lookup"]["calls"] == 2
+    assert metrics.to_dict()["tools"]["_lookup"]["errors"] == 1
+
+
+def test_token_usage_and_cost():
+    message = AIMessage(content="ok", usage_metadata={"input_tokens": 1_000_000, "output_tokens": 2_000_000,
+                                                      "total_tokens": 3_000_000})
+    result = LLMResult(generations=[[ChatGeneration(message=message)]])
+    assert telemetry._token_usage(result) == (1_000_000, 2_000_000)
+    legacy = LLMResult(generations=[[]], llm_output={"token_usage": {"prompt_tokens": 7, "completion_tokens": 3}})
+    assert telemetry._token_usage(legacy) == (7, 3)
+    with patch("config.MODEL_PRICES", {"m": {"input": 1.0, "output": 2.0}}):
+        assert telemetry.estimate_cost("m", 1_000_000, 2_000_000) == 5.0
+        assert telemetry.estimate_cost("unknown", 10, 10) == 0.0
+
+
+def test_timed_node_and_metrics_file(tmp_path):
+    @timed_node("econpaper")
+    def node(state):
+        return {"last_error": "failed"} if state.get("fail") else {"messages": []}
+
+    with run_scope("telemetry-nodes") as run_id:
+        metrics = get_metrics(run_id)
+        node({})
+        node({"fail": True})
+        telemetry.record_cache_hit("ocr")
+        telemetry.record_retry("ocr_shard")
+    data = json.loads(metrics.write(tmp_path / "metrics.json").read_text())
+    assert [(n["node"], n["ok"]) for n in data["nodes"]] == [("econpaper", True), ("econpaper", False)]
+    assert data["cache_hits"] == {"ocr": 1} and data["retries"] == {"ocr_shard": 1}
+    assert data["totals"]["errors"] == 1
+    # The run is released when its scope ends; a new lookup starts fresh metrics
+    assert get_metrics(run_id) is not metrics
@@ -5,40 +5,31 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from unittest.mock import patch, MagicMock
 from tools.run_code_py import run_code_py
+from run_context import run_scope
 from tools.tavily_search import tavily_search
 
 def test_run_code_py_success():
-    """Test run_code_py with successful execution."""
+    """Test run_code_py with successful execution in a warm kernel."""
     code = "print(42)"
-    expected_result = "42\n"
 
-    with patch('subprocess.Popen') as mock_popen:
-        mock_proc = MagicMock()
-        mock_proc.returncode = 0
-        mock_proc.communicate.return_value = (b'{"result": "42\\n"}', b'')
-        mock_popen.return_value = mock_proc
-
-        result = run_code_py(code)
-        assert "42" in result
+    with run_scope():
+        result = run_code_py.invoke({"code": code})
+    assert "42" in result
 
 def test_run_code_py_error():
     """Test run_code_py with execution error."""
     code = "invalid code"
 
-    with patch('subprocess.Popen') as mock_popen:
-        mock_proc = MagicMock()
-        mock_proc.returncode = 1
-        mock_proc.communicate.return_value = (b'', b'SyntaxError: invalid syntax')
-        mock_popen.return_value = mock_proc
-
-        result = run_code_py(code)
-        assert "Return code 1" in result or "Mock" in result  # Mock fallback
+    with run_scope():
+        result = run_code_py.invoke({"code": code})
+    assert "SyntaxError" in result or "Mock" in result  # Mock fallback if no kernel can start
 
 def test_tavily_search_success():
     """Test tavily_search with successful API call."""
     query = "test query"
 
-    with patch('tools.tavily_search.TavilyClient') as mock_client:
+    with patch('tools.providers._sdk_class') as sdk_class:  # the tavily SDK class
+        mock_client = sdk_class.return_value
         mock_instance = MagicMock()
         mock_instance.search.return_value = {
             "results": [
@@ -47,7 +38,7 @@ def test_tavily_search_success():
         }
         mock_client.return_value = mock_instance
 
-        result = tavily_search(query)
+        result = tavily_search.invoke({"query": query})
         assert "content" in result
         assert "sources" in result
         assert len(result["sources"]) == 1
@@ -56,12 +47,13 @@ def test_tavily_search_api_error():
     """Test tavily_search with API error."""
     query = "test query"
 
-    with patch('tools.tavily_search.TavilyClient') as mock_client:
+    with patch('tools.providers._sdk_class') as sdk_class:  # the tavily SDK class
+        mock_client = sdk_class.return_value
         mock_instance = MagicMock()
         mock_instance.search.side_effect = Exception("API Error")
         mock_client.return_value = mock_instance
 
-        result = tavily_search(query)
+        result = tavily_search.invoke({"query": query})
         assert "Mock tavily_search" in result["content"]
         assert "TAVILY_API_KEY required" in result["content"]
 
@@ -70,10 +62,11 @@ def test_tavily_search_no_api_key():
     query = "test query"
 
     with patch('tools.tavily_search.TAVILY_API_KEY', None):
-        with patch('tools.tavily_search.TavilyClient') as mock_client:
+        with patch('tools.providers._sdk_class') as sdk_class:  # the tavily SDK class
+            mock_client = sdk_class.return_value
             mock_client.side_effect = Exception("No API key")
 
-            result = tavily_search(query)
+            result = tavily_search.invoke({"query": query})
             assert "Mock" in result["content"]
 
 def test_convert_pdf_file_success():
@@ -83,12 +76,13 @@ def test_convert_pdf_file_success():
         mock_convert.return_value = "Converted content"
         # Since it's a tool, we need to call it as a function
         from tools.convert_pdf_file import convert_pdf_file
-        result = convert_pdf_file(file_path)
+        result = convert_pdf_file.invoke({"file_path": file_path})
         # This will likely return the mock content or error
 
 def test_convert_pdf_file_error():
     """Test convert_pdf_file with error."""
     file_path = "nonexistent.pdf"
     from tools.convert_pdf_file import convert_pdf_file
-    result = convert_pdf_file(file_path)
-    assert "File not found" in result or "Invalid PDF" in result
\ No newline at end of file
+    result = convert_pdf_file.invoke({"file_path": file_path})
+    assert result["success"] is False
+    assert "File not found" in result["error"] or "Invalid PDF" in result["error"]
\ No newline at end of file
@@ -107,3 +107,124 @@ def test_workflow_integration_econpaper_verifier():
         
         # Check final synthesis
         assert result["final_synthesis"] == "Final synthesis based on verified paper."
+
+
+def test_workflow_parallel_fanout_runs_research_agents_concurrently():
+    """
+    Supervisor mode: test that econpaper and caselaw are dispatched in the same step and that their
+    sources are merged before a single verifier pass.
+    """
+    import threading
+
+    selected_agents = ["econpaper", "caselaw", "verifier", "synthesis"]
+    # Both research agents must be in flight at the same time to pass the barrier
+    barrier = threading.Barrier(2, timeout=10)
+
+    def research_response(payload):
+        def invoke(inputs):
+            barrier.wait()
+            return {"messages": list(inputs["messages"]) + [AIMessage(content=json.dumps(payload))]}
+        return invoke
+
+    with patch('config.PARALLEL_FANOUT', True), patch.dict('agents.agents', clear=False) as mock_agents:
+        mock_agents["econpaper"] = MagicMock()
+        mock_agents["caselaw"] = MagicMock()
+        mock_agents["verifier"] = MagicMock()
+        mock_agents["synthesis"] = MagicMock()
+
+        mock_agents["econpaper"].invoke.side_effect = research_response([
+            {"paper_id": 1, "title": "Test Paper", "authors": "Doe, J.", "outlet": "JPE",
+             "year": 2025, "url": "http://example.com/paper", "snippet": "Abstract..."}
+        ])
+        mock_agents["caselaw"].invoke.side_effect = research_response([
+            {"case_id": 1, "title": "Test Case", "court": "ECJ", "year": 2024,
+             "url": "http://example.com/case", "snippet": "Holding..."}
+        ])
+        mock_agents["verifier"].invoke.return_value = {
+            "messages": [AIMessage(content=json.dumps([{"paper_id": 1, "title": "Test Paper", "status": "verified"}]))]
+        }
+        mock_agents["synthesis"].invoke.return_value = {"messages": [AIMessage(content="Final synthesis.")]}
+
+        app = create_workflow(selected_agents, mode="supervisor")
+        result = app.invoke({
+            "messages": [
+                HumanMessage(content=f"Find papers and cases on X.\n\nSelected agents: {json.dumps(selected_agents)}\n\nForce debate: False")
+            ],
+            "iteration_count": 0,
+            "routing_history": [],
+            "sources": []
+        })
+
+        history = result["routing_history"]
+        assert "econpaper" in history and "caselaw" in history
+        # One verifier pass covers both research agents
+        assert mock_agents["verifier"].invoke.call_count == 1
+        assert history.index("verifier") > max(history.index("econpaper"), history.index("caselaw"))
+        assert {s["url"] for s in result["sources"]} == {"http://example.com/paper", "http://example.com/case"}
+        assert result["final_synthesis"] == "Final synthesis."
+
+
+def test_workflow_plan_mode_runs_levels_without_supervisor():
+    """
+    Plan mode: econpaper and caselaw share the first level and run concurrently,
+    then verifier, then synthesis, with no supervisor pass in between.
+    """
+    import threading
+
+    selected_agents = ["econpaper", "caselaw", "verifier", "synthesis"]
+    barrier = threading.Barrier(2, timeout=10)
+
+    def research(inputs):
+        barrier.wait()
+        return {"messages": list(inputs["messages"]) + [AIMessage(content="[]")]}
+
+    with patch.dict('agents.agents', clear=False) as mock_agents:
+        for name in selected_agents:
+            mock_agents[name] = MagicMock()
+        mock_agents["econpaper"].invoke.side_effect = research
+        mock_agents["caselaw"].invoke.side_effect = research
+        mock_agents["verifier"].invoke.return_value = {"messages": [AIMessage(content="[]")]}
+        mock_agents["synthesis"].invoke.return_value = {"messages": [AIMessage(content="Final synthesis.")]}
+
+        app = create_workflow(selected_agents, mode="plan")
+        result = app.invoke({
+            "messages": [HumanMessage(content="Find papers and cases on X.")],
+            "iteration_count": 0,
+            "routing_history": [],
+            "sources": []
+        })
+
+        history = result["routing_history"]
+        assert sorted(history[:2]) == ["caselaw", "econpaper"]
+        assert history[2:] == ["verifier", "synthesis"]
+        assert result["routes"] == ["econpaper", "caselaw", "verifier", "synthesis"]
+        assert result["final_synthesis"] == "Final synthesis."
+
+
+def test_workflow_plan_mode_falls_back_to_next_level_after_failure():
+    """
+    Plan mode: a failing agent goes through remediation; a fallback decision
+    moves on to the next level instead of stalling the plan.
+    """
+    selected_agents = ["econquant", "synthesis"]
+
+    with patch.dict('agents.agents', clear=False) as mock_agents:
+        for name in selected_agents + ["remediation"]:
+            mock_agents[name] = MagicMock()
+        mock_agents["econquant"].invoke.side_effect = RuntimeError("kernel died")
+        mock_agents["remediation"].invoke.return_value = {
+            "messages": [AIMessage(content=json.dumps({"action": "fallback", "reason": "tool failure"}))]
+        }
+        mock_agents["synthesis"].invoke.return_value = {"messages": [AIMessage(content="Final synthesis.")]}
+
+        app = create_workflow(selected_agents, mode="plan")
+        result = app.invoke({
+            "messages": [HumanMessage(content="Compute HHI.")],
+            "iteration_count": 0,
+            "routing_history": [],
+            "sources": []
+        })
+
+        assert mock_agents["remediation"].invoke.call_count == 1
+        assert result["routing_history"] == ["econquant", "synthesis"]
+        assert result["final_synthesis"] == "Final synthesis."
@@ -9,4 +9,6 @@ from .convert_pdf_url import convert_pdf_url
 from .convert_pdf_file import convert_pdf_file
 from .read_text_file import read_text_file
 from .read_multiple_files import read_multiple_files
-from .fetch_paper import fetch_paper_content
\ No newline at end of file
+from .fetch_paper import fetch_paper_content
+from .search_documents import search_documents
+from .read_chunk import read_chunk
\ No newline at end of file
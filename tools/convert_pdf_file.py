@@ -1,40 +1,37 @@
 from langchain_core.tools import tool
 import os
-import base64
+import asyncio
 import logging
-from dotenv import load_dotenv
-from mistralai import Mistral
-
-load_dotenv()
-api_key = os.getenv("MISTRAL_API_KEY")
-if not api_key:
-    raise ValueError("MISTRAL_API_KEY not found in .env")
-client = Mistral(api_key=api_key)
+from .pdf_io import check_local_pdf
+from .pdf_ocr import ocr_pdf_pages, aocr_pdf_pages, join_pages
 
 logger = logging.getLogger(__name__)
 
 @tool
-def convert_pdf_file(file_path: str) -> str:
-    """Convert a local PDF file to Markdown using Mistral OCR API directly."""
+def convert_pdf_file(file_path: str) -> dict:
+    """Convert a local PDF file to Markdown using Mistral OCR API directly (cached by content hash)."""
     try:
-        if not os.path.isfile(file_path):
-            return f"File not found or not a file: {file_path}"
-        with open(file_path, 'rb') as f:
-            pdf_bytes = f.read()
-        if not pdf_bytes.startswith(b'%PDF'):
-            return f"Invalid PDF file: {file_path}"
-        b64_pdf = base64.b64encode(pdf_bytes).decode('utf-8')
-        ocr_response = client.ocr.process(
-            model="mistral-ocr-latest",
-            document={
-                "type": "document_url",
-                "document_url": f"data:application/pdf;base64,{b64_pdf}"
-            },
-            table_format="markdown"
-        )
-        md_pages = [page.markdown for page in ocr_response.pages]
-        md_content = "\n\n---\n\n".join(md_pages)
-        return md_content
+        error = check_local_pdf(file_path)
+        if error:
+            return {"success": False, "error": error}
+        # Pass the path, not the bytes: the file is hashed and parsed in chunks
+        md_pages = ocr_pdf_pages(file_path, source=os.path.abspath(file_path))
+        md_content = join_pages(md_pages)
+        return {"success": True, "content": md_content}
     except Exception as e:
         logger.error(f"OCR error in convert_pdf_file: {e}")  # Log file or API errors for debugging
-        return f"OCR error for {file_path}: {str(e)}"
\ No newline at end of file
+        return {"success": False, "error": f"OCR error for {file_path}: {str(e)}"}
+
+async def aconvert_pdf_file(file_path: str) -> dict:
+    """Async variant of convert_pdf_file using the pooled async Mistral client."""
+    try:
+        error = await asyncio.to_thread(check_local_pdf, file_path)
+        if error:
+            return {"success": False, "error": error}
+        md_pages = await aocr_pdf_pages(file_path, source=os.path.abspath(file_path))
+        return {"success": True, "content": join_pages(md_pages)}
+    except Exception as e:
+        logger.error(f"OCR error in aconvert_pdf_file: {e}")
+        return {"success": False, "error": f"OCR error for {file_path}: {str(e)}"}
+
+convert_pdf_file.coroutine = aconvert_pdf_file
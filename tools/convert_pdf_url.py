@@ -1,69 +1,75 @@
 from langchain_core.tools import tool
 import os
-import base64
-import requests
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
+import asyncio
 import logging
 import re
-from dotenv import load_dotenv
-from mistralai import Mistral
-
-load_dotenv()
-api_key = os.getenv("MISTRAL_API_KEY")
-if not api_key:
-    raise ValueError("MISTRAL_API_KEY not found in .env")
-client = Mistral(api_key=api_key)
+from config import PROVIDER_TIMEOUT, PDF_CHUNK_SIZE
+from .pdf_io import spool_pdf, aspool_pdf
+from .pdf_ocr import ocr_pdf_pages, aocr_pdf_pages, cached_pages_for_url, join_pages
+from .providers import get_http_session, get_async_http_client
 
 logger = logging.getLogger(__name__)
 
+def _forbidden_result(url: str) -> dict:
+    # Extract basic metadata
+    title_match = re.search(r'/([^/]+\.pdf)$', url)
+    title = title_match.group(1) if title_match else "Unknown"
+    return {
+        "success": False,
+        "error": "403 Forbidden",
+        "details": {
+            "url": url,
+            "title": title,
+            "reason": "Access denied by server"
+        }
+    }
+
 @tool
 def convert_pdf_url(url: str) -> dict:
-    """Convert a PDF from a URL to Markdown using Mistral OCR API directly."""
+    """Convert a PDF from a URL to Markdown using Mistral OCR API directly (cached by content hash)."""
     try:
-        # Set up session with retries
-        session = requests.Session()
-        retry = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-        adapter = HTTPAdapter(max_retries=retry)
-        session.mount('http://', adapter)
-        session.mount('https://', adapter)
-
-        # Download PDF
-        response = session.get(url)
-        if response.status_code == 403:
-            # Extract basic metadata
-            title_match = re.search(r'/([^/]+\.pdf)$', url)
-            title = title_match.group(1) if title_match else "Unknown"
-            return {
-                "success": False,
-                "error": "403 Forbidden",
-                "details": {
-                    "url": url,
-                    "title": title,
-                    "reason": "Access denied by server"
-                }
-            }
-        response.raise_for_status()
-        pdf_content = response.content
-
-        # Encode to base64
-        base64_encoded = base64.b64encode(pdf_content).decode('utf-8')
+        # Skip the download entirely if this URL's PDF is already in the OCR cache
+        cached = cached_pages_for_url(url)
+        if cached is not None:
+            return {"success": True, "content": join_pages(cached)}
 
-        # Create data URI
-        data_uri = f"data:application/pdf;base64,{base64_encoded}"
+        # Stream the PDF to a temp file over the shared session (keep-alive pool with retries),
+        # hashing it on the way and rejecting non-PDF or oversized responses early
+        with get_http_session().get(url, timeout=PROVIDER_TIMEOUT, stream=True) as response:
+            if response.status_code == 403:
+                return _forbidden_result(url)
+            response.raise_for_status()
+            pdf_path, digest = spool_pdf(url, response.headers, response.iter_content(PDF_CHUNK_SIZE))
 
-        # Call OCR
-        ocr_response = client.ocr.process(
-            model="mistral-ocr-latest",
-            document={
-                "type": "document_url",
-                "document_url": data_uri
-            },
-            table_format="markdown"
-        )
-        md_pages = [page.markdown for page in ocr_response.pages]
-        md_content = "\n\n---\n\n".join(md_pages)
+        # Call OCR (or reuse the cached result for identical bytes)
+        try:
+            md_pages = ocr_pdf_pages(pdf_path, url=url, digest=digest)
+        finally:
+            os.unlink(pdf_path)
+        md_content = join_pages(md_pages)
         return {"success": True, "content": md_content}
     except Exception as e:
         logger.error(f"OCR error in convert_pdf_url: {e}")
-        raise ValueError(f"OCR error for {url}: {str(e)}")
\ No newline at end of file
+        raise ValueError(f"OCR error for {url}: {str(e)}")
+
+async def aconvert_pdf_url(url: str) -> dict:
+    """Async variant of convert_pdf_url using pooled async HTTP and Mistral clients."""
+    try:
+        cached = await asyncio.to_thread(cached_pages_for_url, url)
+        if cached is not None:
+            return {"success": True, "content": join_pages(cached)}
+        async with get_async_http_client().stream("GET", url) as response:
+            if response.status_code == 403:
+                return _forbidden_result(url)
+            response.raise_for_status()
+            pdf_path, digest = await aspool_pdf(url, response.headers, response.aiter_bytes(PDF_CHUNK_SIZE))
+        try:
+            md_pages = await aocr_pdf_pages(pdf_path, url=url, digest=digest)
+        finally:
+            os.unlink(pdf_path)
+        return {"success": True, "content": join_pages(md_pages)}
+    except Exception as e:
+        logger.error(f"OCR error in aconvert_pdf_url: {e}")
+        raise ValueError(f"OCR error for {url}: {str(e)}")
+
+convert_pdf_url.coroutine = aconvert_pdf_url
@@ -0,0 +1,247 @@
+"""Chunked, BM25-indexed store for uploaded documents.
+
+Uploads are not put into the agents' context as whole Markdown strings.
+run_query ingests each converted upload: the Markdown is split into chunks by
+page (the OCR page separator) and Markdown section, and at most
+DOCUMENT_CHUNK_CHARS characters long. The workflow state keeps only a short
+descriptor per document (doc_id, title, pages, chunks, section outline).
+Agents pull the passages they need with the search_documents and read_chunk
+tools.
+
+Chunked documents are content-addressed (doc_id is derived from the SHA-256
+of the Markdown) and saved as JSON under DOCUMENT_STORE_DIR. A repeated
+upload is not chunked again, and a resumed run finds its documents on disk.
+A run may only search the documents attached to it (attach); the attachment
+and the in-memory indexes are released when the run ends.
+
+Layout under the store root:
+    <doc_id>.json   {"doc_id", "title", "source", "created", "pages", "chunks": [...]}
+
+A chunk is {"chunk_id", "page", "section", "text"}.
+"""
+
+import hashlib
+import heapq
+import json
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+import config
+from run_context import get_run_id, on_run_end
+from .ocr_cache import _atomic_write
+from .pdf_ocr import PAGE_SEPARATOR
+
+logger = logging.getLogger(__name__)
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+OUTLINE_SECTIONS = 12  # section headings listed in a document's descriptor
+
+_HEADING = re.compile(r"^#{1,6}\s+(.+?)\s*#*\s*$")
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def chunk_markdown(markdown: str, max_chars: Optional[int] = None) -> list[dict]:
+    """Split OCR Markdown into chunks that never span a page or a section.
+
+    A heading starts a new chunk and names the section of the chunks that
+    follow it, across pages, until the next heading. Paragraphs are packed into
+    chunks of at most max_chars (default: DOCUMENT_CHUNK_CHARS); a longer
+    paragraph is cut.
+    """
+    max_chars = max_chars or config.DOCUMENT_CHUNK_CHARS
+    chunks: list[dict] = []
+    section = ""
+
+    def flush(page: int, parts: list[str]) -> None:
+        text = "\n\n".join(parts).strip()
+        if text:
+            chunks.append({"chunk_id": len(chunks), "page": page, "section": section, "text": text})
+        parts.clear()
+
+    for page, page_text in enumerate(markdown.split(PAGE_SEPARATOR), 1):
+        parts: list[str] = []
+        size = 0
+        for paragraph in re.split(r"\n\s*\n", page_text):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            heading = _HEADING.match(paragraph.splitlines()[0])
+            if heading:
+                flush(page, parts)
+                section, size = heading.group(1), 0
+            elif size + len(paragraph) > max_chars:
+                flush(page, parts)
+                size = 0
+            while len(paragraph) > max_chars:
+                parts.append(paragraph[:max_chars])
+                flush(page, parts)
+                paragraph = paragraph[max_chars:]
+            parts.append(paragraph)
+            size += len(paragraph) + 2
+        flush(page, parts)
+    return chunks
+
+
+class Document:
+    """One ingested upload and its chunks."""
+
+    def __init__(self, doc_id: str, title: str, source: str, pages: int, chunks: list[dict]):
+        self.doc_id = doc_id
+        self.title = title
+        self.source = source
+        self.pages = pages
+        self.chunks = chunks
+
+    def descriptor(self) -> dict:
+        """Short summary kept in the workflow state instead of the text."""
+        outline = []
+        for chunk in self.chunks:
+            if chunk["section"] and (not outline or outline[-1] != chunk["section"]):
+                outline.append(chunk["section"])
+        return {"doc_id": self.doc_id, "title": self.title, "source": self.source, "pages": self.pages,
+                "chunks": len(self.chunks), "chars": sum(len(c["text"]) for c in self.chunks),
+                "sections": outline[:OUTLINE_SECTIONS]}
+
+    def to_dict(self) -> dict:
+        return {"doc_id": self.doc_id, "title": self.title, "source": self.source, "created": time.time(),
+                "pages": self.pages, "chunks": self.chunks}
+
+
+class BM25Index:
+    """Okapi BM25 over the chunks of a set of documents (an inverted index of term frequencies)."""
+
+    def __init__(self, documents: list[Document]):
+        self.entries = [(doc, chunk) for doc in documents for chunk in doc.chunks]
+        self.postings: dict[str, list[tuple[int, int]]] = {}
+        self.lengths = []
+        for i, (_, chunk) in enumerate(self.entries):
+            terms = tokenize(f"{chunk['section']} {chunk['text']}")
+            self.lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                self.postings.setdefault(term, []).append((i, tf))
+        self.avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+
+    def search(self, query: str, k: int, doc_id: Optional[str] = None) -> list[tuple[float, Document, dict]]:
+        """The k best-scoring (score, document, chunk) for query, best first."""
+        n = len(self.entries)
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for i, tf in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[i] / self.avg_length)
+                scores[i] = scores.get(i, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        if doc_id:
+            scores = {i: s for i, s in scores.items() if self.entries[i][0].doc_id == doc_id}
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(score, *self.entries[i]) for i, score in best]
+
+
+class DocumentStore:
+    """Chunked documents on disk, the documents attached to each run and their indexes."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self._documents: dict[str, Document] = {}
+        self._runs: dict[str, list[str]] = {}
+        self._indexes: dict[tuple, BM25Index] = {}
+        self._lock = threading.Lock()
+
+    def ingest(self, markdown: str, title: str, source: str = "") -> dict:
+        """Chunk markdown (unless already stored) and return its descriptor."""
+        doc_id = hashlib.sha256(markdown.encode("utf-8")).hexdigest()[:16]
+        document = self.get(doc_id)
+        if document is None:
+            chunks = chunk_markdown(markdown)
+            document = Document(doc_id, title, source, markdown.count(PAGE_SEPARATOR) + 1, chunks)
+            self.root.mkdir(parents=True, exist_ok=True)
+            _atomic_write(self.root / f"{doc_id}.json", json.dumps(document.to_dict()))
+            with self._lock:
+                self._documents[doc_id] = document
+            logger.info("Ingested %s as %s: %d pages, %d chunks", title, doc_id, document.pages, len(chunks))
+        return document.descriptor()
+
+    def get(self, doc_id: str) -> Optional[Document]:
+        with self._lock:
+            document = self._documents.get(doc_id)
+        if document is not None:
+            return document
+        path = self.root / f"{doc_id}.json"
+        if not re.fullmatch(r"[0-9a-f]+", doc_id) or not path.is_file():
+            return None
+        data = json.loads(path.read_text(encoding="utf-8"))
+        document = Document(data["doc_id"], data["title"], data.get("source", ""), data["pages"], data["chunks"])
+        with self._lock:
+            self._documents[doc_id] = document
+        return document
+
+    def attach(self, run_id: str, doc_ids: list[str]) -> None:
+        """Make doc_ids searchable by run_id (replacing any earlier attachment)."""
+        with self._lock:
+            self._runs[run_id] = list(dict.fromkeys(doc_ids))
+
+    def documents(self, run_id: Optional[str] = None) -> list[Document]:
+        """Documents attached to run_id (default: the current run)."""
+        with self._lock:
+            doc_ids = list(self._runs.get(run_id or get_run_id(), []))
+        return [doc for doc in (self.get(doc_id) for doc_id in doc_ids) if doc is not None]
+
+    def index(self, run_id: Optional[str] = None) -> BM25Index:
+        documents = self.documents(run_id)
+        key = tuple(doc.doc_id for doc in documents)
+        with self._lock:
+            index = self._indexes.get(key)
+        if index is None:
+            index = BM25Index(documents)  # built outside the lock; a concurrent build is harmless
+            with self._lock:
+                index = self._indexes.setdefault(key, index)
+        return index
+
+    def release_run(self, run_id: str) -> None:
+        """Detach run_id's documents; forget documents and indexes no other run uses."""
+        with self._lock:
+            if self._runs.pop(run_id, None) is None:
+                return
+            in_use = {doc_id for doc_ids in self._runs.values() for doc_id in doc_ids}
+            for doc_id in [d for d in self._documents if d not in in_use]:
+                del self._documents[doc_id]
+            for key in [key for key in self._indexes if not in_use.issuperset(key)]:
+                del self._indexes[key]
+
+
+_store: Optional[DocumentStore] = None
+_store_lock = threading.Lock()
+
+
+def get_document_store() -> DocumentStore:
+    """Process-wide store under DOCUMENT_STORE_DIR."""
+    global _store
+    with _store_lock:
+        if _store is None or _store.root != Path(config.DOCUMENT_STORE_DIR):
+            _store = DocumentStore(config.DOCUMENT_STORE_DIR)
+    return _store
+
+
+on_run_end(lambda run_id: get_document_store().release_run(run_id))
+
+
+def describe_documents(descriptors: list[dict]) -> str:
+    """Note for the query message listing the uploads and how to read them."""
+    lines = ["Uploaded documents (find passages with search_documents, then read them with read_chunk):"]
+    for doc in descriptors:
+        sections = f"; sections: {'; '.join(doc['sections'])}" if doc.get("sections") else ""
+        lines.append(f"- doc_id {doc['doc_id']}: {doc['title']}, {doc['pages']} pages, {doc['chunks']} chunks{sections}")
+    return "\n".join(lines)
@@ -1,14 +1,20 @@
 from langchain_core.tools import tool
-from .convert_pdf_url import convert_pdf_url
-from .tavily_search import tavily_search
-from .tavily_extract import tavily_extract
-from .linkup_fetch import linkup_fetch
+from .convert_pdf_url import convert_pdf_url as _convert_pdf_url
+from .tavily_search import tavily_search as _tavily_search
+from .tavily_extract import tavily_extract as _tavily_extract
+from .linkup_fetch import linkup_fetch as _linkup_fetch
 import logging
 import time
 import re
 
 logger = logging.getLogger(__name__)
 
+# The helpers below are called as plain functions; a StructuredTool is not callable
+convert_pdf_url = _convert_pdf_url.func
+tavily_search = _tavily_search.func
+tavily_extract = _tavily_extract.func
+linkup_fetch = _linkup_fetch.func
+
 @tool
 def fetch_paper_content(url: str, title: str = "", authors: str = "") -> dict:
     """
@@ -0,0 +1,140 @@
+"""In-process, sandboxed text file reading for read_text_file / read_multiple_files.
+
+Replaces the per-call `npx @modelcontextprotocol/server-filesystem` process.
+Paths are resolved (symlinks included) and must fall under one of
+FILESYSTEM_ROOTS. Files above FILE_MMAP_THRESHOLD are read through mmap, reads are
+capped at FILE_READ_MAX_BYTES per file and FILE_READ_MAX_TOTAL_BYTES per call,
+and the encoding is detected from the BOM, then strict UTF-8, then
+charset-normalizer.
+"""
+
+import codecs
+import logging
+import mmap
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import config
+
+try:
+    from charset_normalizer import from_bytes as _detect_charset
+except ImportError:  # optional: falls back to latin-1 for non-UTF-8 text
+    _detect_charset = None
+
+logger = logging.getLogger(__name__)
+
+_BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+_SAMPLE_BYTES = 64 * 1024
+
+
+def allowed_roots() -> list[Path]:
+    return [Path(root).expanduser().resolve() for root in config.FILESYSTEM_ROOTS]
+
+
+def resolve_path(path: str) -> Path:
+    """Resolve path inside the sandbox.
+
+    Relative paths are taken from the first allowed root. Raises PermissionError if
+    the resolved target (after following symlinks) lies outside every root, and
+    FileNotFoundError if it does not exist.
+    """
+    roots = allowed_roots()
+    candidate = Path(path).expanduser()
+    if not candidate.is_absolute():
+        candidate = roots[0] / candidate
+    resolved = candidate.resolve(strict=True)
+    if not any(resolved == root or resolved.is_relative_to(root) for root in roots):
+        raise PermissionError(f"Access denied - path outside allowed directories: {path}")
+    if not resolved.is_file():
+        raise IsADirectoryError(f"Not a regular file: {path}")
+    return resolved
+
+
+def _read_bytes(path: Path, limit: int) -> bytes:
+    """First limit bytes of path; large files go through mmap instead of buffered reads."""
+    size = path.stat().st_size
+    with open(path, "rb") as f:
+        if size >= config.FILE_MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm[:limit]
+        return f.read(limit)
+
+
+def _decode(data: bytes, truncated: bool) -> tuple[str, str]:
+    """Decode data, returning (text, encoding)."""
+    for bom, encoding in _BOMS:
+        if data.startswith(bom):
+            return data.decode(encoding, errors="replace"), encoding
+    try:
+        return data.decode("utf-8"), "utf-8"
+    except UnicodeDecodeError as e:
+        # A cap can cut a multi-byte character in half; that is not a reason to re-detect
+        if truncated and e.start >= len(data) - 3 and e.reason == "unexpected end of data":
+            return data[:e.start].decode("utf-8"), "utf-8"
+    if _detect_charset is not None:
+        best = _detect_charset(data[:_SAMPLE_BYTES]).best()
+        if best is not None:
+            return data.decode(best.encoding, errors="replace"), best.encoding
+    return data.decode("latin-1"), "latin-1"
+
+
+def read_text(path: str, limit: Optional[int] = None) -> dict:
+    """Read a text file from the sandbox.
+
+    Args:
+        path: File path (absolute, or relative to the first allowed root).
+        limit: Maximum bytes to read; defaults to FILE_READ_MAX_BYTES.
+
+    Returns:
+        dict: {"path", "content", "encoding", "size", "truncated"}.
+
+    Raises:
+        PermissionError, FileNotFoundError, IsADirectoryError: For paths that cannot be read.
+        ValueError: If the file looks binary.
+    """
+    resolved = resolve_path(path)
+    limit = config.FILE_READ_MAX_BYTES if limit is None else limit
+    size = resolved.stat().st_size
+    data = _read_bytes(resolved, limit)
+    if b"\x00" in data[:8192] and not data.startswith(tuple(bom for bom, _ in _BOMS)):
+        raise ValueError(f"Binary file, not text: {path}")
+    truncated = size > len(data)
+    content, encoding = _decode(data, truncated)
+    return {"path": str(resolved), "content": content, "encoding": encoding, "size": size, "truncated": truncated}
+
+
+def _budgets(paths: list[str]) -> list[int]:
+    """Per-file byte limits: files are given their size (up to the per-file cap) in order
+    until FILE_READ_MAX_TOTAL_BYTES is used up."""
+    remaining = config.FILE_READ_MAX_TOTAL_BYTES
+    budgets = []
+    for path in paths:
+        try:
+            size = resolve_path(path).stat().st_size
+        except OSError:
+            size = 0  # the read itself reports the error
+        budget = min(size, config.FILE_READ_MAX_BYTES, remaining)
+        budgets.append(budget)
+        remaining -= budget
+    return budgets
+
+
+def read_many(paths: list[str]) -> list[dict]:
+    """Read several files concurrently, preserving order; failures are reported per file."""
+    def read_one(args):
+        path, budget = args
+        try:
+            return read_text(path, budget)
+        except Exception as e:
+            return {"path": path, "error": str(e)}
+
+    budgets = _budgets(paths)
+    with ThreadPoolExecutor(max_workers=max(1, min(config.FILE_READ_WORKERS, len(paths)))) as pool:
+        return list(pool.map(read_one, zip(paths, budgets)))
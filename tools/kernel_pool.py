@@ -0,0 +1,350 @@
+"""Pool of warm, per-run code kernels for run_code_py (and other NDJSON workers).
+
+Each run (see run_context.py) gets its own long-lived worker process, so
+variables, loaded data and imports survive between tool calls within a query.
+A spare kernel is kept pre-started, so the first call of a new run does not pay
+interpreter and library start-up. Kernels are shut down when their run ends, and
+killed (and transparently replaced on the next call) when a call exceeds the
+wall-clock limit.
+
+Workers speak newline-delimited JSON on stdin/stdout: one request line per call,
+then any number of {"type": "stdout"|"stderr", "data": ...} lines followed by
+{"type": "result", "ok": bool, "error": str|null}. The first line a worker
+writes is {"type": "ready"}.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import signal
+import subprocess
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import config
+from exceptions import ToolError
+from run_context import get_run_id, on_run_end
+
+logger = logging.getLogger(__name__)
+
+OutputCallback = Callable[[str, str], None]  # (kind, text)
+
+
+class KernelTimeout(ToolError):
+    """A call exceeded its wall-clock limit; the kernel was killed and its state lost."""
+
+
+class KernelDied(ToolError):
+    """The worker process exited (crash, memory limit, CPU hard limit)."""
+
+
+class Kernel:
+    """One worker process plus a reader thread feeding its protocol messages into a queue."""
+
+    def __init__(self, name: str, argv: list[str], env: dict, startup_timeout: float,
+                 memory_mb: Optional[int] = None):
+        self.name = name
+        self.proc = subprocess.Popen(
+            argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=env,
+            text=True,
+            encoding='utf-8',
+            bufsize=1,
+            start_new_session=(os.name == "posix"),  # lets kill() take down child processes too
+        )
+        if memory_mb:
+            self._limit_memory(memory_mb)
+        self._messages: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self._stderr_tail: deque = deque(maxlen=50)
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self.calls = 0
+        threading.Thread(target=self._read_stdout, daemon=True, name=f"{name}-stdout").start()
+        threading.Thread(target=self._read_stderr, daemon=True, name=f"{name}-stderr").start()
+        ready = self._next_message(time.monotonic() + startup_timeout)
+        if ready is None or ready.get("type") != "ready":
+            self.kill()
+            raise KernelDied(f"{name} kernel failed to start: {self.stderr_tail() or ready}")
+        logger.debug(f"Started {name} kernel pid={self.proc.pid}")
+
+    def _limit_memory(self, memory_mb: int):
+        """Cap the worker's address space from the parent (Linux prlimit; no preexec_fn needed)."""
+        if resource is None or not hasattr(resource, "prlimit"):
+            return
+        limit = memory_mb * 1024 * 1024
+        try:
+            resource.prlimit(self.proc.pid, resource.RLIMIT_AS, (limit, limit))
+        except (OSError, ValueError) as e:
+            logger.debug(f"Could not set memory limit on {self.name} kernel: {e}")
+
+    def _read_stdout(self):
+        for line in self.proc.stdout:
+            try:
+                self._messages.put(json.loads(line))
+            except json.JSONDecodeError:
+                self._messages.put({"type": "stdout", "data": line})
+        self._messages.put(None)
+
+    def _read_stderr(self):
+        for line in self.proc.stderr:
+            self._stderr_tail.append(line)
+
+    def stderr_tail(self) -> str:
+        return "".join(self._stderr_tail).strip()
+
+    def _next_message(self, deadline: float) -> Optional[dict]:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise queue.Empty
+        return self._messages.get(timeout=remaining)
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def execute(self, code: str, timeout: float, cpu_seconds: Optional[float] = None,
+                on_output: Optional[OutputCallback] = None, max_output_chars: Optional[int] = None) -> dict:
+        """Run code in the kernel, streaming output to on_output as it arrives.
+
+        Returns:
+            dict: {"ok", "output", "error", "truncated"}.
+
+        Raises:
+            KernelTimeout: The wall-clock limit was hit; the kernel has been killed.
+            KernelDied: The worker exited mid-call.
+        """
+        with self._lock:
+            self._next_id += 1
+            request_id = self._next_id
+            self.calls += 1
+            try:
+                self.proc.stdin.write(json.dumps({"id": request_id, "code": code, "cpu_seconds": cpu_seconds}) + "\n")
+                self.proc.stdin.flush()
+            except (BrokenPipeError, OSError) as e:
+                raise KernelDied(f"{self.name} kernel is not accepting input: {e}") from e
+
+            chunks: list[str] = []
+            size = 0
+            truncated = False
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    message = self._next_message(deadline)
+                except queue.Empty:
+                    self.kill()
+                    raise KernelTimeout(f"{self.name} execution exceeded {timeout:.0f}s; kernel restarted, "
+                                        f"variables from earlier calls are lost")
+                if message is None:
+                    self.proc.wait(timeout=5)
+                    raise KernelDied(f"{self.name} kernel exited with code {self.proc.returncode}: "
+                                     f"{self.stderr_tail()[-1000:]}")
+                if message.get("id") not in (request_id, None):
+                    continue  # late output from a request that already timed out
+                kind = message.get("type")
+                if kind in ("stdout", "stderr"):
+                    data = message.get("data", "")
+                    if on_output:
+                        on_output(kind, data)
+                    if max_output_chars is None or size < max_output_chars:
+                        chunks.append(data)
+                        size += len(data)
+                    else:
+                        truncated = True
+                elif kind == "result":
+                    output = "".join(chunks)
+                    if max_output_chars is not None and len(output) > max_output_chars:
+                        output, truncated = output[:max_output_chars], True
+                    return {"ok": bool(message.get("ok")), "output": output,
+                            "error": message.get("error"), "truncated": truncated}
+
+    def kill(self):
+        if self.proc.poll() is not None:
+            return
+        try:
+            if os.name == "posix":
+                os.killpg(self.proc.pid, signal.SIGKILL)
+            else:
+                self.proc.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+        self.proc.wait()
+
+    def close(self, grace: float = 2.0):
+        """Ask the worker to exit, killing it if it does not within grace seconds."""
+        if self.proc.poll() is None:
+            try:
+                self.proc.stdin.write(json.dumps({"op": "shutdown"}) + "\n")
+                self.proc.stdin.flush()
+                self.proc.wait(timeout=grace)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        self.kill()
+        for stream in (self.proc.stdin, self.proc.stdout, self.proc.stderr):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+
+class KernelPool:
+    """Per-run kernels for one language, plus a pre-started spare."""
+
+    def __init__(self, name: str, argv: list[str], env: Optional[dict] = None,
+                 max_kernels: int = 4, warm_spare: bool = True, startup_timeout: float = 60,
+                 memory_mb: Optional[int] = None):
+        self.name = name
+        self.argv = argv
+        self.env = {**os.environ, **(env or {})}
+        self.memory_mb = memory_mb
+        self.max_kernels = max_kernels
+        self.warm_spare = warm_spare
+        self.startup_timeout = startup_timeout
+        self._kernels: "OrderedDict[str, Kernel]" = OrderedDict()  # run_id -> kernel, least recently used first
+        self._spare: Optional[Kernel] = None
+        self._spawning = False
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _spawn(self) -> Kernel:
+        return Kernel(self.name, self.argv, self.env, self.startup_timeout, self.memory_mb)
+
+    def _spawn_spare(self):
+        try:
+            kernel = self._spawn()
+        except Exception as e:
+            logger.debug(f"Could not pre-start {self.name} kernel: {e}")
+            kernel = None
+        with self._lock:
+            self._spawning = False
+            if kernel is not None and (self._closed or self._spare is not None):
+                kernel.close()
+            elif kernel is not None:
+                self._spare = kernel
+
+    def _refill_spare(self):
+        """Start a spare kernel in the background (caller holds the lock)."""
+        if self.warm_spare and not self._closed and self._spare is None and not self._spawning:
+            self._spawning = True
+            threading.Thread(target=self._spawn_spare, daemon=True, name=f"{self.name}-spare").start()
+
+    def kernel_for(self, run_id: str) -> Kernel:
+        """The run's kernel, starting (or adopting the spare) if it has none or it died."""
+        evicted = []
+        with self._lock:
+            kernel = self._kernels.get(run_id)
+            if kernel is not None and kernel.alive():
+                self._kernels.move_to_end(run_id)
+                return kernel
+            self._kernels.pop(run_id, None)
+            kernel, self._spare = self._spare, None
+            while len(self._kernels) >= self.max_kernels:
+                evicted.append(self._kernels.popitem(last=False))
+        for old_run, old in evicted:
+            logger.info(f"Recycling {self.name} kernel of run {old_run} (pool limit {self.max_kernels})")
+            old.close()
+        if kernel is None or not kernel.alive():
+            kernel = self._spawn()
+        with self._lock:
+            self._kernels[run_id] = kernel
+            self._refill_spare()
+        return kernel
+
+    def execute(self, code: str, run_id: Optional[str] = None, **kwargs) -> dict:
+        """Execute code in the kernel of run_id (default: the current run). See Kernel.execute."""
+        run_id = run_id or get_run_id()
+        kernel = self.kernel_for(run_id)
+        try:
+            return kernel.execute(code, **kwargs)
+        except (KernelTimeout, KernelDied):
+            self.release(run_id)
+            raise
+
+    def release(self, run_id: str) -> None:
+        """Shut down run_id's kernel (its variables are discarded)."""
+        with self._lock:
+            kernel = self._kernels.pop(run_id, None)
+        if kernel is not None:
+            logger.debug(f"Releasing {self.name} kernel of run {run_id} after {kernel.calls} calls")
+            kernel.close()
+
+    def runs(self) -> list[str]:
+        with self._lock:
+            return list(self._kernels)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            kernels = list(self._kernels.values())
+            self._kernels.clear()
+            if self._spare is not None:
+                kernels.append(self._spare)
+                self._spare = None
+        for kernel in kernels:
+            kernel.close(grace=0.5)
+
+
+def stream_writer():
+    """LangGraph custom-stream writer when called inside a graph run, else None."""
+    try:
+        from langgraph.config import get_stream_writer
+        return get_stream_writer()
+    except Exception:
+        return None
+
+
+def output_callback(tool_name: str) -> OutputCallback:
+    """on_output callback that logs kernel output and forwards it to the graph's custom stream."""
+    writer = stream_writer()
+
+    def on_output(kind: str, data: str):
+        logger.debug(f"{tool_name} {kind}: {data.rstrip()}")
+        if writer is not None:
+            writer({"event": "tool_output", "tool": tool_name, "stream": kind, "data": data})
+    return on_output
+
+
+def format_result(result: dict) -> str:
+    """Render an execute() result as the text returned to the agent."""
+    text = result["output"]
+    if result["truncated"]:
+        text += f"\n[output truncated to {config.RUN_CODE_MAX_OUTPUT_CHARS} characters]"
+    if result["error"]:
+        text += ("\n" if text and not text.endswith("\n") else "") + f"Error:\n{result['error']}"
+    return text or "(no output)"
+
+
+_pools: dict = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name: str, factory: Callable[[], KernelPool]) -> KernelPool:
+    """Process-wide pool by name; per-run kernels are released automatically when a run ends."""
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = factory()
+            _pools[name] = pool
+            on_run_end(pool.release)
+    return pool
+
+
+def shutdown_all() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
+
+
+atexit.register(shutdown_all)
@@ -1,23 +1,45 @@
 from langchain_core.tools import tool
-from linkup import LinkupClient
 import os
 import logging
 from config import *
+from .providers import get_linkup_client
 
 logger = logging.getLogger(__name__)
 
+def _format_response(url: str, response) -> dict:
+    # Updated to use SDK v0.9.0; fetch returns content string or object with .content
+    # (LinkupFetchResponse in current SDKs carries it as .markdown)
+    if isinstance(response, str):
+        content = response
+    else:
+        content = getattr(response, 'markdown', None) or getattr(response, 'content', str(response))
+    sources = [{"url": url, "title": "Fetched Content", "snippet": content[:200]}]
+    return {"content": content, "sources": sources}
+
+def _mock_result(url: str, e: Exception) -> dict:
+    mock_content = f"Mock linkup_fetch('{url}'): Fetched: Detailed case summary from courtlistener.com... Note: LINKUP_API_KEY required. Error: {str(e)[:300]}"
+    mock_sources = [{"url": url, "title": "Mock Fetched Title", "snippet": "Mock snippet from fetch"}]
+    return {"content": mock_content, "sources": mock_sources}
+
 @tool
 def linkup_fetch(url: str) -> dict:
     """Linkup fetch content from URL."""
     try:
-        client = LinkupClient(api_key=LINKUP_API_KEY)
+        client = get_linkup_client()
         response = client.fetch(url=url)
-        # Updated to use SDK v0.9.0; fetch returns content string or object with .content
-        content = response if isinstance(response, str) else getattr(response, 'content', str(response))
-        sources = [{"url": url, "title": "Fetched Content", "snippet": content[:200]}]
-        return {"content": content, "sources": sources}
+        return _format_response(url, response)
     except Exception as e:
         logger.error(f"Error in linkup_fetch: {e}")  # Log API errors for debugging
-        mock_content = f"Mock linkup_fetch('{url}'): Fetched: Detailed case summary from courtlistener.com... Note: LINKUP_API_KEY required. Error: {str(e)[:300]}"
-        mock_sources = [{"url": url, "title": "Mock Fetched Title", "snippet": "Mock snippet from fetch"}]
-        return {"content": mock_content, "sources": mock_sources}
\ No newline at end of file
+        return _mock_result(url, e)
+
+async def alinkup_fetch(url: str) -> dict:
+    """Async variant of linkup_fetch over the pooled Linkup client."""
+    try:
+        client = get_linkup_client()
+        response = await client.async_fetch(url=url)
+        return _format_response(url, response)
+    except Exception as e:
+        logger.error(f"Error in alinkup_fetch: {e}")
+        return _mock_result(url, e)
+
+linkup_fetch.coroutine = alinkup_fetch
@@ -0,0 +1,242 @@
+"""Persistent, content-addressed cache for OCR output.
+
+Entries are keyed by the SHA-256 of the PDF bytes and store the page-level
+Markdown, so the same document is OCR'd once no matter how it reaches us
+(upload, URL, re-submission). URLs are aliased to the hash of the bytes they
+served, which lets convert_pdf_url skip the download too. Total size is capped;
+the least recently used entries are evicted first (an entry's mtime is bumped on
+every hit).
+
+Layout under the cache root:
+    entries/<sha256>.json   {"sha256", "model", "source", "created", "pages": [...]}
+    aliases/<sha256(url)>   sha256 of the PDF last served by that URL
+
+Command-line usage:
+    python -m tools.ocr_cache stats
+    python -m tools.ocr_cache list [--limit N]
+    python -m tools.ocr_cache purge [--all | --older-than DAYS | --sha SHA256]
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def hash_pdf(pdf_bytes: bytes) -> str:
+    """Content address of a PDF: hex SHA-256 of its bytes."""
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def _url_key(url: str) -> str:
+    return hashlib.sha256(url.strip().encode("utf-8")).hexdigest()
+
+
+def _atomic_write(path: Path, data: str) -> None:
+    """Write data to path via a temp file + rename so readers never see partial files."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+class OCRCache:
+    """On-disk OCR cache with URL aliasing and LRU eviction under a byte cap."""
+
+    def __init__(self, root: str, max_bytes: int, model: str = "mistral-ocr-latest"):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.model = model
+        self.entries_dir = self.root / "entries"
+        self.aliases_dir = self.root / "aliases"
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        self.aliases_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _entry_path(self, sha256: str) -> Path:
+        return self.entries_dir / f"{sha256}.json"
+
+    def get(self, sha256: str) -> Optional[list[str]]:
+        """Return cached pages for a PDF hash, or None on a miss."""
+        path = self._entry_path(sha256)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Discarding unreadable OCR cache entry %s: %s", sha256, e)
+            path.unlink(missing_ok=True)
+            return None
+        if entry.get("model") != self.model:
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return entry.get("pages")
+
+    def put(self, sha256: str, pages: list[str], source: Optional[str] = None) -> None:
+        """Store pages for a PDF hash, then evict old entries if over the size cap."""
+        entry = {
+            "sha256": sha256,
+            "model": self.model,
+            "source": source,
+            "created": time.time(),
+            "pages": pages,
+        }
+        _atomic_write(self._entry_path(sha256), json.dumps(entry))
+        self.evict()
+
+    def resolve_alias(self, url: str) -> Optional[str]:
+        """Return the PDF hash last served by url, if known."""
+        try:
+            return (self.aliases_dir / _url_key(url)).read_text(encoding="utf-8").strip() or None
+        except FileNotFoundError:
+            return None
+
+    def add_alias(self, url: str, sha256: str) -> None:
+        _atomic_write(self.aliases_dir / _url_key(url), sha256)
+
+    def get_by_url(self, url: str) -> Optional[list[str]]:
+        """Return cached pages for a URL via its alias; stale aliases are dropped."""
+        sha256 = self.resolve_alias(url)
+        if not sha256:
+            return None
+        pages = self.get(sha256)
+        if pages is None:
+            (self.aliases_dir / _url_key(url)).unlink(missing_ok=True)
+        return pages
+
+    def entries(self) -> list[dict]:
+        """Metadata for every entry, most recently used first."""
+        result = []
+        for path in self.entries_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            result.append({"sha256": path.stem, "bytes": stat.st_size, "last_used": stat.st_mtime, "path": path})
+        result.sort(key=lambda e: e["last_used"], reverse=True)
+        return result
+
+    def stats(self) -> dict:
+        entries = self.entries()
+        return {
+            "root": str(self.root),
+            "entries": len(entries),
+            "bytes": sum(e["bytes"] for e in entries),
+            "max_bytes": self.max_bytes,
+            "aliases": sum(1 for _ in self.aliases_dir.iterdir()),
+        }
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Delete least recently used entries until the cache fits max_bytes. Returns the count removed."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        removed = 0
+        with self._lock:
+            entries = self.entries()
+            total = sum(e["bytes"] for e in entries)
+            while entries and total > limit:
+                oldest = entries.pop()
+                oldest["path"].unlink(missing_ok=True)
+                total -= oldest["bytes"]
+                removed += 1
+        if removed:
+            logger.info("Evicted %d OCR cache entries", removed)
+        return removed
+
+    def purge(self, older_than: Optional[float] = None, sha256: Optional[str] = None) -> int:
+        """Delete entries (all, unused for older_than seconds, or one hash) and orphaned aliases."""
+        now = time.time()
+        removed = 0
+        for entry in self.entries():
+            if sha256 and entry["sha256"] != sha256:
+                continue
+            if older_than is not None and now - entry["last_used"] < older_than:
+                continue
+            entry["path"].unlink(missing_ok=True)
+            removed += 1
+        live = {e["sha256"] for e in self.entries()}
+        for alias in self.aliases_dir.iterdir():
+            try:
+                if alias.read_text(encoding="utf-8").strip() not in live:
+                    alias.unlink(missing_ok=True)
+            except FileNotFoundError:
+                continue
+        return removed
+
+
+_cache: Optional[OCRCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_ocr_cache() -> Optional[OCRCache]:
+    """Process-wide cache configured from config.py, or None when caching is disabled."""
+    global _cache
+    if not config.OCR_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = OCRCache(config.OCR_CACHE_DIR, config.OCR_CACHE_MAX_BYTES, config.OCR_MODEL)
+    return _cache
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Inspect and purge the CompeteGrok OCR cache")
+    parser.add_argument("--dir", default=None, help=f"Cache directory (default: {config.OCR_CACHE_DIR})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Show entry count and size")
+    list_parser = sub.add_parser("list", help="List entries, most recently used first")
+    list_parser.add_argument("--limit", type=int, default=50)
+    purge_parser = sub.add_parser("purge", help="Delete entries")
+    group = purge_parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--all", action="store_true", help="Delete every entry")
+    group.add_argument("--older-than", type=float, metavar="DAYS", help="Delete entries unused for DAYS days")
+    group.add_argument("--sha", metavar="SHA256", help="Delete a single entry")
+    args = parser.parse_args(argv)
+
+    cache = OCRCache(args.dir or config.OCR_CACHE_DIR, config.OCR_CACHE_MAX_BYTES, config.OCR_MODEL)
+    if args.command == "stats":
+        stats = cache.stats()
+        print(f"Cache:   {stats['root']}")
+        print(f"Entries: {stats['entries']} ({stats['aliases']} URL aliases)")
+        print(f"Size:    {stats['bytes'] / 1e6:.1f} MB of {stats['max_bytes'] / 1e6:.1f} MB")
+    elif args.command == "list":
+        for entry in cache.entries()[:args.limit]:
+            try:
+                with open(entry["path"], "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                meta = {}
+            last_used = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["last_used"]))
+            print(f"{entry['sha256'][:16]}  {entry['bytes'] / 1e3:9.1f} KB  {len(meta.get('pages', [])):4d} pages  "
+                  f"{last_used}  {meta.get('source') or ''}")
+    elif args.command == "purge":
+        if args.all:
+            removed = cache.purge()
+        elif args.sha:
+            removed = cache.purge(sha256=args.sha)
+        else:
+            removed = cache.purge(older_than=args.older_than * 86400)
+        print(f"Removed {removed} entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Streaming PDF input for the conversion tools.
+
+Downloads are written to a temporary file chunk by chunk while being hashed,
+with a size ceiling (PDF_MAX_BYTES) and a %PDF sniff on the first chunk, so a
+large filing is never held in memory as a whole and non-PDF responses are
+rejected before they are fully read. Local files are sniffed and hashed the
+same way.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+from typing import AsyncIterable, Iterable, Optional
+
+import config
+from exceptions import FileProcessingError
+
+logger = logging.getLogger(__name__)
+
+# The PDF spec allows the header anywhere in the first 1024 bytes
+_SNIFF_BYTES = 1024
+
+
+def is_pdf_header(head: bytes) -> bool:
+    return b"%PDF" in head[:_SNIFF_BYTES]
+
+
+def check_local_pdf(file_path: str) -> Optional[str]:
+    """Return an error message if file_path is not a readable PDF within the size limit, else None."""
+    if not os.path.isfile(file_path):
+        return f"File not found or not a file: {file_path}"
+    with open(file_path, 'rb') as f:
+        head = f.read(_SNIFF_BYTES)
+    if not is_pdf_header(head):
+        return f"Invalid PDF file: {file_path}"
+    size = os.path.getsize(file_path)
+    if size > config.PDF_MAX_BYTES:
+        return f"PDF too large ({size / 1e6:.1f} MB > {config.PDF_MAX_BYTES / 1e6:.1f} MB): {file_path}"
+    return None
+
+
+def hash_file(file_path: str) -> str:
+    """SHA-256 of a file, read in PDF_CHUNK_SIZE chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(config.PDF_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class _PDFSpool:
+    """Temp file that accepts chunks, enforcing the sniff and the size ceiling as they arrive."""
+
+    def __init__(self, url: str, declared_length: Optional[int]):
+        if declared_length is not None and declared_length > config.PDF_MAX_BYTES:
+            raise FileProcessingError(
+                f"PDF too large ({declared_length / 1e6:.1f} MB > {config.PDF_MAX_BYTES / 1e6:.1f} MB): {url}")
+        self.url = url
+        self.size = 0
+        self.digest = hashlib.sha256()
+        self.head = b""
+        fd, self.path = tempfile.mkstemp(suffix=".pdf", prefix="competegrok-")
+        self.file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        if len(self.head) < _SNIFF_BYTES:
+            self.head += chunk[:_SNIFF_BYTES - len(self.head)]
+            if len(self.head) >= _SNIFF_BYTES and not is_pdf_header(self.head):
+                raise FileProcessingError(f"URL did not return a PDF: {self.url}")
+        self.size += len(chunk)
+        if self.size > config.PDF_MAX_BYTES:
+            raise FileProcessingError(f"PDF exceeds {config.PDF_MAX_BYTES / 1e6:.1f} MB limit: {self.url}")
+        self.digest.update(chunk)
+        self.file.write(chunk)
+
+    def finish(self) -> tuple[str, str]:
+        self.file.close()
+        if not is_pdf_header(self.head):
+            raise FileProcessingError(f"URL did not return a PDF: {self.url}")
+        logger.info(f"Downloaded {self.size / 1e6:.1f} MB PDF from {self.url}")
+        return self.path, self.digest.hexdigest()
+
+    def discard(self) -> None:
+        self.file.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def _declared_length(headers) -> Optional[int]:
+    try:
+        return int(headers.get("Content-Length"))
+    except (TypeError, ValueError):
+        return None
+
+
+def spool_pdf(url: str, headers, chunks: Iterable[bytes]) -> tuple[str, str]:
+    """Write a streamed PDF response to a temp file.
+
+    Args:
+        url: Source URL, used in error messages.
+        headers: Response headers (Content-Length is checked before reading).
+        chunks: Body chunks, e.g. response.iter_content(PDF_CHUNK_SIZE).
+
+    Returns:
+        tuple[str, str]: (temp file path, SHA-256 of the content). The caller deletes the file.
+
+    Raises:
+        FileProcessingError: If the body is not a PDF or exceeds PDF_MAX_BYTES.
+    """
+    spool = _PDFSpool(url, _declared_length(headers))
+    try:
+        for chunk in chunks:
+            spool.write(chunk)
+        return spool.finish()
+    except BaseException:
+        spool.discard()
+        raise
+
+
+async def aspool_pdf(url: str, headers, chunks: AsyncIterable[bytes]) -> tuple[str, str]:
+    """Async variant of spool_pdf for httpx response.aiter_bytes()."""
+    spool = _PDFSpool(url, _declared_length(headers))
+    try:
+        async for chunk in chunks:
+            spool.write(chunk)
+        return spool.finish()
+    except BaseException:
+        spool.discard()
+        raise
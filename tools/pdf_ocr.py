@@ -0,0 +1,323 @@
+"""Shared PDF-to-Markdown path for convert_pdf_file and convert_pdf_url.
+
+Every conversion goes through the persistent OCR cache (tools/ocr_cache.py):
+the PDF bytes are hashed first and nothing else runs on a hit. On a miss, pages
+with a clean text layer are extracted locally (tools/pdf_text.py) and only the
+remaining pages are sent to Mistral OCR, then merged back in page order.
+
+Large OCR workloads are split into page-range shards of OCR_SHARD_PAGES pages,
+processed with at most OCR_MAX_CONCURRENCY requests in flight and retried per
+shard, so one transient failure costs a shard rather than the whole document.
+
+PDFs may be passed as bytes or as a path on disk. Files are hashed and parsed
+from the file handle rather than loaded whole. Payloads above OCR_INLINE_MAX_BYTES
+are streamed to the Mistral files API and OCR'd from a signed URL, instead of
+being inlined as a base64 data URI.
+"""
+
+import asyncio
+import base64
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
+
+from tenacity import AsyncRetrying, Retrying, stop_after_attempt, wait_exponential
+
+import config
+import telemetry
+from .ocr_cache import get_ocr_cache, hash_pdf
+from .pdf_io import hash_file
+from .pdf_text import extract_text_pages, open_pdf, subset_pdf
+from .providers import get_mistral_client, get_async_mistral_client
+
+logger = logging.getLogger(__name__)
+
+PAGE_SEPARATOR = "\n\n---\n\n"
+
+_RETRY_WAIT = wait_exponential(multiplier=1, min=1, max=10)
+
+
+PDFInput = Union[bytes, str]  # raw content, or a path to a PDF on disk
+
+
+def build_ocr_request(document_url: str) -> dict:
+    """OCR request for a PDF at document_url (a data URI or a signed upload URL)."""
+    return {
+        "model": config.OCR_MODEL,
+        "document": {
+            "type": "document_url",
+            "document_url": document_url
+        },
+        "table_format": "markdown"
+    }
+
+
+def _payload_size(payload: PDFInput) -> int:
+    return len(payload) if isinstance(payload, bytes) else os.path.getsize(payload)
+
+
+def _data_uri(payload: PDFInput) -> str:
+    if not isinstance(payload, bytes):
+        with open(payload, 'rb') as f:
+            payload = f.read()
+    return "data:application/pdf;base64," + base64.b64encode(payload).decode('ascii')
+
+
+def _upload_file(payload: PDFInput) -> dict:
+    """files.upload argument; paths are streamed from disk by the HTTP client."""
+    content = io.BytesIO(payload) if isinstance(payload, bytes) else open(payload, 'rb')
+    return {"file_name": "document.pdf", "content": content}
+
+
+def join_pages(pages: list[str]) -> str:
+    return PAGE_SEPARATOR.join(pages)
+
+
+def cached_pages_for_url(url: str) -> Optional[list[str]]:
+    """Pages for a URL whose PDF has already been OCR'd, without downloading it."""
+    cache = get_ocr_cache()
+    pages = cache.get_by_url(url) if cache else None
+    if pages is not None:
+        logger.info(f"OCR cache hit for {url}")
+        telemetry.record_cache_hit("ocr")
+    return pages
+
+
+def _digest(pdf: PDFInput) -> str:
+    return hash_pdf(pdf) if isinstance(pdf, bytes) else hash_file(pdf)
+
+
+def _lookup(pdf: PDFInput, url: Optional[str], digest: Optional[str]):
+    cache = get_ocr_cache()
+    digest = digest or _digest(pdf)
+    pages = cache.get(digest) if cache else None
+    if pages is not None:
+        logger.info(f"OCR cache hit for {url or digest[:16]}")
+        telemetry.record_cache_hit("ocr")
+        if url:
+            cache.add_alias(url, digest)
+    return cache, digest, pages
+
+
+def _store(cache, digest: str, pages: list[str], source: Optional[str], url: Optional[str]) -> None:
+    if cache is None:
+        return
+    try:
+        cache.put(digest, pages, source=url or source)
+        if url:
+            cache.add_alias(url, digest)
+    except OSError as e:
+        logger.warning(f"Could not write OCR cache entry {digest[:16]}: {e}")
+
+
+class _Conversion:
+    """Per-document state: local text pages plus the page-range shards still needing OCR."""
+
+    def __init__(self, pdf: PDFInput):
+        self.pdf = pdf
+        self.reader = None
+        self.pages: Optional[list] = None  # local Markdown, None entries need OCR
+        self.missing: list[int] = []
+        self._lock = threading.Lock()  # PdfReader is not safe to read from several threads
+        self._stream = None
+        # Captured here: shards run on pool threads that do not inherit the run context
+        self.metrics = telemetry.get_metrics()
+        try:
+            self._stream = io.BytesIO(pdf) if isinstance(pdf, bytes) else open(pdf, 'rb')
+            self.reader = open_pdf(self._stream)
+            if config.PDF_TEXT_FAST_PATH:
+                self.pages = extract_text_pages(self.reader)
+            else:
+                self.pages = [None] * len(self.reader.pages)
+        except Exception as e:
+            logger.warning(f"Could not parse PDF locally, sending it to OCR in one request: {e}")
+            self.reader = None
+            self.pages = None
+            self.close()
+            return
+        self.missing = [i for i, page in enumerate(self.pages) if page is None]
+        logger.info(f"Text layer covers {len(self.pages) - len(self.missing)}/{len(self.pages)} pages; "
+                    f"{len(self.missing)} need OCR")
+
+    def shards(self) -> list[list[int]]:
+        """Page indices to OCR, split into ranges of at most OCR_SHARD_PAGES pages."""
+        if self.pages is None:
+            return [[]]  # unparsed document: a single request for the whole file
+        size = max(1, config.OCR_SHARD_PAGES)
+        return [self.missing[i:i + size] for i in range(0, len(self.missing), size)]
+
+    def payload(self, shard: list[int]) -> PDFInput:
+        """PDF for one shard; subsets are built lazily so only in-flight shards are held in memory."""
+        if self.pages is None or len(shard) == len(self.pages):
+            return self.pdf
+        with self._lock:
+            return subset_pdf(self.reader, shard)
+
+    def close(self) -> None:
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def merge(self, shards: list[list[int]], results: list[list[str]]) -> list[str]:
+        """Put OCR'd pages back into their original positions."""
+        if self.pages is None:
+            return results[0]
+        merged = list(self.pages)
+        for shard, ocr_pages in zip(shards, results):
+            if len(ocr_pages) != len(shard):
+                logger.warning(f"OCR returned {len(ocr_pages)} pages for {len(shard)} requested")
+            for index, markdown in zip(shard, ocr_pages):
+                merged[index] = markdown
+        return [page or "" for page in merged]
+
+
+def _failed_shard(shard: list[int], error: Exception) -> list[str]:
+    first, last = (shard[0] + 1, shard[-1] + 1) if shard else (1, 1)
+    return [f"[OCR failed for pages {first}-{last}: {str(error)[:200]}]"] * max(1, len(shard))
+
+
+def _ocr(payload: PDFInput) -> list[str]:
+    client = get_mistral_client()
+    if _payload_size(payload) <= config.OCR_INLINE_MAX_BYTES:
+        ocr_response = client.ocr.process(**build_ocr_request(_data_uri(payload)))
+        return [page.markdown for page in ocr_response.pages]
+    upload = _upload_file(payload)
+    try:
+        uploaded = client.files.upload(file=upload, purpose="ocr")
+    finally:
+        upload["content"].close()
+    try:
+        signed = client.files.get_signed_url(file_id=uploaded.id)
+        ocr_response = client.ocr.process(**build_ocr_request(signed.url))
+        return [page.markdown for page in ocr_response.pages]
+    finally:
+        try:
+            client.files.delete(file_id=uploaded.id)
+        except Exception as e:
+            logger.debug(f"Could not delete uploaded OCR file {uploaded.id}: {e}")
+
+
+async def _aocr(payload: PDFInput) -> list[str]:
+    client = get_async_mistral_client()
+    if _payload_size(payload) <= config.OCR_INLINE_MAX_BYTES:
+        ocr_response = await client.ocr.process_async(**build_ocr_request(_data_uri(payload)))
+        return [page.markdown for page in ocr_response.pages]
+    upload = _upload_file(payload)
+    try:
+        uploaded = await client.files.upload_async(file=upload, purpose="ocr")
+    finally:
+        upload["content"].close()
+    try:
+        signed = await client.files.get_signed_url_async(file_id=uploaded.id)
+        ocr_response = await client.ocr.process_async(**build_ocr_request(signed.url))
+        return [page.markdown for page in ocr_response.pages]
+    finally:
+        try:
+            await client.files.delete_async(file_id=uploaded.id)
+        except Exception as e:
+            logger.debug(f"Could not delete uploaded OCR file {uploaded.id}: {e}")
+
+
+def _ocr_shard(job: _Conversion, shard: list[int]) -> list[str]:
+    payload = job.payload(shard)
+    for attempt in Retrying(stop=stop_after_attempt(config.OCR_SHARD_RETRIES), wait=_RETRY_WAIT, reraise=True,
+                            before_sleep=lambda _: job.metrics.add_retry("ocr_shard")):
+        with attempt:
+            return _ocr(payload)
+
+
+async def _aocr_shard(job: _Conversion, shard: list[int], semaphore: asyncio.Semaphore) -> list[str]:
+    async with semaphore:
+        payload = await asyncio.to_thread(job.payload, shard)
+        async for attempt in AsyncRetrying(stop=stop_after_attempt(config.OCR_SHARD_RETRIES), wait=_RETRY_WAIT,
+                                           reraise=True, before_sleep=lambda _: job.metrics.add_retry("ocr_shard")):
+            with attempt:
+                return await _aocr(payload)
+
+
+def _collect(job: _Conversion, shards: list[list[int]], outcomes: list) -> tuple[list[str], bool]:
+    """Merge shard outcomes; failed shards become placeholders. Raises if every shard failed."""
+    errors = [o for o in outcomes if isinstance(o, Exception)]
+    if errors and len(errors) == len(outcomes):
+        raise errors[0]
+    for error in errors:
+        logger.error(f"OCR shard failed after {config.OCR_SHARD_RETRIES} attempts: {error}")
+    results = [_failed_shard(shard, o) if isinstance(o, Exception) else o for shard, o in zip(shards, outcomes)]
+    return job.merge(shards, results), not errors
+
+
+def _convert(pdf: PDFInput) -> tuple[list[str], bool]:
+    """Text-layer extraction plus concurrent sharded OCR. Returns (pages, complete)."""
+    job = _Conversion(pdf)
+    try:
+        shards = job.shards()
+        if not shards:
+            return job.merge([], []), True
+
+        def run(shard):
+            try:
+                return _ocr_shard(job, shard)
+            except Exception as e:
+                return e
+
+        if len(shards) == 1:
+            outcomes = [run(shards[0])]
+        else:
+            logger.info(f"OCR of {len(job.missing)} pages in {len(shards)} shards")
+            with ThreadPoolExecutor(max_workers=min(config.OCR_MAX_CONCURRENCY, len(shards))) as pool:
+                outcomes = list(pool.map(run, shards))
+        return _collect(job, shards, outcomes)
+    finally:
+        job.close()
+
+
+async def _aconvert(pdf: PDFInput) -> tuple[list[str], bool]:
+    job = await asyncio.to_thread(_Conversion, pdf)
+    try:
+        shards = job.shards()
+        if not shards:
+            return job.merge([], []), True
+        semaphore = asyncio.Semaphore(config.OCR_MAX_CONCURRENCY)
+        outcomes = await asyncio.gather(*(_aocr_shard(job, shard, semaphore) for shard in shards),
+                                        return_exceptions=True)
+        return _collect(job, shards, outcomes)
+    finally:
+        job.close()
+
+
+def ocr_pdf_pages(pdf: PDFInput, source: Optional[str] = None, url: Optional[str] = None,
+                  digest: Optional[str] = None) -> list[str]:
+    """Convert a PDF into per-page Markdown, serving repeated documents from the cache.
+
+    Args:
+        pdf: Raw PDF content, or the path of a PDF on disk (read in chunks, never loaded whole).
+        source: Human-readable origin (file path) recorded with the cache entry.
+        url: Download URL; when given it is aliased to the PDF hash.
+        digest: SHA-256 of the content if already known (e.g. computed while downloading).
+
+    Returns:
+        list[str]: Markdown for each page, in order. Pages whose OCR shard failed
+        after retries carry a placeholder, and the result is not cached.
+    """
+    cache, digest, pages = _lookup(pdf, url, digest)
+    if pages is not None:
+        return pages
+    pages, complete = _convert(pdf)
+    if complete:
+        _store(cache, digest, pages, source, url)
+    return pages
+
+
+async def aocr_pdf_pages(pdf: PDFInput, source: Optional[str] = None, url: Optional[str] = None,
+                         digest: Optional[str] = None) -> list[str]:
+    """Async variant of ocr_pdf_pages; shards are awaited concurrently under a semaphore."""
+    cache, digest, pages = await asyncio.to_thread(_lookup, pdf, url, digest)
+    if pages is not None:
+        return pages
+    pages, complete = await _aconvert(pdf)
+    if complete:
+        await asyncio.to_thread(_store, cache, digest, pages, source, url)
+    return pages
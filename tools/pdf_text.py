@@ -0,0 +1,124 @@
+"""Local text-layer extraction for born-digital PDFs.
+
+Most working papers and agency guidelines carry a usable text layer, so OCR is
+only needed for scanned or garbled pages. extract_text_pages() classifies each
+page and returns its text when the layer is good enough, or None when the page
+should go to OCR; subset_pdf() builds a smaller PDF from the pages that still
+need it.
+"""
+
+import io
+import logging
+import re
+from typing import TYPE_CHECKING, Optional
+
+import config
+
+if TYPE_CHECKING:
+    from pypdf import PdfReader
+
+logger = logging.getLogger(__name__)
+
+_CID_RE = re.compile(r"\(cid:\d+\)")
+_HYPHEN_BREAK_RE = re.compile(r"(\w)-\n(\w)")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def _is_good_text(text: str) -> bool:
+    """Heuristic quality check for an extracted text layer."""
+    stripped = text.strip()
+    if not stripped:
+        return False
+    # Unmapped glyphs show up as (cid:NN) or U+FFFD; either means the font has no usable ToUnicode map
+    garbage = len(_CID_RE.findall(stripped)) * 6 + stripped.count("\ufffd")
+    if garbage / len(stripped) > 0.02:
+        return False
+    readable = sum(1 for c in stripped if c.isalnum() or c.isspace() or c in ".,;:!?()[]{}'\"-–—%$€£/+=<>*&#@")
+    if readable / len(stripped) < config.PDF_TEXT_MIN_READABLE_RATIO:
+        return False
+    # Text with missing word spacing ("Theeffectofmergers...") extracts as very long tokens
+    words = stripped.split()
+    return sum(len(w) for w in words) / len(words) <= 25
+
+
+def _has_images(resources, seen: set) -> bool:
+    """Whether resources draw an image, directly or inside (nested) Form XObjects."""
+    xobjects = (resources or {}).get("/XObject") or {}
+    for name in xobjects:
+        xobject = xobjects[name].get_object()
+        subtype = xobject.get("/Subtype")
+        if subtype == "/Image":
+            return True
+        if subtype == "/Form" and id(xobject) not in seen:
+            seen.add(id(xobject))  # forms can be shared, or (in broken files) contain themselves
+            if _has_images(xobject.get("/Resources"), seen):
+                return True
+    return False
+
+
+def _page_has_images(page) -> bool:
+    try:
+        return _has_images(page.get("/Resources"), set())
+    except Exception:
+        return True  # be conservative: let OCR look at pages we cannot inspect
+
+
+def _page_is_blank(page) -> bool:
+    """Whether the page draws nothing at all (an empty or missing content stream)."""
+    try:
+        contents = page.get_contents()
+        return contents is None or not contents.get_data().strip()
+    except Exception:
+        return False
+
+
+def _to_markdown(text: str) -> str:
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = _HYPHEN_BREAK_RE.sub(r"\1\2", text)
+    return _BLANK_LINES_RE.sub("\n\n", text).strip()
+
+
+def extract_text_pages(reader: "PdfReader") -> list[Optional[str]]:
+    """Extract each page's text layer.
+
+    Args:
+        reader: Parsed PDF.
+
+    Returns:
+        list[Optional[str]]: Markdown per page, or None for pages that need OCR
+        (scanned, image-only, vector-only, or with a garbled text layer). Only
+        pages that draw nothing (blank separators) are kept as empty strings.
+    """
+    pages: list[Optional[str]] = []
+    for number, page in enumerate(reader.pages):
+        try:
+            text = page.extract_text() or ""
+        except Exception as e:
+            logger.debug(f"Text extraction failed on page {number + 1}: {e}")
+            pages.append(None)
+            continue
+        # Short pages are only trusted when there is no image that could hold the real content
+        if _is_good_text(text) and (len(text.strip()) >= config.PDF_TEXT_MIN_CHARS or not _page_has_images(page)):
+            pages.append(_to_markdown(text))
+        elif not text.strip() and _page_is_blank(page):
+            pages.append("")
+        else:
+            pages.append(None)
+    return pages
+
+
+def open_pdf(pdf) -> "PdfReader":
+    """Parse a PDF from bytes or a binary stream (objects are read from the stream on demand)."""
+    from pypdf import PdfReader
+    return PdfReader(io.BytesIO(pdf) if isinstance(pdf, bytes) else pdf)
+
+
+def subset_pdf(reader: "PdfReader", indices: list[int]) -> bytes:
+    """Build a new PDF containing only the given (0-based) pages, in order."""
+    from pypdf import PdfWriter
+    writer = PdfWriter()
+    for index in indices:
+        writer.add_page(reader.pages[index])
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
@@ -0,0 +1,247 @@
+"""Shared provider clients with keep-alive connection pools.
+
+Tools used to build a new TavilyClient, LinkupClient or requests.Session on
+every call, paying a TCP/TLS handshake per search. This module creates one
+client per provider on first use and hands the same instance to every caller,
+so concurrent agents reuse pooled connections. Async clients are kept per event
+loop because httpx connection pools cannot be shared across loops.
+
+Provider SDKs (tavily, linkup, mistralai) are imported on first use rather than
+at import time, so CLI start-up and test collection do not pay for them.
+"""
+
+import asyncio
+import functools
+import importlib
+import logging
+import threading
+import weakref
+from typing import Any, Callable, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import config
+from exceptions import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_clients: dict = {}
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+
+
+def _pooled_adapter(retries: bool = True) -> HTTPAdapter:
+    """Build a requests adapter sized for concurrent agents."""
+    retry = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504]) if retries else 0
+    return HTTPAdapter(
+        pool_connections=config.PROVIDER_POOL_SIZE,
+        pool_maxsize=config.PROVIDER_POOL_SIZE,
+        max_retries=retry,
+    )
+
+
+def _httpx_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=config.PROVIDER_POOL_SIZE,
+        max_keepalive_connections=config.PROVIDER_POOL_SIZE,
+    )
+
+
+def _sdk_class(module: str, name: str) -> Any:
+    """Import a provider SDK class on first use."""
+    return getattr(importlib.import_module(module), name)
+
+
+def _get_or_create(key: Any, factory: Callable[[], Any]) -> Any:
+    """Return the cached client for key, creating it once under a lock."""
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = factory()
+                _clients[key] = client
+                logger.debug("Created pooled provider client: %s", key[0] if isinstance(key, tuple) else key)
+    return client
+
+
+def _get_or_create_async(key: Any, factory: Callable[[], Any]) -> Any:
+    """Return the async client for key bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        per_loop = _async_clients.setdefault(loop, {})
+        client = per_loop.get(key)
+        if client is None:
+            client = factory()
+            per_loop[key] = client
+    return client
+
+
+def get_http_session() -> requests.Session:
+    """Shared requests session (with retries) for plain HTTP downloads such as PDFs."""
+    def factory():
+        session = requests.Session()
+        adapter = _pooled_adapter()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+    return _get_or_create(("http",), factory)
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Shared httpx.AsyncClient for plain HTTP requests on the running event loop."""
+    return _get_or_create_async(
+        ("http",),
+        lambda: httpx.AsyncClient(limits=_httpx_limits(), timeout=config.PROVIDER_TIMEOUT, follow_redirects=True),
+    )
+
+
+def get_tavily_client(client_cls: Optional[Callable[..., Any]] = None) -> Any:
+    """Shared TavilyClient. Its requests session is remounted with a larger pool."""
+    client_cls = client_cls or _sdk_class("tavily", "TavilyClient")
+
+    def factory():
+        client = client_cls(api_key=config.TAVILY_API_KEY, api_base_url=config.TAVILY_BASE_URL)
+        session = getattr(client, "session", None)
+        if isinstance(session, requests.Session):
+            adapter = _pooled_adapter(retries=False)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        return client
+    return _get_or_create(("tavily", client_cls, config.TAVILY_API_KEY, config.TAVILY_BASE_URL), factory)
+
+
+def get_async_tavily_client(client_cls: Optional[Callable[..., Any]] = None) -> Any:
+    """AsyncTavilyClient for the running event loop; it owns a pooled httpx.AsyncClient."""
+    client_cls = client_cls or _sdk_class("tavily", "AsyncTavilyClient")
+    return _get_or_create_async(
+        ("tavily", client_cls, config.TAVILY_API_KEY, config.TAVILY_BASE_URL),
+        lambda: client_cls(api_key=config.TAVILY_API_KEY, api_base_url=config.TAVILY_BASE_URL),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def pooled_linkup_client_class() -> type:
+    """PooledLinkupClient, defined on first use so the linkup SDK is imported lazily."""
+    LinkupClient = _sdk_class("linkup", "LinkupClient")
+    LinkupTimeoutError = _sdk_class("linkup", "LinkupTimeoutError")
+
+    class PooledLinkupClient(LinkupClient):
+        """LinkupClient that sends requests through shared httpx clients.
+
+        The SDK opens a new httpx.Client for every request. This subclass reuses a
+        pooled client instead, and defers to the SDK for anything it does not
+        handle (x402 payments, or SDK versions without the expected hooks).
+        The SDK's default timeout of None keeps the pooled client's PROVIDER_TIMEOUT.
+        """
+
+        def _can_pool(self) -> bool:
+            return (getattr(self, "_x402_signer", None) is None
+                    and hasattr(self, "_headers") and hasattr(self, "_raise_linkup_error"))
+
+        def _request(self, method, url, *, json=None, params=None, timeout=None):
+            if not self._can_pool():
+                return super()._request(method, url, json=json, params=params, timeout=timeout)
+            client = _get_or_create(
+                ("linkup-http",),
+                lambda: httpx.Client(limits=_httpx_limits(), timeout=config.PROVIDER_TIMEOUT),
+            )
+            if timeout is None:
+                timeout = httpx.USE_CLIENT_DEFAULT  # an explicit None would disable the timeout
+            try:
+                response = client.request(method, self._base_url + url, headers=self._headers(),
+                                          json=json, params=params, timeout=timeout)
+            except httpx.TimeoutException as e:
+                raise LinkupTimeoutError("The request to the Linkup API timed out.") from e
+            if response.status_code != 200:
+                self._raise_linkup_error(response=response)
+            return response
+
+        async def _async_request(self, method, url, *, json=None, params=None, timeout=None):
+            if not self._can_pool():
+                return await super()._async_request(method, url, json=json, params=params, timeout=timeout)
+            client = _get_or_create_async(
+                ("linkup-http",),
+                lambda: httpx.AsyncClient(limits=_httpx_limits(), timeout=config.PROVIDER_TIMEOUT),
+            )
+            if timeout is None:
+                timeout = httpx.USE_CLIENT_DEFAULT
+            try:
+                response = await client.request(method, self._base_url + url, headers=self._headers(),
+                                                json=json, params=params, timeout=timeout)
+            except httpx.TimeoutException as e:
+                raise LinkupTimeoutError("The request to the Linkup API timed out.") from e
+            if response.status_code != 200:
+                self._raise_linkup_error(response=response)
+            return response
+
+    return PooledLinkupClient
+
+
+def get_linkup_client(client_cls: Optional[Callable[..., Any]] = None) -> Any:
+    """Shared Linkup client. Sync and async calls both go through pooled httpx clients."""
+    client_cls = client_cls or pooled_linkup_client_class()
+    return _get_or_create(
+        ("linkup", client_cls, config.LINKUP_API_KEY, config.LINKUP_BASE_URL),
+        lambda: client_cls(api_key=config.LINKUP_API_KEY, base_url=config.LINKUP_BASE_URL),
+    )
+
+
+def _require_mistral_key() -> None:
+    if not config.MISTRAL_API_KEY:
+        raise ConfigurationError("MISTRAL_API_KEY not set; PDF conversion is unavailable")
+
+
+def get_mistral_client(client_cls: Optional[Callable[..., Any]] = None) -> Any:
+    """Shared Mistral client backed by a pooled httpx.Client.
+
+    Raises:
+        ConfigurationError: If MISTRAL_API_KEY is not set.
+    """
+    _require_mistral_key()
+    client_cls = client_cls or _sdk_class("mistralai", "Mistral")
+    return _get_or_create(
+        ("mistral", client_cls, config.MISTRAL_API_KEY, config.MISTRAL_BASE_URL),
+        lambda: client_cls(
+            api_key=config.MISTRAL_API_KEY,
+            server_url=config.MISTRAL_BASE_URL,
+            client=httpx.Client(limits=_httpx_limits(), timeout=config.OCR_TIMEOUT, follow_redirects=True),
+        ),
+    )
+
+
+def get_async_mistral_client(client_cls: Optional[Callable[..., Any]] = None) -> Any:
+    """Mistral client whose async httpx pool is bound to the running event loop."""
+    _require_mistral_key()
+    client_cls = client_cls or _sdk_class("mistralai", "Mistral")
+    return _get_or_create_async(
+        ("mistral", client_cls, config.MISTRAL_API_KEY, config.MISTRAL_BASE_URL),
+        lambda: client_cls(
+            api_key=config.MISTRAL_API_KEY,
+            server_url=config.MISTRAL_BASE_URL,
+            async_client=httpx.AsyncClient(limits=_httpx_limits(), timeout=config.OCR_TIMEOUT, follow_redirects=True),
+        ),
+    )
+
+
+def close_all() -> None:
+    """Close pooled sync clients, e.g. at process shutdown or between test runs."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        close = getattr(client, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception as e:
+                logger.debug("Error closing provider client: %s", e)
+
+
+def __getattr__(name: str) -> Any:
+    if name == "PooledLinkupClient":
+        return pooled_linkup_client_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,159 @@
+"""Warm Python kernel worker used by tools/kernel_pool.py.
+
+Runs as a separate process (python -u py_kernel_worker.py) and speaks
+newline-delimited JSON on stdin/stdout:
+
+    -> {"id": 1, "code": "x = 1\\nx + 1", "cpu_seconds": 120}
+    <- {"id": 1, "type": "stdout", "data": "2\\n"}
+    <- {"id": 1, "type": "result", "ok": true, "error": null}
+
+Variables persist across requests in one namespace. Output is flushed line by
+line as the code runs. Resource limits are applied from inside the worker
+(RLIMIT_AS once at startup, a per-request RLIMIT_CPU budget) rather than via
+preexec_fn, which is not safe to use from the threaded parent.
+"""
+
+import ast
+import importlib
+import io
+import json
+import os
+import signal
+import sys
+import threading
+import traceback
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, the parent's wall-clock timeout still applies
+    resource = None
+
+CELL = "<cell>"
+
+
+class CPUTimeExceeded(Exception):
+    pass
+
+
+class _Channel:
+    """Protocol writer on a private dup of the original stdout."""
+
+    def __init__(self):
+        self._out = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+        os.dup2(2, 1)  # stray C-level writes to fd 1 must not corrupt the protocol
+        self._lock = threading.Lock()
+        self.request_id = None
+
+    def send(self, **message):
+        message.setdefault("id", self.request_id)
+        with self._lock:
+            self._out.write(json.dumps(message) + "\n")
+            self._out.flush()
+
+
+class _StreamWriter(io.TextIOBase):
+    """sys.stdout/sys.stderr replacement that forwards complete lines as they are written."""
+
+    def __init__(self, channel: _Channel, kind: str):
+        self._channel = channel
+        self._kind = kind
+        self._buffer = ""
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self._buffer += text
+        if "\n" in self._buffer or len(self._buffer) >= 4096:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self._buffer:
+            data, self._buffer = self._buffer, ""
+            self._channel.send(type=self._kind, data=data)
+
+
+def _on_sigxcpu(signum, frame):
+    raise CPUTimeExceeded("CPU time limit exceeded")
+
+
+def _set_cpu_budget(seconds):
+    if resource is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if not seconds:
+        resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = int(usage.ru_utime + usage.ru_stime + seconds) + 1
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _run_cell(code, namespace):
+    """Execute code; like a notebook cell, a trailing expression's repr is printed."""
+    tree = ast.parse(code, CELL, "exec")
+    last = None
+    if tree.body and isinstance(tree.body[-1], ast.Expr):
+        last = ast.Expression(tree.body.pop().value)
+    exec(compile(tree, CELL, "exec"), namespace)
+    if last is not None:
+        value = eval(compile(last, CELL, "eval"), namespace)
+        if value is not None:
+            print(repr(value))
+
+
+def _format_error(e):
+    if isinstance(e, (SyntaxError, CPUTimeExceeded)):
+        return "".join(traceback.format_exception_only(type(e), e))
+    tb = e.__traceback__
+    while tb is not None and tb.tb_frame.f_code.co_filename != CELL:
+        tb = tb.tb_next
+    return "".join(traceback.format_exception(type(e), e, tb))
+
+
+def main():
+    channel = _Channel()
+    memory_mb = int(os.environ.get("KERNEL_MEMORY_MB") or 0)
+    if resource is not None and memory_mb:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_mb * 1024 * 1024, memory_mb * 1024 * 1024))
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _on_sigxcpu)
+
+    namespace = {"__name__": "__main__"}
+    for spec in filter(None, (os.environ.get("KERNEL_PRELOAD") or "").split(",")):
+        module, _, alias = spec.partition(" as ")
+        try:
+            namespace[alias.strip() or module.strip()] = importlib.import_module(module.strip())
+        except Exception:
+            pass  # optional: the snippet can import it (and see the error) itself
+
+    stdout, stderr = _StreamWriter(channel, "stdout"), _StreamWriter(channel, "stderr")
+    sys.stdout, sys.stderr = stdout, stderr
+    channel.send(id=None, type="ready", pid=os.getpid())
+
+    for line in sys.stdin:
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if request.get("op") == "shutdown":
+            break
+        channel.request_id = request.get("id")
+        error = None
+        try:
+            _set_cpu_budget(request.get("cpu_seconds"))
+            _run_cell(request.get("code", ""), namespace)
+        except BaseException as e:  # report SystemExit/KeyboardInterrupt raised by snippets too
+            error = _format_error(e)
+        finally:
+            _set_cpu_budget(None)
+            stdout.flush()
+            stderr.flush()
+        channel.send(type="result", ok=error is None, error=error)
+
+
+if __name__ == "__main__":
+    main()
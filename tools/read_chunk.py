@@ -0,0 +1,34 @@
+from langchain_core.tools import tool
+import logging
+
+from .document_store import get_document_store
+
+logger = logging.getLogger(__name__)
+
+
+@tool
+def read_chunk(doc_id: str, chunk_id: int) -> str:
+    """Read one passage (chunk) of an uploaded document in full, e.g. a hit from search_documents.
+
+    Args:
+        doc_id (str): Document id.
+        chunk_id (int): Chunk number within the document; neighbouring chunks are chunk_id - 1 and + 1.
+
+    Returns:
+        str: The passage with its document title, page and section.
+    """
+    try:
+        store = get_document_store()
+        document = next((d for d in store.documents() if d.doc_id == doc_id), None)
+        if document is None:
+            return f"Unknown document '{doc_id}'. Use a doc_id listed with the query or returned by search_documents."
+        chunk_id = int(chunk_id)
+        if not 0 <= chunk_id < len(document.chunks):
+            return f"Document '{doc_id}' has chunks 0 to {len(document.chunks) - 1}."
+        chunk = document.chunks[chunk_id]
+        section = f", section: {chunk['section']}" if chunk["section"] else ""
+        return (f"[{document.title}, page {chunk['page']}{section}; chunk {chunk_id} "
+                f"(chunks 0 to {len(document.chunks) - 1})]\n\n{chunk['text']}")
+    except Exception as e:
+        logger.warning(f"read_chunk failed for {doc_id}/{chunk_id}: {e}")
+        return f"Error reading chunk {chunk_id} of '{doc_id}': {str(e)}"
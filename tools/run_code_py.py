@@ -1,36 +1,42 @@
 from langchain_core.tools import tool
-import subprocess
-import json
 import os
 import logging
-from config import *
+import config
+from .kernel_pool import KernelPool, KernelTimeout, get_pool, output_callback, format_result
 
 logger = logging.getLogger(__name__)
 
+WORKER_SCRIPT = os.path.join(os.path.dirname(__file__), "py_kernel_worker.py")
+
+
+def _make_pool() -> KernelPool:
+    env = dict(config.RUN_CODE_PY_ENV)
+    env["KERNEL_MEMORY_MB"] = str(config.RUN_CODE_MEMORY_MB or "")
+    env["KERNEL_PRELOAD"] = ",".join(config.RUN_CODE_PY_PRELOAD)
+    return KernelPool(
+        "python",
+        [config.RUN_CODE_PY_CMD, "-u", WORKER_SCRIPT],
+        env=env,
+        max_kernels=config.RUN_CODE_MAX_KERNELS,
+        warm_spare=config.RUN_CODE_WARM_SPARE,
+    )
+
+
 @tool
 def run_code_py(code: str) -> str:
-    """Execute Python code for quant tasks."""
-    input_data = {"code": code}
-    cmd = [RUN_CODE_PY_CMD] + RUN_CODE_PY_ARGS
-    env = os.environ.copy()
-    env.update(RUN_CODE_PY_ENV)
+    """Execute Python code for quant tasks. Variables, imports and data persist between calls within the same run; numpy (np) and pandas (pd) are preloaded. The value of a trailing expression is printed."""
     try:
-        proc = subprocess.Popen(
-            cmd,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            env=env,
-            text=True,
-            encoding='utf-8'
+        result = get_pool("python", _make_pool).execute(
+            code,
+            timeout=config.RUN_CODE_TIMEOUT,
+            cpu_seconds=config.RUN_CODE_CPU_SECONDS,
+            on_output=output_callback("run_code_py"),
+            max_output_chars=config.RUN_CODE_MAX_OUTPUT_CHARS,
         )
-        json_input = json.dumps({"input": input_data})
-        stdout, stderr = proc.communicate(input=json_input, timeout=180)
-        proc.wait()
-        if proc.returncode != 0:
-            raise Exception(f"Return code {proc.returncode}: {stderr}")
-        result = json.loads(stdout or "{}")
-        return result.get("result", result.get("content", str(result)))
+        return format_result(result)
+    except KernelTimeout as e:
+        logger.warning(f"run_code_py timed out: {e}")
+        return f"Error: {e}"
     except Exception as e:
-        logger.error(f"Error in run_code_py: {e}")  # Log subprocess or execution errors for debugging
-        return f"Mock (MCP ready?): HHI example: {sum(s**2 for s in [0.4, 0.3]) * 10000:.0f}. Note: Check env. Error: {str(e)[:300]}"
\ No newline at end of file
+        logger.error(f"Error in run_code_py: {e}")  # Log kernel start-up or crash errors for debugging
+        return f"Mock (kernel unavailable): HHI example: {sum(s**2 for s in [0.4, 0.3]) * 10000:.0f}. Note: Check env. Error: {str(e)[:300]}"
@@ -1,36 +1,42 @@
 from langchain_core.tools import tool
-import subprocess
-import json
 import os
 import logging
-from config import *
+import config
+from .kernel_pool import KernelPool, KernelTimeout, get_pool, output_callback, format_result
 
 logger = logging.getLogger(__name__)
 
+WORKER_SCRIPT = os.path.join(os.path.dirname(__file__), "r_kernel_worker.R")
+
+
+def _make_pool() -> KernelPool:
+    env = dict(config.RUN_CODE_R_ENV)
+    env["KERNEL_PRELOAD"] = ",".join(config.RUN_CODE_R_PRELOAD)
+    return KernelPool(
+        "r",
+        [config.RUN_CODE_R_CMD, "--vanilla", WORKER_SCRIPT],
+        env=env,
+        max_kernels=config.RUN_CODE_MAX_KERNELS,
+        warm_spare=config.RUN_CODE_WARM_SPARE,
+        memory_mb=config.RUN_CODE_MEMORY_MB,
+    )
+
+
 @tool
 def run_code_r(code: str) -> str:
-    """Execute R code for quant tasks."""
-    input_data = {"code": code}
-    cmd = [RUN_CODE_R_CMD] + RUN_CODE_R_ARGS
-    env = os.environ.copy()
-    env.update(RUN_CODE_R_ENV)
+    """Execute R code for quant tasks. Objects (data, fitted models) and attached packages persist between calls within the same run. Visible results of top-level expressions are printed."""
     try:
-        proc = subprocess.Popen(
-            cmd,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            env=env,
-            text=True,
-            encoding='utf-8'
+        result = get_pool("r", _make_pool).execute(
+            code,
+            timeout=config.RUN_CODE_TIMEOUT,
+            cpu_seconds=config.RUN_CODE_CPU_SECONDS,
+            on_output=output_callback("run_code_r"),
+            max_output_chars=config.RUN_CODE_MAX_OUTPUT_CHARS,
         )
-        json_input = json.dumps({"input": input_data})
-        stdout, stderr = proc.communicate(input=json_input, timeout=180)
-        proc.wait()
-        if proc.returncode != 0:
-            raise Exception(f"Return code {proc.returncode}: {stderr}")
-        result = json.loads(stdout or "{}")
-        return result.get("result", result.get("content", str(result)))
+        return format_result(result)
+    except KernelTimeout as e:
+        logger.warning(f"run_code_r timed out: {e}")
+        return f"Error: {e}"
     except Exception as e:
-        logger.error(f"Error in run_code_r: {e}")  # Log subprocess or execution errors for debugging
-        return f"Mock (MCP ready?): R HHI example: sum(sapply(c(0.4,0.3), function(s) s^2)) * 10000 = 2500. Note: Check env. Error: {str(e)[:300]}"
\ No newline at end of file
+        logger.error(f"Error in run_code_r: {e}")  # Log R start-up or crash errors for debugging
+        return f"Mock (R kernel unavailable): R HHI example: sum(sapply(c(0.4,0.3), function(s) s^2)) * 10000 = 2500. Note: Check env. Error: {str(e)[:300]}"
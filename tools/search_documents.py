@@ -0,0 +1,49 @@
+from langchain_core.tools import tool
+import json
+import logging
+from typing import Optional
+
+import config
+from .document_store import get_document_store, tokenize
+
+logger = logging.getLogger(__name__)
+
+
+def _snippet(text: str, query: str) -> str:
+    """About DOCUMENT_SNIPPET_CHARS of text around the first query term it contains."""
+    limit = config.DOCUMENT_SNIPPET_CHARS
+    lowered = text.lower()
+    positions = [p for p in (lowered.find(term) for term in set(tokenize(query))) if p >= 0]
+    start = max(0, min(positions) - limit // 3) if positions else 0
+    snippet = " ".join(text[start:start + limit].split())
+    return ("..." if start else "") + snippet + ("..." if start + limit < len(text) else "")
+
+
+@tool
+def search_documents(query: str, k: int = 5, doc_id: Optional[str] = None) -> str:
+    """Search the uploaded documents of this query for passages relevant to `query` (BM25 keyword ranking).
+
+    Args:
+        query (str): Keywords or a question, e.g. "relevant market definition SSNIP".
+        k (int): Number of passages to return (at most 20).
+        doc_id (str, optional): Only search this document.
+
+    Returns:
+        str: JSON list of the best passages, best first: doc_id, chunk_id, title, page,
+        section, score and a snippet. Read a whole passage with read_chunk(doc_id, chunk_id).
+    """
+    try:
+        store = get_document_store()
+        if not store.documents():
+            return "No uploaded documents for this query."
+        k = max(1, min(int(k), config.DOCUMENT_SEARCH_MAX_K))
+        hits = store.index().search(query, k, doc_id=doc_id)
+        if not hits:
+            return f"No passages match '{query}'. Try other keywords."
+        return json.dumps([{"doc_id": doc.doc_id, "chunk_id": chunk["chunk_id"], "title": doc.title,
+                            "page": chunk["page"], "section": chunk["section"], "score": round(score, 2),
+                            "snippet": _snippet(chunk["text"], query)} for score, doc, chunk in hits],
+                          ensure_ascii=False)
+    except Exception as e:
+        logger.warning(f"search_documents failed for {query!r}: {e}")
+        return f"Error searching documents: {str(e)}"
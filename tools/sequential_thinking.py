@@ -1,19 +1,92 @@
 from langchain_core.tools import tool
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import json
+import threading
+import config
 from compete_logging import get_logger
+from run_context import DEFAULT_RUN_ID, get_run_id, get_agent, on_run_end
 
 logger = get_logger(__name__)
 
-# Module-level state
-thought_history: List[Dict[str, Any]] = []
-thought_branches: Dict[str, List[Dict[str, Any]]] = {}
+
+class ThoughtStore:
+    """Thought history and branches of one agent within one run, capped at SEQUENTIAL_THINKING_MAX_HISTORY."""
+
+    def __init__(self):
+        self.history: List[Dict[str, Any]] = []
+        self.branches: Dict[str, List[Dict[str, Any]]] = {}
+        self.total = 0  # thoughts recorded, including ones dropped by the cap
+
+    def add(self, thought: Dict[str, Any]) -> None:
+        cap = config.SEQUENTIAL_THINKING_MAX_HISTORY
+        self.total += 1
+        self.history.append(thought)
+        del self.history[:-cap]  # trimmed in place so aliases of the list stay valid
+        branch_id = thought.get("branchId")
+        if branch_id:
+            branch = self.branches.setdefault(branch_id, [])
+            branch.append(thought)
+            del branch[:-cap]
+
+    def window(self) -> List[Dict[str, Any]]:
+        """The most recent thoughts, oldest first; all but the current one are abbreviated."""
+        recent = self.history[-config.SEQUENTIAL_THINKING_WINDOW:]
+        limit = config.SEQUENTIAL_THINKING_SUMMARY_CHARS
+        summary = []
+        for item in recent[:-1]:
+            entry = {k: v for k, v in item.items() if v not in (None, False) and k != "totalThoughts"}
+            if len(entry["thought"]) > limit:
+                entry["thought"] = entry["thought"][:limit] + "..."
+            summary.append(entry)
+        return summary + recent[-1:]
+
+    def clear(self) -> None:
+        self.history.clear()
+        self.branches.clear()
+        self.total = 0
+
+
+# Stores keyed by (run_id, agent name). Thoughts made outside any run or agent scope
+# (direct calls, tests) go to the default store, which the module globals below alias.
+_stores: Dict[Tuple[str, Optional[str]], ThoughtStore] = {}
+_stores_lock = threading.Lock()
+_default_store = ThoughtStore()
+_stores[(DEFAULT_RUN_ID, None)] = _default_store
+
+# Module-level state (the default store)
+thought_history: List[Dict[str, Any]] = _default_store.history
+thought_branches: Dict[str, List[Dict[str, Any]]] = _default_store.branches
+
+
+def get_store(run_id: Optional[str] = None, agent: Optional[str] = None) -> ThoughtStore:
+    """Thought store of agent within run_id (defaults: the current run and agent)."""
+    key = (run_id or get_run_id(), agent if agent is not None else get_agent())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = ThoughtStore()
+    return store
+
+
+def release_run(run_id: str) -> None:
+    """Drop every thought store of run_id."""
+    with _stores_lock:
+        for key in [key for key in _stores if key[0] == run_id]:
+            if _stores[key] is _default_store:
+                _default_store.clear()
+            else:
+                del _stores[key]
+
+
+on_run_end(release_run)
+
 
 def reset_thoughts():
-    """Clears the thought history and branches."""
-    global thought_history, thought_branches
-    thought_history.clear()
-    thought_branches.clear()
+    """Clears the thought history and branches of every run and agent."""
+    with _stores_lock:
+        _stores.clear()
+        _default_store.clear()
+        _stores[(DEFAULT_RUN_ID, None)] = _default_store
     logger.info("Sequential thinking state reset.")
 
 @tool
@@ -44,10 +117,8 @@ def sequential_thinking(
         needsMoreThoughts (bool, optional): Explicit flag if more thoughts are needed (alternative to nextThoughtNeeded).
 
     Returns:
-        str: A JSON string containing the current state of the thought process.
+        str: A compact JSON string with the current thought and a window of the most recent ones.
     """
-    global thought_history, thought_branches
-
     # Normalize nextThoughtNeeded
     if needsMoreThoughts is not None:
         nextThoughtNeeded = needsMoreThoughts
@@ -63,23 +134,21 @@ def sequential_thinking(
         "branchId": branchId,
     }
 
-    # Add to history
-    thought_history.append(current_thought_data)
-    
-    # Handle branching (simplified storage)
-    if branchId:
-        if branchId not in thought_branches:
-            thought_branches[branchId] = []
-        thought_branches[branchId].append(current_thought_data)
+    # Add to this agent's history for the current run (branches are tracked by the store)
+    store = get_store()
+    store.add(current_thought_data)
 
     # Log the thought
     logger.info(f"Sequential Thinking - Thought {thoughtNumber}/{totalThoughts}: {thought[:100]}...")
 
-    # Construct response
+    # Construct response: only a bounded window is echoed back, so the tokens returned
+    # per call stay constant instead of growing with the length of the chain
     response = {
-        "thought_history": thought_history,
+        "thought_history": store.window(),
         "current_thought": current_thought_data,
+        "history_length": store.total,
+        "branches": list(store.branches),
         "status": "Thinking..." if nextThoughtNeeded else "Complete"
     }
 
-    return json.dumps(response, indent=2)
+    return json.dumps(response, separators=(",", ":"))
@@ -5,8 +5,10 @@ import time
 import random
 import requests
 from requests.exceptions import Timeout, HTTPError
+import asyncio
+import httpx
 from config import *
-from tavily import TavilyClient
+from .providers import get_tavily_client, get_async_tavily_client, get_async_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +18,27 @@ user_agents = [
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.101 Safari/537.36"
 ]
 
+def _format_response(url: str, response: dict) -> dict:
+    """Turn a Tavily extract response into the tool's content/sources dict, raising on failure."""
+    if response and response.get('results') and len(response['results']) > 0:
+        raw_content = response['results'][0]['raw_content']
+        sources = [{"url": url, "title": "Extracted Content", "snippet": raw_content[:200]}]
+        if 'failed_results' in response and response['failed_results']:
+            logger.warning(f"Failed results for {url}: {response['failed_results']}")
+        return {"content": raw_content, "sources": sources}
+    else:
+        failed = response.get('failed_results', []) if response else []
+        if failed:
+            logger.error(f"Extraction failed for {url}: {failed}")
+            raise ValueError(f"Extraction failed for some URLs: {failed}")
+        else:
+            raise ValueError("Empty results from Tavily extract")
+
+def _mock_result(url: str, e: Exception) -> dict:
+    mock_content = f"Mock tavily_extract('{url}'): Extracted markdown: # Title\nContent... Error: {str(e)[:300]}"
+    mock_sources = [{"url": url, "title": "Mock Extracted Title", "snippet": "Mock snippet"}]
+    return {"content": mock_content, "sources": mock_sources}
+
 @tool
 def tavily_extract(url: str, extract_depth: str = "basic", format: str = "markdown") -> dict:
     """Tavily web content extraction with anti-bot headers and fallback."""
@@ -33,7 +56,7 @@ def tavily_extract(url: str, extract_depth: str = "basic", format: str = "markdo
         response = None
         for attempt in range(3):
             try:
-                client = TavilyClient(api_key=TAVILY_API_KEY)
+                client = get_tavily_client()
                 response = client.extract(urls=[url], extract_depth=extract_depth, format=format)
                 break
             except (Timeout, HTTPError) as e:
@@ -43,19 +66,7 @@ def tavily_extract(url: str, extract_depth: str = "basic", format: str = "markdo
                 else:
                     raise
 
-        if response and response.get('results') and len(response['results']) > 0:
-            raw_content = response['results'][0]['raw_content']
-            sources = [{"url": url, "title": "Extracted Content", "snippet": raw_content[:200]}]
-            if 'failed_results' in response and response['failed_results']:
-                logger.warning(f"Failed results for {url}: {response['failed_results']}")
-            return {"content": raw_content, "sources": sources}
-        else:
-            failed = response.get('failed_results', []) if response else []
-            if failed:
-                logger.error(f"Extraction failed for {url}: {failed}")
-                raise ValueError(f"Extraction failed for some URLs: {failed}")
-            else:
-                raise ValueError("Empty results from Tavily extract")
+        return _format_response(url, response)
     except Exception as e:
         logger.error(f"Error in tavily_extract: {e}")
         # Fallback to linkup_fetch
@@ -65,9 +76,46 @@ def tavily_extract(url: str, extract_depth: str = "basic", format: str = "markdo
             return fallback_result
         except Exception as fallback_e:
             logger.error(f"Fallback failed: {fallback_e}")
-            mock_content = f"Mock tavily_extract('{url}'): Extracted markdown: # Title\nContent... Error: {str(e)[:300]}"
-            mock_sources = [{"url": url, "title": "Mock Extracted Title", "snippet": "Mock snippet"}]
-            return {"content": mock_content, "sources": mock_sources}
+            return _mock_result(url, e)
+
+async def atavily_extract(url: str, extract_depth: str = "basic", format: str = "markdown") -> dict:
+    """Async variant of tavily_extract using pooled HTTP and Tavily clients."""
+    try:
+        # URL validation over the shared keep-alive client
+        try:
+            headers = {"User-Agent": random.choice(user_agents)}
+            resp = await get_async_http_client().head(url, headers=headers, timeout=5)
+            if resp.status_code not in [200, 302, 303]:
+                raise ValueError(f"Invalid URL: {url} returned {resp.status_code}")
+        except httpx.HTTPError as e:
+            raise ValueError(f"URL validation failed for {url}: {e}")
+
+        # Retry loop with backoff
+        response = None
+        for attempt in range(3):
+            try:
+                client = get_async_tavily_client()
+                response = await client.extract(urls=[url], extract_depth=extract_depth, format=format)
+                break
+            except (httpx.TimeoutException, httpx.HTTPStatusError) as e:
+                if attempt < 2:
+                    await asyncio.sleep(2 ** attempt)  # exponential backoff
+                    continue
+                else:
+                    raise
+
+        return _format_response(url, response)
+    except Exception as e:
+        logger.error(f"Error in atavily_extract: {e}")
+        # Fallback to linkup_fetch
+        try:
+            from tools.linkup_fetch import linkup_fetch
+            return await linkup_fetch.ainvoke({"url": url})
+        except Exception as fallback_e:
+            logger.error(f"Fallback failed: {fallback_e}")
+            return _mock_result(url, e)
+
+tavily_extract.coroutine = atavily_extract
 
 # Temporary test block
 # result = tavily_extract("https://example.com/protected.pdf")
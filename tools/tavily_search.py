@@ -1,8 +1,8 @@
 from langchain_core.tools import tool
-from tavily import TavilyClient
 import os
 import logging
 from config import *
+from .providers import get_tavily_client, get_async_tavily_client
 
 logger = logging.getLogger(__name__)
 
@@ -14,13 +14,24 @@ TIME_RANGE_MAPPING = {
     "year": "y"
 }
 
+def _format_results(response: dict) -> dict:
+    results = response.get("results", [])
+    content = "\n".join([f"{r['title']}: {r['content']}" for r in results])
+    sources = [{"url": r["url"], "title": r["title"], "snippet": r["content"]} for r in results]
+    return {"content": content, "sources": sources}
+
+def _mock_result(query: str, e: Exception) -> dict:
+    mock_content = f"Mock tavily_search('{query}'): Searched: Top papers on IO economics... Note: TAVILY_API_KEY required. Error: {str(e)[:300]}"
+    mock_sources = [{"url": "https://example.com", "title": "Mock Search Result", "snippet": "Mock snippet from search"}]
+    return {"content": mock_content, "sources": mock_sources}
+
 @tool
 def tavily_search(query: str, time_range: str = "y") -> dict:
     """Tavily broad search for recent econ papers/news."""
     try:
         # Map long form time_range to short form if needed
         mapped_time_range = TIME_RANGE_MAPPING.get(time_range, time_range)
-        client = TavilyClient(api_key=TAVILY_API_KEY)
+        client = get_tavily_client()
         response = client.search(
             query=query,
             search_depth="basic",
@@ -28,12 +39,25 @@ def tavily_search(query: str, time_range: str = "y") -> dict:
             max_results=TAVILY_MAX_RESULTS,
             time_range=mapped_time_range
         )
-        results = response.get("results", [])
-        content = "\n".join([f"{r['title']}: {r['content']}" for r in results])
-        sources = [{"url": r["url"], "title": r["title"], "snippet": r["content"]} for r in results]
-        return {"content": content, "sources": sources}
+        return _format_results(response)
     except Exception as e:
         logger.error(f"Error in tavily_search: {e}")  # Log API or network errors for debugging
-        mock_content = f"Mock tavily_search('{query}'): Searched: Top papers on IO economics... Note: TAVILY_API_KEY required. Error: {str(e)[:300]}"
-        mock_sources = [{"url": "https://example.com", "title": "Mock Search Result", "snippet": "Mock snippet from search"}]
-        return {"content": mock_content, "sources": mock_sources}
\ No newline at end of file
+        return _mock_result(query, e)
+
+async def atavily_search(query: str, time_range: str = "y") -> dict:
+    """Async variant of tavily_search using the pooled AsyncTavilyClient."""
+    try:
+        mapped_time_range = TIME_RANGE_MAPPING.get(time_range, time_range)
+        client = get_async_tavily_client()
+        response = await client.search(
+            query=query,
+            search_depth="basic",
+            max_results=TAVILY_MAX_RESULTS,
+            time_range=mapped_time_range
+        )
+        return _format_results(response)
+    except Exception as e:
+        logger.error(f"Error in atavily_search: {e}")
+        return _mock_result(query, e)
+
+tavily_search.coroutine = atavily_search